@@ -0,0 +1,95 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+"""Compare the previous loop and the vectorised fill_cell_with_previous_value
+
+Usage: python benchmarks/bench_fill_cell_with_previous_value.py
+
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from repdoc.fill_cell_with_previous_value import \
+    fill_cell_with_previous_value
+
+
+def fill_cell_loop(s):
+    """Previous implementation (loop over the values)"""
+
+    ll = len(s)
+    result = []
+    i = 0
+    last = None
+    while i < ll:
+        if type(s[i]) is str:
+            last = s[i]
+            result.append(last)
+        else:
+            if np.isnan(s[i]):
+                if last is None:
+                    raise ValueError('Unexpected error')
+                else:
+                    result.append(last)
+            else:
+                last = s[i]
+                result.append(last)
+        i += 1
+
+    return result
+
+
+def columna(nrows, seed):
+    """Column of the subject table with empty cells (as 'curso')
+
+    Only one cell out of four (on average) is not empty, and the first
+    one is always valid.
+
+    """
+
+    rng = np.random.default_rng(seed)
+    values = rng.choice(['1º', '2º', '3º', '4º'], size=nrows)
+    values = values.astype(object)
+    values[rng.random(nrows) < 0.75] = np.nan
+    values[0] = '1º'
+    return pd.Series(values, dtype=object)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark of fill_cell_with_previous_value'
+    )
+    parser.add_argument('--nrows', type=int, nargs='+',
+                        default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args(args)
+
+    print(f'{"nrows":>8s} {"loop (s)":>10s} {"vector (s)":>11s} '
+          f'{"speedup":>8s}')
+    for nrows in args.nrows:
+        s = columna(nrows, args.seed)
+        if fill_cell_loop(s) != fill_cell_with_previous_value(s).tolist():
+            raise ValueError('Different results')
+        # best time of several repetitions
+        t_loop = min(timeit.repeat(lambda: fill_cell_loop(s),
+                                   repeat=args.repeat, number=1))
+        t_vector = min(timeit.repeat(
+            lambda: fill_cell_with_previous_value(s),
+            repeat=args.repeat, number=1
+        ))
+        print(f'{nrows:8d} {t_loop:10.4f} {t_vector:11.4f} '
+              f'{t_loop / t_vector:8.1f}')
+
+
+if __name__ == '__main__':
+    main()
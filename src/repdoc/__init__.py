@@ -1,2 +1,6 @@
+import time
+# employed to display the time spent importing the package modules
+IMPORT_START = time.perf_counter()
+
 from .version import version
 __version__ = version
@@ -0,0 +1,328 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import pandas as pd
+
+from .date_last_update import datetime_short
+
+from .definitions import CSV_COLNAMES_ASIGNATURA
+from .definitions import CSV_COLNAMES_PROFESOR
+from .definitions import CSV_COLVALUES_ASIGNATURA_NULL
+from .definitions import NULL_UUID
+from .definitions import TEXT_ACTIVA_ELECCION
+from .definitions import TEXT_FINALIZA_ELECCION
+
+
+class AllocationEditor:
+    """Changes of the subject assignment, with undo and redo.
+
+    Every change (new choice, removal of a previous choice, and
+    finalization or activation of the election of a teacher) updates
+    the assignment state and is stored in the bitacora, its journal and
+    its index (the active assignments of the state, which define the new
+    teachers of each subject, follow the active entries). The values of
+    the affected teacher, degree and subject are saved before and after
+    each change, so that undo() and redo() restore them directly,
+    without recomputing the totals nor applying the bitacora again (the
+    saved values are also restored when the entry of a change cannot be
+    stored). The bitacora is never rewritten: undoing or redoing a
+    change stores a compensating entry (the removal of the choice, a
+    copy of the removed choice, or the opposite activate/deactivate
+    entry).
+
+    This class does not depend on the GUI, and can be employed with
+    the state returned by load_tables(). The tables of the state are
+    not updated (see AllocationState.update_tables).
+
+    Parameters
+    ----------
+    state : AllocationState
+        State of the subject assignment.
+    bitacora : BitacoraBuffer
+        Entries of the bitacora.
+    journal : BitacoraJournal
+        Journal of the bitacora.
+    indice_bitacora : BitacoraIndex or BitacoraSqlite
+        Indexed copy of the bitacora.
+    uuid_registry : UuidRegistry
+        Registry of the UUIDs already in use.
+
+    """
+
+    def __init__(self, state, bitacora, journal, indice_bitacora,
+                 uuid_registry):
+        self.state = state
+        self.bitacora = bitacora
+        self.journal = journal
+        self.indice_bitacora = indice_bitacora
+        self.uuid_registry = uuid_registry
+        self._undo = []
+        self._redo = []
+        # entries replaced by a copy when undoing or redoing a change
+        self._replaced = {}
+
+    @property
+    def can_undo(self):
+        return len(self._undo) > 0
+
+    @property
+    def can_redo(self):
+        return len(self._redo) > 0
+
+    # ---
+    # bitacora
+
+    def _store(self, uuid_bita, data_row):
+        # the journal is written first, so that nothing is modified when
+        # the entry cannot be saved
+        self.journal.add(uuid_bita, dict(zip(self.bitacora.columns,
+                                             data_row)))
+        new_entry = self.bitacora.append(uuid_bita, data_row)
+        self.indice_bitacora.add(uuid_bita, new_entry)
+        if new_entry['uuid_titu'] != NULL_UUID:
+            self.state.add_asignacion(uuid_bita, new_entry['uuid_prof'],
+                                      new_entry['uuid_titu'],
+                                      new_entry['uuid_asig'])
+
+    def _new_entry(self, uuid_prof, uuid_titu, uuid_asig, creditos_elegidos,
+                   explicacion, ronda):
+        uuid_bita = self.uuid_registry.new_uuid()
+        data_row = [uuid_prof, uuid_titu, uuid_asig,
+                    pd.Timestamp(datetime_short()), ronda,
+                    pd.NaT, pd.NA, creditos_elegidos, explicacion]
+        # these columns are not modified during the assignment
+        tabla_profesores = self.state.tabla_profesores
+        for item in CSV_COLNAMES_PROFESOR:
+            data_row.append(tabla_profesores.loc[uuid_prof, item])
+        if uuid_asig == NULL_UUID:
+            data_row += CSV_COLVALUES_ASIGNATURA_NULL
+        else:
+            titulacion = self.state.tabla_titulaciones.loc[uuid_titu,
+                                                           'titulacion']
+            tabla_asignaturas = \
+                self.state.bigdict_tablas_asignaturas[titulacion]
+            for item in CSV_COLNAMES_ASIGNATURA:
+                data_row.append(tabla_asignaturas.loc[uuid_asig, item])
+        data_row.append(True)  # active
+        self._store(uuid_bita, data_row)
+        return uuid_bita
+
+    def _current(self, uuid_bita):
+        """Return UUID of the last copy of an entry"""
+        while uuid_bita in self._replaced:
+            uuid_bita = self._replaced[uuid_bita]
+        return uuid_bita
+
+    def _copy_entry(self, uuid_bita, ronda):
+        """Store a new active entry with the choice of uuid_bita"""
+        uuid_bita = self._current(uuid_bita)
+        entry = self.bitacora.entry(uuid_bita)
+        entry['date_added'] = pd.Timestamp(datetime_short())
+        entry['round_added'] = ronda
+        entry['date_removed'] = pd.NaT
+        entry['round_removed'] = pd.NA
+        entry['active'] = True
+        new_uuid_bita = self.uuid_registry.new_uuid()
+        self._store(new_uuid_bita,
+                    [entry[col] for col in self.bitacora.columns])
+        self._replaced[uuid_bita] = new_uuid_bita
+
+    def _remove_entry(self, uuid_bita, ronda):
+        uuid_bita = self._current(uuid_bita)
+        if uuid_bita not in self.bitacora or \
+                not self.bitacora.entry(uuid_bita)['active']:
+            raise ValueError(f'Entry {uuid_bita} is not active')
+        date_removed = pd.Timestamp(datetime_short())
+        self.journal.remove(uuid_bita, date_removed, ronda)
+        try:
+            # only the index (SQLite database) can fail at this point
+            self.indice_bitacora.remove(uuid_bita, date_removed, ronda)
+        except Exception:
+            # cancel the removal stored in the journal
+            self.journal.restore(uuid_bita)
+            raise
+        self.bitacora.remove(uuid_bita, date_removed, ronda)
+        self.state.remove_asignacion(uuid_bita)
+
+    def _new_entry_finalizado(self, uuid_prof, ronda):
+        if self.state.profesor(uuid_prof)['finalizado']:
+            explicacion = TEXT_FINALIZA_ELECCION
+        else:
+            explicacion = TEXT_ACTIVA_ELECCION
+        return self._new_entry(uuid_prof, NULL_UUID, NULL_UUID, 0.0,
+                               explicacion, ronda)
+
+    # ---
+    # changes
+
+    def add_choice(self, uuid_prof, uuid_titu, uuid_asig, creditos_elegidos,
+                   explicacion, ronda, todo=False):
+        """Assign (a fraction of) a subject to a teacher.
+
+        Parameters
+        ----------
+        uuid_prof, uuid_titu, uuid_asig : str
+            UUIDs of the teacher, degree and subject.
+        creditos_elegidos : float
+            Credits assigned to the teacher.
+        explicacion : str
+            Explanation stored in the bitacora.
+        ronda : int
+            Current round.
+        todo : bool
+            If True, the whole subject is assigned (its available
+            credits are set to zero).
+
+        Returns
+        -------
+        uuid_bita : str
+            UUID of the new bitacora entry.
+
+        Raises
+        ------
+        ValueError
+            If the subject does not have enough available credits.
+
+        """
+
+        before = self.state.snapshot(uuid_prof, uuid_titu, uuid_asig)
+        self.state.assign(uuid_prof, uuid_titu, uuid_asig, creditos_elegidos,
+                          todo=todo)
+        # Nota: uuid_bita tendrá un valor único para cada elección de los
+        # profesores. Esto permite discriminar dentro de una misma
+        # asignatura (i.e., mismo uuid_prof, uuid_titu, uuid_asig) cuando
+        # se eligen fracciones de asignatura (es decir, cuando se
+        # subdividen asignaturas por un mismo profesor)
+        try:
+            uuid_bita = self._new_entry(uuid_prof, uuid_titu, uuid_asig,
+                                        creditos_elegidos, explicacion, ronda)
+        except Exception:
+            # the state must match the stored entries
+            self.state.restore(before)
+            raise
+        after = self.state.snapshot(uuid_prof, uuid_titu, uuid_asig)
+        self._push({'kind': 'add', 'uuid_bita': uuid_bita,
+                    'before': before, 'after': after})
+        return uuid_bita
+
+    def remove_choice(self, uuid_bita, ronda):
+        """Remove a previous choice (active entry of the bitacora).
+
+        Raises
+        ------
+        ValueError
+            If the entry has already been removed, or the teacher does
+            not have enough assigned credits.
+
+        """
+
+        entry = self.bitacora.entry(uuid_bita)
+        if not entry['active'] or entry['uuid_titu'] == NULL_UUID:
+            raise ValueError(f'Entry {uuid_bita} is not an active choice')
+        uuid_prof = entry['uuid_prof']
+        uuid_titu = entry['uuid_titu']
+        uuid_asig = entry['uuid_asig']
+        before = self.state.snapshot(uuid_prof, uuid_titu, uuid_asig)
+        self.state.release(uuid_prof, uuid_titu, uuid_asig,
+                           entry['creditos_elegidos'])
+        try:
+            self._remove_entry(uuid_bita, ronda)
+        except Exception:
+            self.state.restore(before)
+            raise
+        after = self.state.snapshot(uuid_prof, uuid_titu, uuid_asig)
+        self._push({'kind': 'remove', 'uuid_bita': uuid_bita,
+                    'before': before, 'after': after})
+
+    def toggle_finalizado(self, uuid_prof, ronda):
+        """Finalize (or activate again) the election of a teacher.
+
+        Returns
+        -------
+        finalizado : bool
+            New value of the flag.
+
+        """
+
+        before = self.state.snapshot(uuid_prof)
+        finalizado = not self.state.profesor(uuid_prof)['finalizado']
+        if finalizado:
+            self.state.finalise(uuid_prof)
+        else:
+            self.state.reopen(uuid_prof)
+        try:
+            self._new_entry_finalizado(uuid_prof, ronda)
+        except Exception:
+            self.state.restore(before)
+            raise
+        after = self.state.snapshot(uuid_prof)
+        self._push({'kind': 'finalizado', 'uuid_prof': uuid_prof,
+                    'before': before, 'after': after})
+        return finalizado
+
+    def _push(self, change):
+        self._undo.append(change)
+        self._redo.clear()
+
+    # ---
+    # undo and redo
+
+    def undo(self, ronda):
+        """Undo the last change.
+
+        Returns
+        -------
+        change : dict
+            Undone change ('kind' is 'add', 'remove' or 'finalizado').
+
+        Raises
+        ------
+        IndexError
+            If there is nothing to undo.
+
+        """
+
+        if not self._undo:
+            raise IndexError('Nothing to undo')
+        change = self._undo.pop()
+        self.state.restore(change['before'])
+        try:
+            if change['kind'] == 'add':
+                self._remove_entry(change['uuid_bita'], ronda)
+            elif change['kind'] == 'remove':
+                self._copy_entry(change['uuid_bita'], ronda)
+            else:
+                self._new_entry_finalizado(change['uuid_prof'], ronda)
+        except Exception:
+            self.state.restore(change['after'])
+            self._undo.append(change)
+            raise
+        self._redo.append(change)
+        return change
+
+    def redo(self, ronda):
+        """Apply again the last undone change (see undo)"""
+
+        if not self._redo:
+            raise IndexError('Nothing to redo')
+        change = self._redo.pop()
+        self.state.restore(change['after'])
+        try:
+            if change['kind'] == 'add':
+                self._copy_entry(change['uuid_bita'], ronda)
+            elif change['kind'] == 'remove':
+                self._remove_entry(change['uuid_bita'], ronda)
+            else:
+                self._new_entry_finalizado(change['uuid_prof'], ronda)
+        except Exception:
+            self.state.restore(change['before'])
+            self._redo.append(change)
+            raise
+        self._undo.append(change)
+        return change
@@ -0,0 +1,585 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import numpy as np
+import pandas as pd
+
+from .lazy_tablas_asignaturas import LazyTablasAsignaturas
+from .microcreditos import a_creditos
+from .microcreditos import a_microcreditos
+from .update_ronda_profesor import update_ronda_profesor
+
+from .definitions import CREDITOS_ASIGNATURA
+from .definitions import PRIMERA_RONDA_RYC
+from .definitions import ROUND_ERROR
+
+# columns modified during the subject assignment
+COLUMNS_TITULACIONES = ['creditos_disponibles', 'creditos_elegidos',
+                        'creditos_beccol']
+COLUMNS_ASIGNATURAS = ['creditos_disponibles']
+COLUMNS_PROFESORES = ['asignados', 'diferencia', 'ronda', 'finalizado']
+
+# columns with credits (stored as micro-credits)
+COLUMNS_CREDITOS = ['creditos_iniciales', 'creditos_disponibles',
+                    'creditos_elegidos', 'creditos_beccol', 'encargo',
+                    'asignados', 'diferencia']
+
+# tolerance (micro-credits) employed when checking the available credits
+# of a subject, equivalent to the previous comparisons of real numbers,
+# so that previous bitacoras are applied in the same way
+TOLERANCIA = a_microcreditos(ROUND_ERROR)
+
+
+class AllocationState:
+    """State of the subject assignment stored in numpy arrays.
+
+    The values of degrees, subjects and teachers employed while
+    assigning the subjects are stored in numpy arrays (one dictionary of
+    arrays per kind of table), indexed by integer identifiers obtained
+    from the UUIDs. The changes are performed on these arrays, avoiding
+    the overhead of the scalar access to the pandas tables, which are
+    only updated before exporting them: all the columns with to_tables,
+    or only the rows modified by the last changes with update_tables.
+
+    The new teachers of each subject (column nuevo_profesor of the
+    subject tables) are not stored, but derived from the active
+    assignments of the subject (in the order of the bitacora), and
+    cached until the assignments of that subject change.
+
+    The credits are stored as integer micro-credits (see
+    microcreditos.py), so that sums and comparisons are exact, and
+    applying the same bitacora always gives identical totals. They are
+    converted to credits (float) only by the methods returning the
+    values of a single row, and when copying them to the tables.
+
+    The subjects of each degree are included the first time they are
+    needed, so that the subject tables are not loaded in advance when
+    bigdict_tablas_asignaturas is an instance of LazyTablasAsignaturas.
+
+    The totals of each degree, and those of the department (attribute
+    totales), are updated with the change of the available credits of
+    the subject modified by each assign() or release(), without adding
+    the credits of all the subjects again. When verify is True, the
+    updated totals are compared with the full sums after every change.
+
+    Parameters
+    ----------
+    tabla_titulaciones : pandas.DataFrame
+        Table of degrees.
+    bigdict_tablas_asignaturas : dict or LazyTablasAsignaturas
+        Dictionary with the table of subjects of each degree.
+    tabla_profesores : pandas.DataFrame
+        Table of teachers.
+    verify : bool
+        If True, check the totals after every change (debugging mode).
+    creditos_asignatura : float
+        Credits of a subject, employed to compute the rounds.
+    primera_ronda_ryc : int
+        First round of the RyC and JdC teachers.
+
+    """
+
+    def __init__(self, tabla_titulaciones, bigdict_tablas_asignaturas,
+                 tabla_profesores, verify=False,
+                 creditos_asignatura=CREDITOS_ASIGNATURA,
+                 primera_ronda_ryc=PRIMERA_RONDA_RYC):
+        self.tabla_titulaciones = tabla_titulaciones
+        self.bigdict_tablas_asignaturas = bigdict_tablas_asignaturas
+        self.tabla_profesores = tabla_profesores
+        self.verify = verify
+        self.creditos_asignatura = creditos_asignatura
+        self.primera_ronda_ryc = primera_ronda_ryc
+
+        # degrees
+        self._ititu = {uuid_titu: i for i, uuid_titu in
+                       enumerate(tabla_titulaciones.index)}
+        self.titulaciones = {
+            col: a_microcreditos(tabla_titulaciones[col].to_numpy())
+            for col in ['creditos_iniciales'] + COLUMNS_TITULACIONES
+        }
+        self.totales = {}
+        self.update_totales()
+        # degrees whose totals have changed (see pop_dirty)
+        self._dirty = set(range(len(tabla_titulaciones)))
+        # rows modified since the last copy to the tables (see
+        # update_tables)
+        self._modificados = {'titulaciones': set(), 'asignaturas': set(),
+                             'profesores': set()}
+
+        # teachers
+        self._iprof = {uuid_prof: i for i, uuid_prof in
+                       enumerate(tabla_profesores.index)}
+        self.profesores = {
+            'encargo': a_microcreditos(tabla_profesores['encargo']),
+            'asignados': a_microcreditos(tabla_profesores['asignados']),
+            'diferencia': a_microcreditos(tabla_profesores['diferencia']),
+            'ronda': tabla_profesores['ronda'].to_numpy(dtype=np.int64,
+                                                        copy=True),
+            'finalizado': tabla_profesores['finalizado'].to_numpy(
+                dtype=bool, copy=True),
+            'clase': tabla_profesores['clase'].to_numpy(dtype=object)
+        }
+        self.nombres = (tabla_profesores['nombre'] + ' ' +
+                        tabla_profesores['apellidos']).to_numpy(dtype=object)
+
+        # subjects (grouped by degree)
+        self._iasig = {}
+        self._bloques = {}
+        self.asignaturas = {
+            'titulacion': np.empty(0, dtype=np.int64),
+            'bec_col': np.empty(0, dtype=np.int64),
+            'creditos_disponibles': np.empty(0, dtype=np.int64)
+        }
+        # active assignments of each subject, and subject of each
+        # assignment (using the UUID of the bitacora entry)
+        self._asignaciones = {}
+        self._asignatura_bita = {}
+        self._nuevo_profesor = {}
+        lazy = isinstance(bigdict_tablas_asignaturas, LazyTablasAsignaturas)
+        for ititu, titulacion in enumerate(tabla_titulaciones['titulacion']):
+            if not lazy or bigdict_tablas_asignaturas.is_loaded(titulacion):
+                self.bloque(ititu)
+
+    # ---
+    # identifiers
+
+    def _tabla_asignaturas(self, ititu):
+        titulacion = self.tabla_titulaciones['titulacion'].iloc[ititu]
+        return self.bigdict_tablas_asignaturas[titulacion]
+
+    def bloque(self, ititu):
+        """Return slice with the subjects of a degree (loading them)"""
+
+        if ititu not in self._bloques:
+            tabla_asignaturas = self._tabla_asignaturas(ititu)
+            start = len(self.asignaturas['titulacion'])
+            nuevos = {
+                'titulacion': np.full(len(tabla_asignaturas), ititu),
+                'bec_col': tabla_asignaturas['bec_col'].to_numpy(
+                    dtype=np.int64),
+                'creditos_disponibles': a_microcreditos(
+                    tabla_asignaturas['creditos_disponibles'].to_numpy(
+                        dtype=float))
+            }
+            for col, values in nuevos.items():
+                self.asignaturas[col] = np.concatenate(
+                    (self.asignaturas[col], values)
+                )
+            for i, uuid_asig in enumerate(tabla_asignaturas.index):
+                self._iasig[uuid_asig] = start + i
+            self._bloques[ititu] = slice(start,
+                                         start + len(tabla_asignaturas))
+        return self._bloques[ititu]
+
+    def bloques(self):
+        """Return dictionary with the slices of the loaded degrees"""
+        return dict(self._bloques)
+
+    def id_titulacion(self, uuid_titu):
+        return self._ititu[uuid_titu]
+
+    def id_profesor(self, uuid_prof):
+        return self._iprof[uuid_prof]
+
+    def id_asignatura(self, uuid_titu, uuid_asig):
+        self.bloque(self._ititu[uuid_titu])
+        return self._iasig[uuid_asig]
+
+    def ids_titulaciones(self, uuids_titu):
+        return np.array([self._ititu[uuid] for uuid in uuids_titu],
+                        dtype=np.int64)
+
+    def ids_profesores(self, uuids_prof):
+        return np.array([self._iprof[uuid] for uuid in uuids_prof],
+                        dtype=np.int64)
+
+    def ids_asignaturas(self, uuids_titu, uuids_asig):
+        for uuid_titu in pd.unique(np.asarray(uuids_titu, dtype=object)):
+            self.bloque(self._ititu[uuid_titu])
+        return np.array([self._iasig[uuid] for uuid in uuids_asig],
+                        dtype=np.int64)
+
+    # ---
+    # values of a single row (credits as float)
+
+    @staticmethod
+    def _fila(arrays, i):
+        return {col: a_creditos(values[i]) if col in COLUMNS_CREDITOS
+                else values[i] for col, values in arrays.items()}
+
+    def titulacion(self, uuid_titu):
+        """Return dictionary with the values of a degree"""
+        return self._fila(self.titulaciones, self._ititu[uuid_titu])
+
+    def profesor(self, uuid_prof):
+        """Return dictionary with the values of a teacher"""
+        return self._fila(self.profesores, self._iprof[uuid_prof])
+
+    def asignatura(self, uuid_titu, uuid_asig):
+        """Return dictionary with the values of a subject"""
+        return self._fila(self.asignaturas,
+                          self.id_asignatura(uuid_titu, uuid_asig))
+
+    def total(self, col):
+        """Return total of the department (credits)"""
+        return a_creditos(self.totales[col])
+
+    def snapshot(self, uuid_prof, uuid_titu=None, uuid_asig=None):
+        """Return the modifiable values of a teacher, degree and subject"""
+
+        rows = [(self.profesores, self._iprof[uuid_prof],
+                 COLUMNS_PROFESORES)]
+        if uuid_titu is not None:
+            rows.append((self.titulaciones, self._ititu[uuid_titu],
+                         COLUMNS_TITULACIONES))
+            rows.append((self.asignaturas,
+                         self.id_asignatura(uuid_titu, uuid_asig),
+                         COLUMNS_ASIGNATURAS))
+        return [(arrays, i, {col: arrays[col][i] for col in columns})
+                for arrays, i, columns in rows]
+
+    def restore(self, snapshot):
+        """Set the values returned by snapshot()"""
+        for arrays, i, values in snapshot:
+            if arrays is self.asignaturas:
+                self._modificado('asignaturas', i)
+            elif arrays is self.profesores:
+                self._modificado('profesores', i)
+            else:
+                self._modificado('titulaciones', i)
+                self._dirty.add(i)
+                self._add_totales(
+                    values['creditos_disponibles'] -
+                    arrays['creditos_disponibles'][i],
+                    values['creditos_beccol'] - arrays['creditos_beccol'][i]
+                )
+            for col, value in values.items():
+                arrays[col][i] = value
+        if self.verify:
+            self.verify_totales()
+
+    # ---
+    # changes
+
+    def update_totales(self):
+        """Recompute the totals of the department from the degrees"""
+
+        t = self.titulaciones
+        for col in ['creditos_iniciales'] + COLUMNS_TITULACIONES:
+            self.totales[col] = t[col].sum()
+
+    def _modificado(self, tabla, i):
+        self._modificados[tabla].update(np.atleast_1d(i).tolist())
+
+    def _add_totales(self, delta, delta_beccol):
+        for col, value in [('creditos_disponibles', delta),
+                           ('creditos_elegidos', -delta),
+                           ('creditos_beccol', delta_beccol)]:
+            self.totales[col] += value
+
+    def _set_creditos_disponibles(self, ititu, iasig, creditos_disponibles):
+        """Set the available credits of a subject, updating the totals"""
+
+        a = self.asignaturas
+        t = self.titulaciones
+        delta = creditos_disponibles - a['creditos_disponibles'][iasig]
+        delta_beccol = delta * a['bec_col'][iasig]
+        a['creditos_disponibles'][iasig] = creditos_disponibles
+        self._dirty.add(ititu)
+        self._modificado('titulaciones', ititu)
+        self._modificado('asignaturas', iasig)
+        t['creditos_disponibles'][ititu] += delta
+        t['creditos_beccol'][ititu] += delta_beccol
+        t['creditos_elegidos'][ititu] = \
+            t['creditos_iniciales'][ititu] - t['creditos_disponibles'][ititu]
+        self._add_totales(delta, delta_beccol)
+        if self.verify:
+            self.verify_totales(ititu)
+
+    def pop_dirty(self):
+        """Return (and forget) the degrees modified since the last call"""
+        dirty = sorted(self._dirty)
+        self._dirty.clear()
+        return dirty
+
+    def verify_totales(self, ititu=None):
+        """Compare the totals with the full sums of the subjects.
+
+        Parameters
+        ----------
+        ititu : int or None
+            Degree to be checked. If None, all the loaded degrees are
+            checked. The totals of the department are always checked.
+
+        Raises
+        ------
+        ValueError
+            If any total differs.
+
+        """
+
+        t = self.titulaciones
+        a = self.asignaturas
+        if ititu is None:
+            ids = list(self._bloques)
+        else:
+            ids = [ititu]
+        for i in ids:
+            bloque = self._bloques[i]
+            creditos = a['creditos_disponibles'][bloque]
+            expected = {
+                'creditos_disponibles': creditos.sum(),
+                'creditos_beccol': (creditos * a['bec_col'][bloque]).sum()
+            }
+            for col, value in expected.items():
+                if t[col][i] != value:
+                    raise ValueError(
+                        f'Verification of totals failed: {col} of '
+                        f'{self.tabla_titulaciones.index[i]} is '
+                        f'{t[col][i]} instead of {value}'
+                    )
+        for col in ['creditos_iniciales'] + COLUMNS_TITULACIONES:
+            value = t[col].sum()
+            if self.totales[col] != value:
+                raise ValueError(f'Verification of totals failed: {col} of '
+                                 f'the department is {self.totales[col]} '
+                                 f'instead of {value}')
+
+    def update_titulaciones(self, ititu):
+        """Recompute the totals of the degrees from their subjects.
+
+        The totals of the department are also recomputed.
+
+        """
+
+        t = self.titulaciones
+        self._modificado('titulaciones', ititu)
+        for i in np.atleast_1d(ititu):
+            self._dirty.add(int(i))
+            bloque = self.bloque(i)
+            creditos = self.asignaturas['creditos_disponibles'][bloque]
+            t['creditos_disponibles'][i] = creditos.sum()
+            t['creditos_elegidos'][i] = \
+                t['creditos_iniciales'][i] - t['creditos_disponibles'][i]
+            t['creditos_beccol'][i] = \
+                (creditos * self.asignaturas['bec_col'][bloque]).sum()
+        self.update_totales()
+
+    def set_parametros_ronda(self, creditos_asignatura=CREDITOS_ASIGNATURA,
+                             primera_ronda_ryc=PRIMERA_RONDA_RYC):
+        """Change the parameters of the rounds, updating every teacher"""
+
+        self.creditos_asignatura = creditos_asignatura
+        self.primera_ronda_ryc = primera_ronda_ryc
+        update_ronda_profesor(self)
+        self._modificado('profesores',
+                         np.arange(len(self.profesores['ronda'])))
+
+    def update_profesores(self, iprof):
+        """Recompute the difference and next round of the teachers"""
+
+        p = self.profesores
+        p['diferencia'][iprof] = p['asignados'][iprof] - p['encargo'][iprof]
+        update_ronda_profesor(self, iprof)
+        self._modificado('profesores', iprof)
+
+    def assign(self, uuid_prof, uuid_titu, uuid_asig, creditos_elegidos,
+               todo=False):
+        """Assign (a fraction of) a subject to a teacher.
+
+        The credits (creditos_elegidos) are given as float, as in the
+        bitacora.
+
+        Raises
+        ------
+        ValueError
+            If the subject does not have enough available credits
+            (only checked when todo is False).
+
+        """
+
+        iprof = self._iprof[uuid_prof]
+        ititu = self._ititu[uuid_titu]
+        iasig = self.id_asignatura(uuid_titu, uuid_asig)
+        a = self.asignaturas
+        creditos_elegidos = a_microcreditos(creditos_elegidos)
+        creditos_disponibles = a['creditos_disponibles'][iasig]
+        if todo:
+            creditos_disponibles = 0
+        elif creditos_disponibles > creditos_elegidos - TOLERANCIA:
+            creditos_disponibles -= creditos_elegidos
+            if abs(creditos_disponibles) < TOLERANCIA:
+                creditos_disponibles = 0
+        else:
+            raise ValueError('¡Créditos disponibles insuficientes!')
+        self._set_creditos_disponibles(ititu, iasig, creditos_disponibles)
+        self.profesores['asignados'][iprof] += creditos_elegidos
+        self.update_profesores(iprof)
+
+    def release(self, uuid_prof, uuid_titu, uuid_asig, creditos_elegidos):
+        """Return to the subject the credits assigned to a teacher.
+
+        Raises
+        ------
+        ValueError
+            If the teacher does not have enough assigned credits.
+
+        """
+
+        iprof = self._iprof[uuid_prof]
+        ititu = self._ititu[uuid_titu]
+        iasig = self.id_asignatura(uuid_titu, uuid_asig)
+        creditos_elegidos = a_microcreditos(creditos_elegidos)
+        if self.profesores['asignados'][iprof] < creditos_elegidos:
+            raise ValueError('¡El profesor no tiene créditos suficientes!')
+        self.profesores['asignados'][iprof] -= creditos_elegidos
+        self.update_profesores(iprof)
+        a = self.asignaturas
+        self._set_creditos_disponibles(
+            ititu, iasig, a['creditos_disponibles'][iasig] + creditos_elegidos
+        )
+
+    def add_asignaciones(self, uuids_bita, iasig, iprof):
+        """Include active assignments of subjects to teachers.
+
+        Parameters
+        ----------
+        uuids_bita : list of str
+            UUIDs of the bitacora entries (in the order of the bitacora).
+        iasig, iprof : list of int
+            Identifiers of the subject and teacher of each entry.
+
+        """
+
+        for uuid_bita, i, j in zip(uuids_bita, iasig, iprof):
+            self._asignaciones.setdefault(i, {})[uuid_bita] = j
+            self._asignatura_bita[uuid_bita] = i
+            self._nuevo_profesor.pop(i, None)
+            self._modificados['asignaturas'].add(i)
+
+    def add_asignacion(self, uuid_bita, uuid_prof, uuid_titu, uuid_asig):
+        """Include the active assignment of a new bitacora entry"""
+        self.add_asignaciones([uuid_bita],
+                              [self.id_asignatura(uuid_titu, uuid_asig)],
+                              [self._iprof[uuid_prof]])
+
+    def remove_asignacion(self, uuid_bita):
+        """Remove the assignment of a bitacora entry"""
+
+        i = self._asignatura_bita.pop(uuid_bita)
+        del self._asignaciones[i][uuid_bita]
+        if not self._asignaciones[i]:
+            del self._asignaciones[i]
+        self._nuevo_profesor.pop(i, None)
+        self._modificados['asignaturas'].add(i)
+
+    def _nuevo_profesor_id(self, iasig):
+        if iasig not in self._nuevo_profesor:
+            if iasig in self._asignaciones:
+                self._nuevo_profesor[iasig] = ' + '.join(
+                    self.nombres[iprof]
+                    for iprof in self._asignaciones[iasig].values()
+                )
+            else:
+                self._nuevo_profesor[iasig] = ' '
+        return self._nuevo_profesor[iasig]
+
+    def nuevo_profesor(self, uuid_titu, uuid_asig):
+        """Return the teachers with active assignments of a subject"""
+        return self._nuevo_profesor_id(self.id_asignatura(uuid_titu,
+                                                          uuid_asig))
+
+    def finalise(self, uuid_prof):
+        """Finalize the election of a teacher in the rounds"""
+        self.profesores['finalizado'][self._iprof[uuid_prof]] = True
+        self._modificado('profesores', self._iprof[uuid_prof])
+
+    def reopen(self, uuid_prof):
+        """Activate again the election of a teacher in the rounds"""
+        self.profesores['finalizado'][self._iprof[uuid_prof]] = False
+        self._modificado('profesores', self._iprof[uuid_prof])
+
+    # ---
+    # export
+
+    def to_tables(self):
+        """Copy the modifiable values to the pandas tables.
+
+        Returns
+        -------
+        tabla_titulaciones : pandas.DataFrame
+            Table of degrees.
+        bigdict_tablas_asignaturas : dict or LazyTablasAsignaturas
+            Dictionary with the table of subjects of each degree.
+        tabla_profesores : pandas.DataFrame
+            Table of teachers.
+
+        """
+
+        def copy_columns(table, arrays, columns, bloque=slice(None)):
+            for col in columns:
+                values = arrays[col][bloque]
+                if col in COLUMNS_CREDITOS:
+                    values = a_creditos(values)
+                table[col] = pd.Series(
+                    values, index=table.index
+                ).astype(table[col].dtype)
+
+        copy_columns(self.tabla_titulaciones, self.titulaciones,
+                     COLUMNS_TITULACIONES)
+        nuevo_profesor = np.full(len(self.asignaturas['titulacion']), ' ',
+                                 dtype=object)
+        for iasig in self._asignaciones:
+            nuevo_profesor[iasig] = self._nuevo_profesor_id(iasig)
+        for ititu, bloque in self._bloques.items():
+            copy_columns(self._tabla_asignaturas(ititu),
+                         dict(self.asignaturas, nuevo_profesor=nuevo_profesor),
+                         COLUMNS_ASIGNATURAS + ['nuevo_profesor'], bloque)
+        copy_columns(self.tabla_profesores, self.profesores,
+                     COLUMNS_PROFESORES)
+        for modificados in self._modificados.values():
+            modificados.clear()
+        return self.tabla_titulaciones, self.bigdict_tablas_asignaturas, \
+            self.tabla_profesores
+
+    def update_tables(self):
+        """Copy to the pandas tables only the modified rows.
+
+        The rows changed by the methods of this class since the last
+        call to to_tables() or update_tables() are copied, without
+        copying the full columns again. Use to_tables() after
+        modifying the arrays directly.
+
+        """
+
+        def copy_row(table, arrays, columns, i, irow):
+            for col in columns:
+                value = arrays[col][i]
+                if col in COLUMNS_CREDITOS:
+                    value = a_creditos(value)
+                table.iat[irow, table.columns.get_loc(col)] = value
+
+        m = self._modificados
+        for ititu in sorted(m['titulaciones']):
+            copy_row(self.tabla_titulaciones, self.titulaciones,
+                     COLUMNS_TITULACIONES, ititu, ititu)
+        for iasig in sorted(m['asignaturas']):
+            ititu = self.asignaturas['titulacion'][iasig]
+            tabla_asignaturas = self._tabla_asignaturas(ititu)
+            irow = iasig - self._bloques[ititu].start
+            copy_row(tabla_asignaturas, self.asignaturas,
+                     COLUMNS_ASIGNATURAS, iasig, irow)
+            tabla_asignaturas.iat[
+                irow, tabla_asignaturas.columns.get_loc('nuevo_profesor')
+            ] = self._nuevo_profesor_id(iasig)
+        for iprof in sorted(m['profesores']):
+            copy_row(self.tabla_profesores, self.profesores,
+                     COLUMNS_PROFESORES, iprof, iprof)
+        for modificados in m.values():
+            modificados.clear()
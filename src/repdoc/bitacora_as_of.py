@@ -0,0 +1,73 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import pandas as pd
+
+
+def parse_date_added(text):
+    """Return the cutoff (last instant included) given as a string.
+
+    A date without time (e.g. '2019-06-01') includes the whole day, so
+    the cutoff is moved to the end of that day.
+
+    Parameters
+    ----------
+    text : str
+        Date, with or without time (e.g. '2019-06-01' or
+        '2019-06-01 12:00:00').
+
+    Returns
+    -------
+    date_added : pandas.Timestamp
+        Last instant included.
+
+    """
+
+    date_added = pd.Timestamp(text)
+    if ':' not in text and date_added == date_added.normalize():
+        date_added += pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+    return date_added
+
+
+def bitacora_as_of(bitacora, round_added=None, date_added=None):
+    """Return the bitacora as it was at a given round and/or date.
+
+    The entries added after the cutoff are discarded, and the entries
+    removed after the cutoff are considered active again.
+
+    Parameters
+    ----------
+    bitacora : pandas.DataFrame
+        Table with the bitacora entries.
+    round_added : int or None
+        Last round included.
+    date_added : pandas.Timestamp or None
+        Last instant included (see parse_date_added).
+
+    Returns
+    -------
+    bitacora : pandas.DataFrame
+        Copy of the selected entries.
+
+    """
+
+    keep = pd.Series(True, index=bitacora.index)
+    undo = pd.Series(False, index=bitacora.index)
+    if round_added is not None:
+        keep &= bitacora['round_added'] <= round_added
+        undo |= (bitacora['round_removed'] > round_added).fillna(False)
+    if date_added is not None:
+        keep &= bitacora['date_added'] <= date_added
+        undo |= (bitacora['date_removed'] > date_added).fillna(False)
+    bitacora = bitacora.loc[keep].copy()
+    undo = undo.loc[keep]
+    bitacora.loc[undo, 'date_removed'] = pd.NaT
+    bitacora.loc[undo, 'round_removed'] = pd.NA
+    bitacora.loc[undo, 'active'] = True
+    return bitacora
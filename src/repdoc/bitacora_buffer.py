@@ -0,0 +1,146 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import numpy as np
+import pandas as pd
+
+
+class BitacoraBuffer:
+    """Columnar buffer with the entries of the bitacora.
+
+    Every column is stored in a preallocated numpy array whose capacity
+    is doubled when it is full, so that appending a new entry does not
+    copy the whole bitacora. The columns of the typed bitacora (see
+    BITACORA_DTYPES) with a numpy dtype are stored with that dtype:
+    float credits, integer semester and code, boolean active flag, and
+    date_added and date_removed as datetime64 (NaT when the entry has
+    not been removed). The string, categorical and nullable integer
+    (rounds, pd.NA when not removed) columns are stored as object
+    arrays, and their dtypes (including the categories) are applied
+    again when the DataFrame employed by the exporters is generated
+    with dataframe(). This DataFrame is reused until the next change.
+
+    Parameters
+    ----------
+    bitacora : pandas.DataFrame
+        Initial bitacora.
+    capacity : int
+        Minimum initial capacity of the buffer.
+
+    """
+
+    def __init__(self, bitacora, capacity=1024):
+        self.columns = bitacora.columns.tolist()
+        # the categories are obtained again when generating the DataFrame
+        self.dtypes = {
+            col: 'category' if isinstance(dtype, pd.CategoricalDtype)
+            else dtype for col, dtype in bitacora.dtypes.items()
+        }
+        self._size = len(bitacora)
+        capacity = max(capacity, 2 * self._size)
+        self._uuids = np.empty(capacity, dtype=object)
+        self._uuids[:self._size] = bitacora.index.to_numpy()
+        self._position = {
+            uuid_bita: i for i, uuid_bita in enumerate(bitacora.index)
+        }
+        self._data = {}
+        for col in self.columns:
+            dtype = bitacora[col].dtype
+            if not (isinstance(dtype, np.dtype) and dtype.kind in 'biufM'):
+                dtype = np.dtype(object)
+            self._data[col] = np.empty(capacity, dtype=dtype)
+            self._data[col][:self._size] = bitacora[col].to_numpy(dtype=dtype)
+        self._dataframe = bitacora
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, uuid_bita):
+        return uuid_bita in self._position
+
+    def _grow(self):
+        capacity = 2 * len(self._uuids)
+        uuids = np.empty(capacity, dtype=object)
+        uuids[:self._size] = self._uuids[:self._size]
+        self._uuids = uuids
+        for col in self.columns:
+            data = np.empty(capacity, dtype=self._data[col].dtype)
+            data[:self._size] = self._data[col][:self._size]
+            self._data[col] = data
+
+    def _set(self, col, i, value):
+        data = self._data[col]
+        if data.dtype.kind == 'M':
+            # numpy arrays do not accept pd.NaT
+            value = pd.Timestamp(value).to_datetime64()
+        data[i] = value
+
+    def append(self, uuid_bita, data_row):
+        """Append a new entry to the bitacora.
+
+        Parameters
+        ----------
+        uuid_bita : str
+            UUID of the new entry.
+        data_row : list
+            Values of the new entry (one value per column).
+
+        Returns
+        -------
+        entry : dict
+            Values of the new entry, using the column names as keys.
+
+        """
+
+        if uuid_bita in self._position:
+            raise ValueError(f'Duplicated uuid_bita {uuid_bita}')
+        if len(data_row) != len(self.columns):
+            raise ValueError('Unexpected number of values in new entry')
+        if self._size == len(self._uuids):
+            self._grow()
+        i = self._size
+        for col, value in zip(self.columns, data_row):
+            self._set(col, i, value)
+        self._uuids[i] = uuid_bita
+        self._position[uuid_bita] = i
+        self._size += 1
+        self._dataframe = None
+        return dict(zip(self.columns, data_row))
+
+    def remove(self, uuid_bita, date_removed, round_removed):
+        """Set the removal date and round of a previous entry"""
+
+        i = self._position[uuid_bita]
+        self._set('date_removed', i, date_removed)
+        self._data['round_removed'][i] = round_removed
+        self._data['active'][i] = False
+        self._dataframe = None
+
+    def entry(self, uuid_bita):
+        """Return pandas.Series with the values of an entry"""
+
+        i = self._position[uuid_bita]
+        values = {}
+        for col in self.columns:
+            value = self._data[col][i]
+            if self._data[col].dtype.kind == 'M':
+                value = pd.Timestamp(value)
+            values[col] = value
+        return pd.Series(values, name=uuid_bita)
+
+    def dataframe(self):
+        """Return the bitacora as a pandas.DataFrame"""
+
+        if self._dataframe is None:
+            n = self._size
+            self._dataframe = pd.DataFrame(
+                {col: self._data[col][:n] for col in self.columns},
+                index=pd.Index(self._uuids[:n], name='uuid_bita')
+            ).astype(self.dtypes)
+        return self._dataframe
@@ -0,0 +1,287 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+"""Checkpoints of the state obtained after applying the bitacora"""
+
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import allocation_state
+from .allocation_state import COLUMNS_ASIGNATURAS
+from .allocation_state import COLUMNS_PROFESORES
+from .allocation_state import COLUMNS_TITULACIONES
+from .ctext import ctext
+from . import definitions
+from . import replay_bitacora
+from . import update_ronda_profesor
+from .workbook_cache import cache_key
+
+from .definitions import NULL_UUID
+
+# increase this number when the layout of the checkpoints changes
+CHECKPOINT_VERSION = 3
+
+# number of checkpoints kept for each Excel file and course
+CHECKPOINTS_KEPT = 5
+
+
+def checkpoint_key(xlsxfilename, course, xlsxhash=None):
+    """Return key identifying the checkpoints of an Excel file.
+
+    The key also depends on the code applying the bitacora and on the
+    constants employed by this code (definitions), so that any change
+    in them invalidates the previous checkpoints. The hash of the file
+    content can be provided in xlsxhash (see cache_key).
+
+    """
+
+    return cache_key(xlsxfilename, course,
+                     extra_modules=[allocation_state, definitions,
+                                    replay_bitacora, update_ronda_profesor],
+                     xlsxhash=xlsxhash)
+
+
+def checkpoint_fingerprint(bitacora, nentries):
+    """Return hash of the first nentries of the bitacora.
+
+    Only the columns employed when applying the bitacora are included
+    (in particular, the active flag: removing an entry invalidates the
+    checkpoints that include it).
+
+    """
+
+    subset = bitacora.iloc[:nentries][
+        ['uuid_prof', 'uuid_titu', 'uuid_asig', 'creditos_elegidos',
+         'explicacion', 'active']
+    ].astype({'uuid_prof': str, 'uuid_titu': str, 'uuid_asig': str})
+    h = hashlib.sha256()
+    h.update(f'{CHECKPOINT_VERSION} {nentries}'.encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(subset, index=True).to_numpy())
+    return h.hexdigest()
+
+
+def _state_to_dict(arrays, ids, index, columns):
+    """Return selected rows and columns as a dictionary of lists"""
+
+    output = {'index': list(index)}
+    for col in columns:
+        output[col] = arrays[col][ids].tolist()
+    return output
+
+
+def write_checkpoint(cache_dir, key, xlsxfilename, course, bitacora, state):
+    """Store the state obtained after applying the whole bitacora.
+
+    Only the degrees and subjects with active entries in the bitacora
+    are included (the remaining ones keep their initial values). The
+    CHECKPOINTS_KEPT most recent checkpoints are kept.
+
+    """
+
+    nentries = len(bitacora)
+    selected = bitacora.loc[bitacora['active'] &
+                            (bitacora['uuid_titu'] != NULL_UUID)]
+    uuids_titu = pd.unique(selected['uuid_titu'].astype(str))
+    asignaturas = {}
+    for uuid_titu in uuids_titu:
+        titulacion = state.tabla_titulaciones.loc[uuid_titu, 'titulacion']
+        uuids_asig = pd.unique(selected.loc[
+            selected['uuid_titu'] == uuid_titu, 'uuid_asig'
+        ].astype(str))
+        asignaturas[titulacion] = _state_to_dict(
+            state.asignaturas,
+            state.ids_asignaturas([uuid_titu], uuids_asig),
+            uuids_asig, COLUMNS_ASIGNATURAS
+        )
+    checkpoint = {
+        'xlsxfile': os.path.basename(xlsxfilename),
+        'course': course,
+        'nentries': nentries,
+        'fingerprint': checkpoint_fingerprint(bitacora, nentries),
+        'titulaciones': _state_to_dict(state.titulaciones,
+                                       state.ids_titulaciones(uuids_titu),
+                                       uuids_titu, COLUMNS_TITULACIONES),
+        'asignaturas': asignaturas,
+        'profesores': _state_to_dict(state.profesores,
+                                     np.arange(len(state.tabla_profesores)),
+                                     state.tabla_profesores.index,
+                                     COLUMNS_PROFESORES)
+    }
+
+    dirname = os.path.join(cache_dir, 'checkpoints')
+    os.makedirs(dirname, exist_ok=True)
+    fname = os.path.join(
+        dirname, f'{key}_{nentries:08d}_{checkpoint["fingerprint"][:8]}.json'
+    )
+    with open(fname + '.tmp', 'wt') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(fname + '.tmp', fname)
+
+    # remove older checkpoints, and those corresponding to previous
+    # versions of the same Excel file and course
+    fnames = sorted(glob.glob(os.path.join(dirname, f'{key}_*.json')))
+    for oldfname in fnames[:-CHECKPOINTS_KEPT]:
+        os.remove(oldfname)
+    for oldfname in glob.glob(os.path.join(dirname, '*.json')):
+        if os.path.basename(oldfname).startswith(key):
+            continue
+        try:
+            with open(oldfname, 'rt') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if metadata.get('xlsxfile') == os.path.basename(xlsxfilename) and \
+                metadata.get('course') == course:
+            os.remove(oldfname)
+    print(f'   checkpoint with {nentries} entries saved in {fname}')
+
+
+def read_checkpoint(cache_dir, key, bitacora):
+    """Return the most recent checkpoint valid for the bitacora.
+
+    A checkpoint is valid when the first entries of the bitacora
+    (those applied when the checkpoint was created) have not changed.
+
+    Returns
+    -------
+    checkpoint : dict or None
+        Content of the checkpoint, or None if there is no valid
+        checkpoint.
+
+    """
+
+    dirname = os.path.join(cache_dir, 'checkpoints')
+    fnames = sorted(glob.glob(os.path.join(dirname, f'{key}_*.json')))
+    for fname in reversed(fnames):
+        try:
+            with open(fname, 'rt') as f:
+                checkpoint = json.load(f)
+            nentries = checkpoint['nentries']
+            if nentries > len(bitacora):
+                continue
+            if checkpoint['fingerprint'] == \
+                    checkpoint_fingerprint(bitacora, nentries):
+                print(f'   using checkpoint with {nentries} entries '
+                      f'({fname})')
+                return checkpoint
+        except (OSError, ValueError, KeyError) as e:
+            print(ctext(f'WARNING: ignoring invalid checkpoint {fname} '
+                        f'({e})', fg='red'))
+    return None
+
+
+def restore_checkpoint(checkpoint, state, bitacora):
+    """Set the state stored in the checkpoint (updated in place).
+
+    The active assignments of each subject are not stored in the
+    checkpoint, but obtained from the entries of the bitacora included
+    in it.
+
+    """
+
+    def restore(arrays, ids, values, columns):
+        for col in columns:
+            arrays[col][ids] = values[col]
+
+    values = checkpoint['titulaciones']
+    restore(state.titulaciones, state.ids_titulaciones(values['index']),
+            values, COLUMNS_TITULACIONES)
+    uuids_titu = pd.Series(state.tabla_titulaciones.index,
+                           index=state.tabla_titulaciones['titulacion'])
+    for titulacion, values in checkpoint['asignaturas'].items():
+        ids = state.ids_asignaturas([uuids_titu[titulacion]],
+                                    values['index'])
+        restore(state.asignaturas, ids, values, COLUMNS_ASIGNATURAS)
+    values = checkpoint['profesores']
+    restore(state.profesores, state.ids_profesores(values['index']),
+            values, COLUMNS_PROFESORES)
+    state.update_totales()
+    entries = bitacora.iloc[:checkpoint['nentries']]
+    entries = entries.loc[entries['active'] &
+                          (entries['uuid_titu'] != NULL_UUID)]
+    state.add_asignaciones(
+        entries.index,
+        state.ids_asignaturas(entries['uuid_titu'],
+                              entries['uuid_asig']).tolist(),
+        state.ids_profesores(entries['uuid_prof']).tolist()
+    )
+
+
+def replay_from_checkpoint(bitacora, state, uuid_registry, cache_dir=None,
+                           key=None):
+    """Apply the bitacora starting from the newest valid checkpoint.
+
+    The state is updated in place, as in replay_bitacora(). If
+    cache_dir is None, or there is no valid checkpoint, the whole
+    bitacora is applied.
+
+    Returns
+    -------
+    nentries : int
+        Number of entries included in the checkpoint employed (zero if
+        no checkpoint was employed).
+
+    """
+
+    if cache_dir is None:
+        checkpoint = None
+    else:
+        checkpoint = read_checkpoint(cache_dir, key, bitacora)
+    if checkpoint is None:
+        nentries = 0
+    else:
+        nentries = checkpoint['nentries']
+        restore_checkpoint(checkpoint, state, bitacora)
+        uuid_registry.update(bitacora.index[:nentries])
+    # apply only the entries not included in the checkpoint
+    replay_bitacora.replay_bitacora(bitacora.iloc[nentries:], state,
+                                    uuid_registry)
+    return nentries
+
+
+def compare_replay(state, state_full):
+    """Compare the state obtained with and without checkpoint.
+
+    The values are compared after copying them to the tables of each
+    state. The credits are computed with integer micro-credits, so
+    both states must be identical.
+
+    Parameters
+    ----------
+    state, state_full : AllocationState
+        State obtained with and without checkpoint.
+
+    Raises
+    ------
+    ValueError
+        If any value differs.
+
+    """
+
+    tablas = state.to_tables()
+    tablas_full = state_full.to_tables()
+    pairs = [(tablas[0], tablas_full[0], COLUMNS_TITULACIONES)]
+    for titulacion in tablas_full[1].keys():
+        pairs.append((tablas[1][titulacion], tablas_full[1][titulacion],
+                      COLUMNS_ASIGNATURAS + ['nuevo_profesor']))
+    pairs.append((tablas[2], tablas_full[2], COLUMNS_PROFESORES))
+    for table, table_full, columns in pairs:
+        for col in columns:
+            same = table[col].to_numpy() == table_full[col].to_numpy()
+            if not np.all(same):
+                uuid = table.index[np.argmin(same)]
+                raise ValueError(f'Checkpoint verification failed: {col} '
+                                 f'of {uuid} is {table.loc[uuid, col]} '
+                                 f'instead of {table_full.loc[uuid, col]}')
+    print(ctext('Checkpoint verification: OK', fg='green'))
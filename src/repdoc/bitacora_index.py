@@ -0,0 +1,91 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import pandas as pd
+
+from .definitions import NULL_UUID
+
+
+class BitacoraIndex:
+    """In-memory index of the active entries of the bitacora.
+
+    The active entries (subject not removed, excluding the
+    activate/deactivate entries of the teachers) are grouped by teacher
+    and by subject, preserving the order of the bitacora. The index is
+    updated incrementally with every change of the bitacora, providing
+    the same interface as BitacoraSqlite.
+
+    Parameters
+    ----------
+    bitacora : pandas.DataFrame
+        Initial bitacora.
+
+    """
+
+    def __init__(self, bitacora):
+        self.columns = bitacora.columns.tolist()
+        self._entries = {}
+        # dictionaries (instead of sets) to preserve insertion order
+        self._profesores = {}
+        self._asignaturas = {}
+        self.load(bitacora)
+
+    def load(self, bitacora):
+        """Replace the content of the index by the bitacora"""
+
+        self._entries.clear()
+        self._profesores.clear()
+        self._asignaturas.clear()
+        active = bitacora.loc[bitacora['active'] &
+                              (bitacora['uuid_titu'] != NULL_UUID)]
+        for uuid_bita, row in zip(active.index,
+                                  active.itertuples(index=False, name=None)):
+            self._insert(uuid_bita, row)
+
+    def _insert(self, uuid_bita, row):
+        entry = dict(zip(self.columns, row))
+        self._entries[uuid_bita] = row
+        self._profesores.setdefault(entry['uuid_prof'], {})[uuid_bita] = None
+        self._asignaturas.setdefault(entry['uuid_asig'], {})[uuid_bita] = None
+
+    def add(self, uuid_bita, entry):
+        """Include a new entry of the bitacora"""
+
+        if entry['active'] and entry['uuid_titu'] != NULL_UUID:
+            self._insert(uuid_bita, tuple(entry[col] for col in self.columns))
+
+    def remove(self, uuid_bita, date_removed, round_removed):
+        """Remove a previous entry of the bitacora"""
+
+        row = self._entries.pop(uuid_bita, None)
+        if row is None:
+            return
+        entry = dict(zip(self.columns, row))
+        del self._profesores[entry['uuid_prof']][uuid_bita]
+        del self._asignaturas[entry['uuid_asig']][uuid_bita]
+
+    def _select(self, uuids):
+        seleccion = pd.DataFrame.from_records(
+            [self._entries[uuid_bita] for uuid_bita in uuids],
+            columns=self.columns
+        )
+        seleccion.index = pd.Index(list(uuids), name='uuid_bita')
+        return seleccion
+
+    def seleccion_profesor(self, uuid_prof):
+        """Return active entries (selected subjects) of a teacher"""
+        return self._select(self._profesores.get(uuid_prof, {}))
+
+    def seleccion_asignatura(self, uuid_asig):
+        """Return active entries (selected teachers) of a subject"""
+        return self._select(self._asignaturas.get(uuid_asig, {}))
+
+    def close(self):
+        """Nothing to be done (kept for compatibility with BitacoraSqlite)"""
+        pass
@@ -0,0 +1,200 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .ctext import ctext
+from .typed_bitacora import typed_bitacora
+
+from .definitions import BITACORA_DATE_FORMAT
+from .definitions import DEFAULT_BITACORA_XLSX_FILENAME
+
+
+def bitacora_xlsxfilename(bitacora):
+    """Return name of the Excel file where the bitacora is saved"""
+
+    if bitacora is None:
+        return DEFAULT_BITACORA_XLSX_FILENAME
+    return bitacora.name
+
+
+def _json_default(value):
+    """Convert numpy and pandas scalars to Python objects"""
+
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(BITACORA_DATE_FORMAT)
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'Object of type {type(value)} is not JSON serializable')
+
+
+class BitacoraJournal:
+    """Append-only journal with the changes of the bitacora.
+
+    Every change of the bitacora (new entry or removal of a previous
+    entry) is appended as a JSON line to the journal file, instead of
+    rewriting the whole Excel file. A removal that could not be
+    completed is cancelled by a later 'restore' line. The Excel file
+    is only updated when calling compact(), which also empties the
+    journal.
+
+    Parameters
+    ----------
+    xlsxfilename : str
+        Excel file with the bitacora. The journal is stored in the same
+        directory, replacing the extension by '_journal.jsonl'.
+    fsync_every : int
+        Number of changes between calls to os.fsync(). The lines are
+        always flushed to the operating system after each change. If
+        zero, os.fsync() is only called when closing the journal.
+
+    """
+
+    def __init__(self, xlsxfilename, fsync_every=1):
+        self.xlsxfilename = xlsxfilename
+        self.filename = os.path.splitext(xlsxfilename)[0] + '_journal.jsonl'
+        self.fsync_every = fsync_every
+        self._file = None
+        self._pending = 0
+
+    def exists(self):
+        """Return True if the journal contains changes"""
+        return os.path.isfile(self.filename) and \
+            os.path.getsize(self.filename) > 0
+
+    def read(self, bitacora):
+        """Return bitacora including the changes stored in the journal.
+
+        New entries whose UUID is already in the bitacora are ignored,
+        so that the journal can be applied again if the program stopped
+        after updating the Excel file but before emptying the journal.
+
+        """
+
+        if not self.exists():
+            return bitacora
+
+        with open(self.filename, 'rt') as f:
+            lines = f.readlines()
+        rows = []
+        uuids = []
+        uuids_set = set()
+        removed = []  # removals and restorations, in order
+        for i, line in enumerate(lines):
+            try:
+                change = json.loads(line)
+            except ValueError:
+                if i == len(lines) - 1:
+                    # incomplete last line (unexpected program stop)
+                    print(ctext(f'WARNING: ignoring incomplete last line '
+                                f'of {self.filename}', fg='red'))
+                    break
+                raise
+            if change['op'] == 'add':
+                uuid_bita = change['uuid_bita']
+                if uuid_bita in bitacora.index or uuid_bita in uuids_set:
+                    continue
+                uuids.append(uuid_bita)
+                uuids_set.add(uuid_bita)
+                rows.append(change['entry'])
+            elif change['op'] in ('remove', 'restore'):
+                removed.append((i + 1, change))
+            else:
+                raise ValueError(f'Unexpected operation in {self.filename}')
+
+        print(f'   {len(lines)} changes recovered from {self.filename}')
+        if len(rows) > 0:
+            new_entries = typed_bitacora(pd.DataFrame(data=rows, index=uuids))
+            # the categories of both tables are merged when applying
+            # the dtypes again
+            bitacora = typed_bitacora(pd.concat([bitacora, new_entries]))
+        for nline, change in removed:
+            uuid_bita = change['uuid_bita']
+            if uuid_bita not in bitacora.index:
+                raise ValueError(f'Unknown UUID {uuid_bita} in line '
+                                 f'{nline} of {self.filename}')
+            if change['op'] == 'restore':
+                bitacora.loc[uuid_bita, 'date_removed'] = pd.NaT
+                bitacora.loc[uuid_bita, 'round_removed'] = pd.NA
+                bitacora.loc[uuid_bita, 'active'] = True
+                continue
+            bitacora.loc[uuid_bita, 'date_removed'] = pd.Timestamp(
+                change['date_removed']
+            )
+            bitacora.loc[uuid_bita, 'round_removed'] = change['round_removed']
+            bitacora.loc[uuid_bita, 'active'] = False
+        return bitacora
+
+    def _append(self, change):
+        if self._file is None:
+            self._file = open(self.filename, 'at')
+        self._file.write(json.dumps(change, ensure_ascii=False,
+                                    default=_json_default) + '\n')
+        self._file.flush()
+        self._pending += 1
+        if self.fsync_every > 0 and self._pending >= self.fsync_every:
+            self.sync()
+
+    def add(self, uuid_bita, entry):
+        """Store a new entry of the bitacora.
+
+        Parameters
+        ----------
+        uuid_bita : str
+            UUID of the new entry.
+        entry : dict or pandas.Series
+            Values of the new entry (one value per column).
+
+        """
+
+        self._append({'op': 'add', 'uuid_bita': uuid_bita,
+                      'entry': dict(entry)})
+
+    def remove(self, uuid_bita, date_removed, round_removed):
+        """Store the removal of a previous entry of the bitacora"""
+
+        self._append({'op': 'remove', 'uuid_bita': uuid_bita,
+                      'date_removed': date_removed,
+                      'round_removed': round_removed})
+
+    def restore(self, uuid_bita):
+        """Cancel the last removal of an entry of the bitacora"""
+
+        self._append({'op': 'restore', 'uuid_bita': uuid_bita})
+
+    def sync(self):
+        """Force the journal to be written to disk"""
+
+        if self._file is not None and self._pending > 0:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def compact(self, bitacora):
+        """Save the bitacora in the Excel file and empty the journal"""
+
+        self.close()
+        tmpfilename = self.xlsxfilename + '.tmp.xlsx'
+        bitacora.to_excel(tmpfilename, header=True)
+        os.replace(tmpfilename, self.xlsxfilename)
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def close(self):
+        """Close the journal file"""
+
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,134 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from .definitions import BITACORA_DATE_FORMAT
+from .definitions import NULL_UUID
+
+
+def _sql_value(value):
+    """Convert numpy and pandas scalars to Python objects"""
+
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(BITACORA_DATE_FORMAT)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class BitacoraSqlite:
+    """Copy of the bitacora stored in an SQLite database.
+
+    The entries are indexed by teacher, degree and subject, together
+    with the active flag, so that the selections employed by the GUI
+    and the HTML exporters do not need to scan the whole bitacora.
+    Every change is stored in its own transaction.
+
+    The database is only a throwaway index, without crash safety: the
+    table is dropped and rebuilt from the Excel file and its journal
+    (the reference copy of the bitacora) every time the program
+    starts, and its content is never read back into the bitacora.
+    Reusing the database between executions would require checking
+    it against the journal when reopening it.
+
+    Parameters
+    ----------
+    xlsxfilename : str
+        Excel file with the bitacora. The database is stored in the
+        same directory, replacing the extension by '.sqlite'.
+    columns : list of str
+        Columns of the bitacora (excluding uuid_bita).
+
+    """
+
+    def __init__(self, xlsxfilename, columns):
+        self.filename = os.path.splitext(xlsxfilename)[0] + '.sqlite'
+        self.columns = list(columns)
+        # the database is created in the thread loading the tables and
+        # employed afterwards in the GUI thread (never concurrently)
+        self._conn = sqlite3.connect(self.filename, check_same_thread=False)
+        sqlcolumns = ', '.join(f'"{col}"' for col in self.columns)
+        with self._conn:
+            self._conn.execute('DROP TABLE IF EXISTS bitacora')
+            self._conn.execute(
+                f'CREATE TABLE bitacora (uuid_bita TEXT PRIMARY KEY, '
+                f'{sqlcolumns})'
+            )
+            for col in ['uuid_prof', 'uuid_asig', 'uuid_titu']:
+                self._conn.execute(
+                    f'CREATE INDEX idx_{col} ON bitacora ({col}, active)'
+                )
+        self._insert = \
+            f'INSERT INTO bitacora (uuid_bita, {sqlcolumns}) ' + \
+            f'VALUES ({", ".join(["?"] * (len(self.columns) + 1))})'
+
+    def _row(self, uuid_bita, entry):
+        return [uuid_bita] + [_sql_value(entry[col]) for col in self.columns]
+
+    def load(self, bitacora):
+        """Replace the content of the database by the bitacora"""
+
+        rows = [self._row(uuid_bita, entry)
+                for uuid_bita, entry in zip(
+                    bitacora.index,
+                    bitacora.astype(object).to_dict(orient='records')
+                )]
+        with self._conn:
+            self._conn.execute('DELETE FROM bitacora')
+            self._conn.executemany(self._insert, rows)
+
+    def add(self, uuid_bita, entry):
+        """Store a new entry of the bitacora"""
+
+        with self._conn:
+            self._conn.execute(self._insert, self._row(uuid_bita, entry))
+
+    def remove(self, uuid_bita, date_removed, round_removed):
+        """Store the removal of a previous entry of the bitacora"""
+
+        with self._conn:
+            self._conn.execute(
+                'UPDATE bitacora SET date_removed = ?, round_removed = ?, '
+                'active = 0 WHERE uuid_bita = ?',
+                (_sql_value(date_removed), _sql_value(round_removed),
+                 uuid_bita)
+            )
+
+    def _select(self, where='', params=()):
+        sqlcolumns = ', '.join(f'"{col}"' for col in self.columns)
+        rows = self._conn.execute(
+            f'SELECT uuid_bita, {sqlcolumns} FROM bitacora {where} '
+            f'ORDER BY rowid',
+            params
+        ).fetchall()
+        seleccion = pd.DataFrame.from_records(
+            rows, columns=['uuid_bita'] + self.columns, index='uuid_bita'
+        )
+        return seleccion
+
+    def seleccion_profesor(self, uuid_prof):
+        """Return active entries (selected subjects) of a teacher"""
+        return self._select('WHERE uuid_prof = ? AND active = 1 '
+                            'AND uuid_titu != ?', (uuid_prof, NULL_UUID))
+
+    def seleccion_asignatura(self, uuid_asig):
+        """Return active entries (selected teachers) of a subject"""
+        return self._select('WHERE uuid_asig = ? AND active = 1 '
+                            'AND uuid_titu != ?', (uuid_asig, NULL_UUID))
+
+    def close(self):
+        """Close the database"""
+        self._conn.close()
@@ -0,0 +1,73 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import numpy as np
+import pandas as pd
+
+from .ctext import ctext
+
+
+def check_unique_uuids(sources, errmsg='UUIDs are not unique!'):
+    """Check that the UUIDs of one or several tables are unique.
+
+    The check is performed in linear time. When duplicated values are
+    found, every occurrence is displayed, indicating the table and the
+    row (starting at 1) where it appears, and an exception is raised.
+
+    Parameters
+    ----------
+    sources : list of tuples
+        Each tuple contains a label identifying the source table and
+        either a pandas.DataFrame (whose index contains the UUIDs) or
+        a list-like object with the UUIDs.
+    errmsg : str
+        Message of the exception raised when there are duplicates.
+
+    Raises
+    ------
+    ValueError
+        If the same UUID appears more than once.
+
+    """
+
+    uuids = []
+    isource = []
+    irow = []
+    for i, (label, table) in enumerate(sources):
+        if isinstance(table, pd.DataFrame):
+            values = table.index.to_numpy(dtype=object)
+        else:
+            values = np.asarray(list(table), dtype=object)
+        uuids.append(values)
+        isource.append(np.full(len(values), i))
+        irow.append(np.arange(1, len(values) + 1))
+
+    if len(uuids) == 0:
+        return
+
+    uuids = pd.Index(np.concatenate(uuids))
+    isduplicated = uuids.duplicated(keep=False)
+    if not isduplicated.any():
+        return
+
+    isource = np.concatenate(isource)[isduplicated]
+    irow = np.concatenate(irow)[isduplicated]
+    clashes = pd.DataFrame({
+        'uuid': uuids[isduplicated],
+        'isource': isource,
+        'irow': irow
+    })
+    for uuid, group in clashes.groupby('uuid', sort=False):
+        print(ctext(f'Duplicated UUID: {uuid}', fg='red'))
+        for i, row in zip(group['isource'], group['irow']):
+            label, table = sources[i]
+            print(f'    -> {label}, row {row}')
+            if isinstance(table, pd.DataFrame):
+                print(table.iloc[row - 1])
+    raise ValueError(errmsg)
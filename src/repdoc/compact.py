@@ -0,0 +1,53 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import argparse
+
+from .bitacora_journal import BitacoraJournal
+from .ctext import ctext
+from .read_bitacora import read_bitacora
+
+
+def compact(args=None):
+    """Save the changes stored in the journal in the bitacora Excel file.
+
+    The GUI saves the Excel file when exiting, so this command is only
+    needed after an unexpected stop of the program (it must not be
+    executed while the GUI is running).
+
+    Parameters
+    ----------
+    args : list of str or None
+        Command-line arguments (excluding 'compact'). If None,
+        sys.argv is employed.
+
+    """
+
+    # parse command-line options
+    parser = argparse.ArgumentParser(
+        prog='repdoc compact',
+        description='Save the journal of the bitacora in its Excel file'
+    )
+
+    parser.add_argument("bitacora",
+                        help="Excel file with the bitacora",
+                        type=argparse.FileType())
+
+    args = parser.parse_args(args)
+
+    journal = BitacoraJournal(args.bitacora.name)
+    if not journal.exists():
+        print(f'Nothing to be done: {journal.filename} is empty or '
+              f'does not exist')
+        return
+
+    tabla_bitacora = journal.read(read_bitacora(args.bitacora))
+    journal.compact(tabla_bitacora)
+    print(ctext(f'File {args.bitacora.name} saved ({tabla_bitacora.shape[0]} '
+                f'entries)', fg='blue'))
@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2022 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -9,6 +9,12 @@
 
 import PySimpleGUI as sg
 
+from .definitions import COLOR_ASIGNACION_EVEN
+from .definitions import COLOR_ASIGNATURAS_HEAD
+from .definitions import COLOR_BITACORA_HEAD
+from .definitions import COLOR_TITULACIONES_HEAD
+from .definitions import COLOR_TITULACIONES_ODD
+from .definitions import COLOR_PROFESORES_HEAD
 from .definitions import FLAG_RONDA_NO_ELIGE
 
 
@@ -22,31 +28,17 @@ WIDTH_INPUT_COMBO_CORTO = 50
 WIDTH_INPUT_COMBO = 75
 WIDTH_INPUT_NUMBER = 10
 WIDTH_INPUT_COMMENT = 50
-WIDTH_SPACES_FOR_UUID = 200
-
-COLOR_ASIGNACION_HEAD = '#3A4B53'
-COLOR_ASIGNACION_EVEN = '#DFE5E8'
-COLOR_ASIGNACION_ODD = '#F5F7F8'
-COLOR_ASIGNATURAS_HEAD = '#A71614'
-COLOR_ASIGNATURAS_EVEN = '#FCD9D6'
-COLOR_ASIGNATURAS_ODD = '#FEF4F3'
-COLOR_BITACORA_HEAD = '#985C13'
-COLOR_BITACORA_EVEN = '#FEEACD'
-COLOR_BITACORA_ODD = '#FFF9F0'
-COLOR_TITULACIONES_HEAD = '#306732'
-COLOR_TITULACIONES_EVEN = '#DBEEDC'
-COLOR_TITULACIONES_ODD = '#F4FAF4'
-COLOR_PROFESORES_HEAD = '#26326B'
-COLOR_PROFESORES_EVEN = '#D8DCF0'
-COLOR_PROFESORES_ODD = '#F3F4FB'
-COLOR_NO_DISPONIBLE = '#999'
 
 COLOR_DISABLED_BUTTON = '#AAA'
 
 
-def define_gui_layout(fontname, fontsize, num_titulaciones):
+def define_gui_layout(fontname, fontsize, num_titulaciones,
+                      num_loading_stages=1):
     """Define GUI layout
 
+    The controls that start the subject assignment are disabled, and
+    must be enabled once the tables have been loaded.
+
     """
 
     if fontname is None:
@@ -154,6 +146,13 @@ def define_gui_layout(fontname, fontsize, num_titulaciones):
                         key='_summary_beccol_')
                 ]]
     # ---
+    layout += [[sg.Text('Cargando...', text_color='#aaaaaa',
+                        size=(WIDTH_HLINE_SUMMARY, 1),
+                        key='_estado_carga_'),
+                sg.ProgressBar(num_loading_stages, orientation='h',
+                               size=(20, 10),
+                               key='_progreso_carga_')]]
+    # ---
     layout += [[sg.Text('_' * WIDTH_HLINE)]]
     # ---
 
@@ -162,6 +161,7 @@ def define_gui_layout(fontname, fontsize, num_titulaciones):
                             default=False,
                             change_submits=True,
                             auto_size_text=True,
+                            disabled=True,
                             key='_excluir_asignaturas_beccol_')],
                # ---
                [sg.Text('Ronda:', size=(WIDTH_TEXT_LABEL, 1),
@@ -172,6 +172,7 @@ def define_gui_layout(fontname, fontsize, num_titulaciones):
                 sg.Spin([i for i in range(FLAG_RONDA_NO_ELIGE)],
                         initial_value=0,
                         change_submits=True,
+                        disabled=True,
                         key='_ronda_'),
                 sg.Text('(0: selecciona todos los profesores)',
                         text_color='#aaaaaa',
@@ -180,6 +181,7 @@ def define_gui_layout(fontname, fontsize, num_titulaciones):
                           font=(fontname, fontsize),
                           disabled_button_color=COLOR_DISABLED_BUTTON,
                           focus=True,
+                          disabled=True,
                           key='_establecer_ronda_'),
                 sg.Text('      Nº de profesores seleccionados:',
                         text_color='#aaaaaa', auto_size_text=True),
@@ -306,7 +308,16 @@ def define_gui_layout(fontname, fontsize, num_titulaciones):
                           font=(fontname, fontsize),
                           disabled_button_color=COLOR_DISABLED_BUTTON,
                           key='_cancelar_'),
-                sg.Text(' ', size=(52, 1)),
+                sg.Text(' ', size=(20, 1)),
+                sg.Button('Deshacer', disabled=True,
+                          font=(fontname, fontsize),
+                          disabled_button_color=COLOR_DISABLED_BUTTON,
+                          key='_deshacer_'),
+                sg.Button('Rehacer', disabled=True,
+                          font=(fontname, fontsize),
+                          disabled_button_color=COLOR_DISABLED_BUTTON,
+                          key='_rehacer_'),
+                sg.Text(' ', size=(20, 1)),
                 sg.Button('Salir',
                           font=(fontname, fontsize),
                           disabled_button_color=COLOR_DISABLED_BUTTON,
@@ -9,12 +9,66 @@
 
 """definitions"""
 
+# columns of the bitacora copied from the teacher and subject tables
+CSV_COLNAMES_PROFESOR = ['apellidos', 'nombre', 'categoria']
+CSV_COLNAMES_ASIGNATURA = ['curso', 'semestre', 'codigo', 'asignatura',
+                           'area', 'creditos_iniciales', 'comentarios',
+                           'grupo']
+CSV_COLVALUES_ASIGNATURA_NULL = ['-', 0, 0, '-',
+                                 '-', 0.0, '-',
+                                 '-']
+# columns of the bitacora and their dtypes
+BITACORA_DTYPES = {
+    'uuid_prof': 'category',
+    'uuid_titu': 'category',
+    'uuid_asig': 'category',
+    'date_added': 'datetime64[s]',
+    'round_added': 'Int64',
+    'date_removed': 'datetime64[s]',  # NaT if not removed
+    'round_removed': 'Int64',  # <NA> if not removed
+    'creditos_elegidos': 'float64',
+    'explicacion': 'str',
+    'apellidos': 'category',
+    'nombre': 'category',
+    'categoria': 'category',
+    'curso': 'category',
+    'semestre': 'int64',
+    'codigo': 'int64',
+    'asignatura': 'category',
+    'area': 'category',
+    'creditos_iniciales': 'float64',
+    'comentarios': 'str',
+    'grupo': 'str',
+    'active': 'bool'  # False if removed
+}
+BITACORA_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 DEFAULT_BITACORA_XLSX_FILENAME = 'repdoc_bitacora.xlsx'
+DEFAULT_CACHE_DIR = '.repdoc_cache'
 CREDITOS_ASIGNATURA = 4.5
 FLAG_RONDA_NO_ELIGE = 99
+MICROCREDITOS = 1000000  # micro-créditos por crédito
 NULL_UUID = 'zzzzzzzz-zzzz-zzzz-zzzz-zzzzzzzzzzzz'
 PRIMERA_RONDA_RYC = 2
 ROUND_ERROR = 0.00001  # créditos
 TEXT_ACTIVA_ELECCION = 'Activa elección en rondas'
 TEXT_FINALIZA_ELECCION = 'Finaliza elección en rondas'
 VALID_COURSES = ['2019-2020', '2020-2021', '2021-2022', '2022-2023', '2023-2024', '2024-2025', '2025-2026', '2026-2027']
+WIDTH_SPACES_FOR_UUID = 200
+
+# colours employed in the GUI and in the HTML files
+COLOR_ASIGNACION_HEAD = '#3A4B53'
+COLOR_ASIGNACION_EVEN = '#DFE5E8'
+COLOR_ASIGNACION_ODD = '#F5F7F8'
+COLOR_ASIGNATURAS_HEAD = '#A71614'
+COLOR_ASIGNATURAS_EVEN = '#FCD9D6'
+COLOR_ASIGNATURAS_ODD = '#FEF4F3'
+COLOR_BITACORA_HEAD = '#985C13'
+COLOR_BITACORA_EVEN = '#FEEACD'
+COLOR_BITACORA_ODD = '#FFF9F0'
+COLOR_TITULACIONES_HEAD = '#306732'
+COLOR_TITULACIONES_EVEN = '#DBEEDC'
+COLOR_TITULACIONES_ODD = '#F4FAF4'
+COLOR_PROFESORES_HEAD = '#26326B'
+COLOR_PROFESORES_EVEN = '#D8DCF0'
+COLOR_PROFESORES_ODD = '#F3F4FB'
+COLOR_NO_DISPONIBLE = '#999'
@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2025 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -8,27 +8,28 @@
 #
 
 import numpy as np
+import pandas as pd
 import re
 
 from .date_last_update import date_last_update
 
-from .define_gui_layout import COLOR_BITACORA_HEAD
-from .define_gui_layout import COLOR_BITACORA_EVEN
-from .define_gui_layout import COLOR_BITACORA_ODD
-from .define_gui_layout import COLOR_NO_DISPONIBLE
-from .definitions import DEFAULT_BITACORA_XLSX_FILENAME
+from .definitions import BITACORA_DATE_FORMAT
+from .definitions import COLOR_BITACORA_HEAD
+from .definitions import COLOR_BITACORA_EVEN
+from .definitions import COLOR_BITACORA_ODD
+from .definitions import COLOR_NO_DISPONIBLE
 
 
-def export_to_html_bitacora(bitacora, filename, course):
-    """Export bitacora to html and xlsx files
+def export_to_html_bitacora(bitacora, course):
+    """Export bitacora to html file
+
+    The Excel file is saved by BitacoraJournal.compact(). The
+    active column is not displayed (the removed entries are shown
+    with a different background colour).
 
     """
 
-    if filename is None:
-        fname = DEFAULT_BITACORA_XLSX_FILENAME
-    else:
-        fname = filename.name
-    bitacora.to_excel(fname, header=True)
+    colnames = [col for col in bitacora.columns if col != 'active']
 
     f = open('repdoc_bitacora.html', 'wt')
     f.write('''
@@ -102,7 +103,7 @@ def export_to_html_bitacora(bitacora, filename, course):
     f.write('<td style="background: #fff;"></td>')
     f.write('<th style="text-align: center;">(1)<br>uuid bita</th>\n')
     icol = 1
-    for colname in bitacora.columns.tolist():
+    for colname in colnames:
         icol += 1
         f.write('<th style="text-align: center;">' +
                 '({:d})<br>'.format(icol) +
@@ -119,7 +120,8 @@ def export_to_html_bitacora(bitacora, filename, course):
     irow = len(bitacora.index) + 1
     for uuid_bita in reversed(bitacora.index):
         irow -= 1
-        status = str(bitacora.loc[uuid_bita]['date_removed']) == 'None'
+        entry = bitacora.loc[uuid_bita]
+        status = entry['active']
         if status:
             f.write('\n<tr>\n')
         else:
@@ -130,20 +132,26 @@ def export_to_html_bitacora(bitacora, filename, course):
                 'right;">')
         f.write('{:d}</td>\n'.format(irow))
         f.write('<td>{}</td>\n'.format(uuid_bita))
-        for colname in bitacora.columns.tolist():
-            typecol = type(bitacora.loc[uuid_bita][colname])
-            if typecol in [np.dtype(np.int32), np.dtype(np.int64)]:
+        for colname in colnames:
+            value = entry[colname]
+            typecol = type(value)
+            if pd.isna(value):
+                # date and round of the entries not removed
+                f.write('<td>None</td>\n')
+            elif isinstance(value, pd.Timestamp):
+                f.write('<td>{}</td>\n'.format(
+                    value.strftime(BITACORA_DATE_FORMAT)
+                ))
+            elif typecol in [np.dtype(np.int32), np.dtype(np.int64)]:
                 f.write('<td style="text-align: center;">{}</td>\n'.format(
-                    bitacora.loc[uuid_bita][colname]
+                    value
                 ))
             elif typecol in [np.dtype(np.float32), np.dtype(np.float64)]:
                 f.write('<td style="text-align: center;">{}</td>\n'.format(
-                    round(bitacora.loc[uuid_bita][colname], 4)
+                    round(value, 4)
                 ))
             else:
-                f.write('<td>{}</td>\n'.format(
-                    bitacora.loc[uuid_bita][colname]
-                ))
+                f.write('<td>{}</td>\n'.format(value))
         f.write('</tr>\n')
 
     f.write('\n</tbody>\n\n')
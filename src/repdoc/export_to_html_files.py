@@ -0,0 +1,100 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+from .ctext import ctext
+from .date_last_update import date_last_update
+from .export_to_html_bitacora import export_to_html_bitacora
+from .export_to_html_index import export_to_html_index
+from .export_to_html_profesores import export_to_html_profesores
+from .export_to_html_resultado import export_to_html_resultado
+from .export_to_html_tablas_asignaturas import \
+    export_to_html_tablas_asignaturas
+from .export_to_html_titulaciones import export_to_html_titulaciones
+
+
+def export_to_html_pending(filename, title, course):
+    """Replace HTML file by a page indicating that it is outdated"""
+
+    with open(filename, 'wt') as f:
+        f.write(f'''
+<!DOCTYPE html>
+
+<html lang="en">
+
+<head>
+  <meta charset="utf-8">
+  <title>{title}</title>
+</head>
+
+<body>
+
+<h1>Reparto Docente FTA<br><small>Curso {course}</small></h1>
+<h2>{title}</h2>
+<p>Página pendiente de actualizar: se generará de nuevo tras el siguiente
+cambio en el reparto.</p>
+''' + date_last_update() + '''
+</body>
+
+</html>
+''')
+
+
+def export_to_html_files(tabla_titulaciones, bigdict_tablas_asignaturas,
+                         tabla_profesores, tabla_bitacora, indice_bitacora,
+                         course, lazy=False):
+    """Export every HTML file in the current directory.
+
+    Parameters
+    ----------
+    tabla_titulaciones : pandas.DataFrame
+        Table of degrees.
+    bigdict_tablas_asignaturas : dict or LazyTablasAsignaturas
+        Dictionary with the table of subjects of each degree.
+    tabla_profesores : pandas.DataFrame
+        Table of teachers.
+    tabla_bitacora : pandas.DataFrame
+        Table with the bitacora entries.
+    indice_bitacora : BitacoraIndex or BitacoraSqlite
+        Indexed copy of the bitacora.
+    course : str
+        Academic course (e.g. 2019-2020).
+    lazy : bool
+        If True, the files requiring every subject table are replaced
+        by pages indicating that they are pending (see
+        export_to_html_pending).
+
+    """
+
+    export_to_html_index(course)
+    export_to_html_bitacora(tabla_bitacora, course)
+    export_to_html_titulaciones(tabla_titulaciones, course)
+    if lazy:
+        # these files require every subject table: they are generated
+        # after the first change of the assignment (confirm, remove,
+        # finalize, undo or redo), which loads the remaining tables;
+        # until then the files of a previous execution are overwritten,
+        # so that outdated pages are neither displayed nor uploaded to
+        # the web server
+        print(ctext('Skipping initial export of subject tables and results '
+                    '(--lazy)', fg='blue'))
+        for i, titulacion in enumerate(bigdict_tablas_asignaturas.keys()):
+            export_to_html_pending(f'repdoc_titulacion_{i + 1:02d}.html',
+                                   f'Listado de asignaturas: {titulacion}',
+                                   course)
+        export_to_html_pending('repdoc_disponibles.html',
+                               'Listado de asignaturas disponibles', course)
+        export_to_html_pending('repdoc_resultado.html',
+                               'Resultado final del reparto', course)
+    else:
+        export_to_html_tablas_asignaturas(bigdict_tablas_asignaturas, course)
+    export_to_html_profesores(tabla_profesores, tabla_bitacora, 0, course,
+                              indice_bitacora)
+    if not lazy:
+        export_to_html_resultado(tabla_profesores, bigdict_tablas_asignaturas,
+                                 tabla_bitacora, course, indice_bitacora)
@@ -12,10 +12,10 @@ import re
 
 from .date_last_update import date_last_update
 
-from .define_gui_layout import COLOR_BITACORA_HEAD
-from .define_gui_layout import COLOR_BITACORA_EVEN
-from .define_gui_layout import COLOR_BITACORA_ODD
-from .define_gui_layout import COLOR_NO_DISPONIBLE
+from .definitions import COLOR_BITACORA_HEAD
+from .definitions import COLOR_BITACORA_EVEN
+from .definitions import COLOR_BITACORA_ODD
+from .definitions import COLOR_NO_DISPONIBLE
 from .definitions import DEFAULT_BITACORA_XLSX_FILENAME
 
 
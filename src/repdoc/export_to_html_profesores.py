@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2025 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -9,21 +9,25 @@
 
 from .date_last_update import date_last_update
 
-from .define_gui_layout import COLOR_ASIGNACION_HEAD
-from .define_gui_layout import COLOR_ASIGNACION_EVEN
-from .define_gui_layout import COLOR_ASIGNACION_ODD
-from .define_gui_layout import COLOR_NO_DISPONIBLE
-from .define_gui_layout import COLOR_PROFESORES_HEAD
-from .define_gui_layout import COLOR_PROFESORES_EVEN
-from .define_gui_layout import COLOR_PROFESORES_ODD
+from .definitions import COLOR_ASIGNACION_HEAD
+from .definitions import COLOR_ASIGNACION_EVEN
+from .definitions import COLOR_ASIGNACION_ODD
+from .definitions import COLOR_NO_DISPONIBLE
+from .definitions import COLOR_PROFESORES_HEAD
+from .definitions import COLOR_PROFESORES_EVEN
+from .definitions import COLOR_PROFESORES_ODD
 
 from .definitions import FLAG_RONDA_NO_ELIGE
 from .definitions import NULL_UUID
 
 
-def export_to_html_profesores(tabla_profesores, bitacora, ronda_actual, course):
+def export_to_html_profesores(tabla_profesores, bitacora, ronda_actual, course,
+                              indice_bitacora=None):
     """Export to html tabla_profesores
 
+    When indice_bitacora is provided, it is employed to obtain the
+    active entries of each teacher without scanning the bitacora.
+
     """
 
     # tabla de profesores
@@ -368,11 +372,14 @@ def export_to_html_profesores(tabla_profesores, bitacora, ronda_actual, course):
             f.write('<strong>Siguiente ronda...: </strong><pre>')
             f.write('{0:4d}</pre></font><br><br>\n'.format(ronda))
             # subset of bitacora for the selected teacher
-            seleccion = bitacora.loc[
-                (bitacora['uuid_prof'] == uuid_prof) &
-                (bitacora['date_removed'] == 'None') &
-                (bitacora['uuid_titu'] != NULL_UUID)
-                ].copy()
+            if indice_bitacora is not None:
+                seleccion = indice_bitacora.seleccion_profesor(uuid_prof)
+            else:
+                seleccion = bitacora.loc[
+                    (bitacora['uuid_prof'] == uuid_prof) &
+                    bitacora['active'] &
+                    (bitacora['uuid_titu'] != NULL_UUID)
+                    ].copy()
             # find how many times the selected teacher appears
             ntimes = seleccion.shape[0]
             if ntimes == 0:
@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2025 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -9,9 +9,9 @@
 
 from .date_last_update import date_last_update
 
-from .define_gui_layout import COLOR_ASIGNACION_HEAD
-from .define_gui_layout import COLOR_ASIGNACION_EVEN
-from .define_gui_layout import COLOR_ASIGNACION_ODD
+from .definitions import COLOR_ASIGNACION_HEAD
+from .definitions import COLOR_ASIGNACION_EVEN
+from .definitions import COLOR_ASIGNACION_ODD
 
 from .definitions import NULL_UUID
 
@@ -31,9 +31,13 @@ def insert_separator(f, height=2):
 def export_to_html_resultado(
         tabla_profesores,
         bigdict_tablas_asignaturas,
-        bitacora, course):
+        bitacora, course,
+        indice_bitacora=None):
     """Export to html tabla_resultado
 
+    When indice_bitacora is provided, it is employed to obtain the
+    active entries of each subject without scanning the bitacora.
+
     """
 
     f = open('repdoc_resultado.html', 'wt')
@@ -152,11 +156,16 @@ def export_to_html_resultado(
 
             if tabla_asignaturas.loc[uuid_asig]['creditos_iniciales'] > 0:
                 # subset of bitacora for the selected subject
-                seleccion = bitacora.loc[
-                    (bitacora['uuid_asig'] == uuid_asig) &
-                    (bitacora['date_removed'] == 'None') &
-                    (bitacora['uuid_titu'] != NULL_UUID)
-                ].copy()
+                if indice_bitacora is not None:
+                    seleccion = indice_bitacora.seleccion_asignatura(
+                        uuid_asig
+                    )
+                else:
+                    seleccion = bitacora.loc[
+                        (bitacora['uuid_asig'] == uuid_asig) &
+                        bitacora['active'] &
+                        (bitacora['uuid_titu'] != NULL_UUID)
+                    ].copy()
                 ntimes = seleccion.shape[0]
                 if ntimes == 0:
                     f.write('\n<tr style="background-color: #FFFF88;">')
@@ -9,10 +9,10 @@
 
 from .date_last_update import date_last_update
 
-from .define_gui_layout import COLOR_ASIGNATURAS_HEAD
-from .define_gui_layout import COLOR_ASIGNATURAS_EVEN
-from .define_gui_layout import COLOR_ASIGNATURAS_ODD
-from .define_gui_layout import COLOR_NO_DISPONIBLE
+from .definitions import COLOR_ASIGNATURAS_HEAD
+from .definitions import COLOR_ASIGNATURAS_EVEN
+from .definitions import COLOR_ASIGNATURAS_ODD
+from .definitions import COLOR_NO_DISPONIBLE
 
 
 def writeff(f, ff, output):
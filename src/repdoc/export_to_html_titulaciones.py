@@ -9,10 +9,10 @@
 
 from .date_last_update import date_last_update
 
-from .define_gui_layout import COLOR_NO_DISPONIBLE
-from .define_gui_layout import COLOR_TITULACIONES_HEAD
-from .define_gui_layout import COLOR_TITULACIONES_EVEN
-from .define_gui_layout import COLOR_TITULACIONES_ODD
+from .definitions import COLOR_NO_DISPONIBLE
+from .definitions import COLOR_TITULACIONES_HEAD
+from .definitions import COLOR_TITULACIONES_EVEN
+from .definitions import COLOR_TITULACIONES_ODD
 
 
 def export_to_html_titulaciones(tabla_titulaciones, course):
@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2022 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -7,31 +7,31 @@
 # License-Filename: LICENSE.txt
 #
 
-import numpy as np
+import pandas as pd
 
 
 def fill_cell_with_previous_value(s):
-    """Return list removing NaN with previous value in the list
+    """Return Series replacing NaN with the previous valid value
+
+    Parameters
+    ----------
+    s : pandas.Series or list
+        Values to be filled. Strings and numbers can be mixed.
+
+    Returns
+    -------
+    result : pandas.Series
+        Filled values, with the dtype inferred from the result and the
+        same index as the input Series.
 
     """
 
-    ll = len(s)
-    result = []
-    i = 0
-    last = None
-    while i < ll:
-        if type(s[i]) is str:
-            last = s[i]
-            result.append(last)
-        else:
-            if np.isnan(s[i]):
-                if last is None:
-                    raise ValueError('Unexpected error')
-                else:
-                    result.append(last)
-            else:
-                last = s[i]
-                result.append(last)
-        i += 1
-
-    return result
+    s = pd.Series(s)
+    missing = s.isna()
+    if len(s) > 0 and missing.iloc[0]:
+        raise ValueError('Unexpected error')
+
+    if not missing.any():
+        return s.infer_objects()
+
+    return s.ffill().infer_objects()
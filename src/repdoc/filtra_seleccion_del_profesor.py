@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2022 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -7,22 +7,27 @@
 # License-Filename: LICENSE.txt
 #
 
-from .define_gui_layout import WIDTH_SPACES_FOR_UUID
+from .definitions import WIDTH_SPACES_FOR_UUID
 from .definitions import NULL_UUID
 
 
-def filtra_seleccion_del_profesor(uuid_prof, bitacora):
+def filtra_seleccion_del_profesor(uuid_prof, bitacora, indice_bitacora=None):
     """Return list with subjects already assigned to a teacher.
 
+    When indice_bitacora is provided, it is employed to obtain the
+    active entries of the teacher without scanning the bitacora.
+
     """
 
     output = ['---']
 
     # subset of bitacora for the selected teacher
-    seleccion = bitacora.loc[
-        (bitacora['uuid_prof'] == uuid_prof) &
-        (bitacora['date_removed'] == 'None')
-    ].copy()
+    if indice_bitacora is not None:
+        seleccion = indice_bitacora.seleccion_profesor(uuid_prof)
+    else:
+        seleccion = bitacora.loc[
+            (bitacora['uuid_prof'] == uuid_prof) & bitacora['active']
+        ].copy()
 
     # find how many times the selected teacher appears
     ntimes = seleccion.shape[0]
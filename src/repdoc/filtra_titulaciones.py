@@ -7,7 +7,7 @@
 # License-Filename: LICENSE.txt
 #
 
-from .define_gui_layout import WIDTH_SPACES_FOR_UUID
+from .definitions import WIDTH_SPACES_FOR_UUID
 
 
 def filtra_titulaciones(tabla_titulaciones):
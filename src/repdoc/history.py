@@ -0,0 +1,128 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import argparse
+import contextlib
+import os
+import time
+
+from . import IMPORT_START
+from .bitacora_as_of import parse_date_added
+from .ctext import ctext
+from .definitions import DEFAULT_CACHE_DIR
+from .export_to_html_files import export_to_html_files
+from .load_history import load_history
+from .log_execution_command import log_execution_command
+from .read_workbook import print_timing
+from .version import version
+
+
+def history(args=None):
+    """Generate the HTML files as they were at a previous round or date.
+
+    The state is rebuilt from the bitacora (using the checkpoints saved
+    by previous executions when possible) and the HTML files are
+    exported to a separate directory. Neither the bitacora nor the HTML
+    files of the current state are modified.
+
+    Parameters
+    ----------
+    args : list of str or None
+        Command-line arguments (excluding 'history'). If None,
+        sys.argv is employed.
+
+    """
+
+    # parse command-line options
+    parser = argparse.ArgumentParser(
+        prog='repdoc history',
+        description='Generate HTML files with the state at a previous '
+                    'round or date (no GUI)'
+    )
+
+    parser.add_argument("xlsxfile",
+                        help="Excel file with input data",
+                        type=argparse.FileType())
+    parser.add_argument("--course", required=True,
+                        help="Academic course (e.g. 2019-2020)",
+                        type=str)
+    parser.add_argument("--bitacora", required=True,
+                        help="Excel file with the bitacora",
+                        type=argparse.FileType())
+    parser.add_argument("--round",
+                        help="last round included",
+                        type=int)
+    parser.add_argument("--date",
+                        help="last date included (e.g. '2019-06-01', "
+                             "which includes the whole day, or "
+                             "'2019-06-01 12:00:00')",
+                        type=parse_date_added)
+    parser.add_argument("--output_dir", required=True,
+                        help="directory where the HTML files are saved",
+                        type=str)
+    parser.add_argument("--cache_dir",
+                        help="directory to cache the tables parsed from "
+                             "the Excel file",
+                        default=DEFAULT_CACHE_DIR,
+                        type=str)
+    parser.add_argument("--no_cache",
+                        help="always parse the Excel file and apply the "
+                             "whole bitacora (ignore cache)",
+                        action="store_true")
+    parser.add_argument("--jobs",
+                        help="number of processes to parse the subject "
+                             "sheets of the Excel file",
+                        default=1,
+                        type=int)
+    parser.add_argument("--debug",
+                        help="run code in debugging mode",
+                        action="store_true")
+    parser.add_argument("--echo",
+                        help="Display full command line",
+                        action="store_true")
+
+    args = parser.parse_args(args)
+
+    if args.round is None and args.date is None:
+        parser.error('at least one of --round and --date is required')
+
+    log_execution_command(args.echo)
+
+    print(ctext(f'Welcome to RepDoc version {version} (history)', bold=True))
+    print_timing('import modules', IMPORT_START)
+
+    t_ini = time.perf_counter()
+    # the cache directory is employed after changing the working directory
+    cache_dir = None if args.no_cache else os.path.abspath(args.cache_dir)
+    tabla_titulaciones, bigdict_tablas_asignaturas, tabla_profesores, \
+        tabla_bitacora, indice_bitacora = load_history(
+            xlsxfile=args.xlsxfile,
+            course=args.course,
+            bitacora=args.bitacora,
+            round_added=args.round,
+            date_added=args.date,
+            debug=args.debug,
+            cache_dir=cache_dir,
+            jobs=args.jobs
+        )
+
+    cutoff = []
+    if args.round is not None:
+        cutoff.append(f'ronda {args.round}')
+    if args.date is not None:
+        cutoff.append(f'{args.date:%Y-%m-%d %H:%M:%S}')
+    course = f'{args.course} ({", ".join(cutoff)})'
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    with contextlib.chdir(args.output_dir):
+        export_to_html_files(tabla_titulaciones, bigdict_tablas_asignaturas,
+                             tabla_profesores, tabla_bitacora,
+                             indice_bitacora, course)
+    print(ctext(f'\nHTML files saved in {args.output_dir} '
+                f'({time.perf_counter() - t_ini:.3f} s)', fg='blue'))
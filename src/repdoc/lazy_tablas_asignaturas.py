@@ -0,0 +1,91 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+from collections.abc import Mapping
+
+
+class LazyTablasAsignaturas(Mapping):
+    """Read-only mapping of subject tables parsed on first access.
+
+    It replaces the dictionary bigdict_tablas_asignaturas when the
+    subject sheets are loaded lazily: the keys (degree names) are known
+    from the beginning, but each table is only read from the Excel file
+    the first time it is requested (e.g. when the degree is selected in
+    the GUI, when a bitacora entry refers to it, or when exporting the
+    HTML files). The returned tables are kept, so later modifications
+    are preserved.
+
+    Parameters
+    ----------
+    titulaciones : list of str
+        Names of the degrees, in the original order.
+    uuids : dict
+        UUIDs of the subjects of each degree, obtained in a pre-scan of
+        the sheets.
+    loader : callable
+        Function that receives the name of a degree and returns its
+        table of subjects.
+    workbook : pandas.ExcelFile or None
+        Excel file employed by the loader. It is closed once every
+        table has been loaded (or when calling close()).
+
+    """
+
+    def __init__(self, titulaciones, uuids, loader, workbook=None):
+        self._titulaciones = list(titulaciones)
+        self._uuids = uuids
+        self._loader = loader
+        self._workbook = workbook
+        self._tablas = dict()
+
+    def __getitem__(self, titulacion):
+        if titulacion not in self._tablas:
+            if titulacion not in self._uuids:
+                raise KeyError(titulacion)
+            tabla_asignaturas = self._loader(titulacion)
+            if tabla_asignaturas.index.tolist() != self._uuids[titulacion]:
+                raise ValueError(f'Sheet "{titulacion}" has changed since '
+                                 f'the Excel file was opened')
+            self._tablas[titulacion] = tabla_asignaturas
+            if len(self._tablas) == len(self._titulaciones):
+                self.close()
+        return self._tablas[titulacion]
+
+    def __iter__(self):
+        return iter(self._titulaciones)
+
+    def __len__(self):
+        return len(self._titulaciones)
+
+    def is_loaded(self, titulacion):
+        """Return True if the table of the degree has been read"""
+        return titulacion in self._tablas
+
+    def uuids(self, titulacion):
+        """Return UUIDs of the subjects without loading the table"""
+        return self._uuids[titulacion]
+
+    def close(self):
+        """Close the Excel file (no more tables can be loaded)"""
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+
+def uuids_asignaturas(bigdict_tablas_asignaturas, titulacion):
+    """Return UUIDs of the subjects of a degree.
+
+    The table is not loaded when bigdict_tablas_asignaturas is an
+    instance of LazyTablasAsignaturas.
+
+    """
+
+    if isinstance(bigdict_tablas_asignaturas, LazyTablasAsignaturas):
+        return bigdict_tablas_asignaturas.uuids(titulacion)
+    return bigdict_tablas_asignaturas[titulacion].index.tolist()
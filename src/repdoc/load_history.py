@@ -0,0 +1,111 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+from .allocation_state import AllocationState
+from .bitacora_as_of import bitacora_as_of
+from .bitacora_checkpoint import checkpoint_key
+from .bitacora_checkpoint import replay_from_checkpoint
+from .bitacora_index import BitacoraIndex
+from .bitacora_journal import BitacoraJournal
+from .bitacora_journal import bitacora_xlsxfilename
+from .ctext import ctext
+from .lazy_tablas_asignaturas import uuids_asignaturas
+from .read_bitacora import read_bitacora
+from .read_workbook import read_workbook
+from .uuid_registry import UuidRegistry
+from .workbook_cache import file_hash
+
+
+def load_history(xlsxfile, course, bitacora, round_added=None,
+                 date_added=None, debug=False, cache_dir=None, jobs=1):
+    """Load the tables and apply the bitacora up to a given cutoff.
+
+    The state is rebuilt as it was at the end of the round round_added
+    and/or at the date date_added (see bitacora_as_of), starting from
+    the newest checkpoint that is still valid for the bitacora at the
+    cutoff. The bitacora, its journal and the checkpoints are not
+    modified.
+
+    Parameters
+    ----------
+    xlsxfile : file object
+        Excel file with input data.
+    course : str
+        Academic course (e.g. 2019-2020).
+    bitacora : file object
+        Excel file with the bitacora.
+    round_added : int or None
+        Last round included.
+    date_added : pandas.Timestamp or None
+        Last date included.
+    debug : bool
+        If True, display additional information.
+    cache_dir : str or None
+        Directory employed to cache the parsed tables and the
+        checkpoints.
+    jobs : int
+        Number of worker processes employed to parse the subject
+        tables.
+
+    Returns
+    -------
+    tabla_titulaciones : pandas.DataFrame
+        Table of degrees.
+    bigdict_tablas_asignaturas : dict
+        Dictionary with the table of subjects of each degree.
+    tabla_profesores : pandas.DataFrame
+        Table of teachers.
+    tabla_bitacora : pandas.DataFrame
+        Table with the bitacora entries at the cutoff.
+    indice_bitacora : BitacoraIndex
+        Indexed copy of tabla_bitacora.
+
+    """
+
+    # the Excel file is hashed only once (workbook cache and checkpoints)
+    xlsxhash = None if cache_dir is None else file_hash(xlsxfile.name)
+    tabla_titulaciones, bigdict_tablas_asignaturas, tabla_profesores = \
+        read_workbook(
+            xlsxfilename=xlsxfile.name,
+            course=course,
+            debug=debug,
+            cache_dir=cache_dir,
+            jobs=jobs,
+            xlsxhash=xlsxhash
+        )
+
+    uuid_registry = UuidRegistry(tabla_titulaciones.index)
+    for titulacion in tabla_titulaciones['titulacion']:
+        uuid_registry.update(
+            uuids_asignaturas(bigdict_tablas_asignaturas, titulacion)
+        )
+    uuid_registry.update(tabla_profesores.index)
+
+    print(ctext('\n-> Reading bitacora', fg='green', bold=True))
+    # include the changes not yet saved in the Excel file (without
+    # saving them: the journal may belong to a running session)
+    journal = BitacoraJournal(bitacora_xlsxfilename(bitacora))
+    tabla_bitacora = journal.read(read_bitacora(bitacora, debug=debug))
+    tabla_bitacora = bitacora_as_of(tabla_bitacora, round_added=round_added,
+                                    date_added=date_added)
+    print(f'   {len(tabla_bitacora)} entries before the cutoff')
+
+    if cache_dir is None:
+        key = None
+    else:
+        key = checkpoint_key(xlsxfile.name, course, xlsxhash=xlsxhash)
+    state = AllocationState(tabla_titulaciones, bigdict_tablas_asignaturas,
+                            tabla_profesores)
+    replay_from_checkpoint(tabla_bitacora, state, uuid_registry,
+                           cache_dir=cache_dir, key=key)
+    state.to_tables()
+    indice_bitacora = BitacoraIndex(tabla_bitacora)
+
+    return tabla_titulaciones, bigdict_tablas_asignaturas, tabla_profesores, \
+        tabla_bitacora, indice_bitacora
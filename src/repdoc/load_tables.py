@@ -0,0 +1,224 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import copy
+
+from .allocation_state import AllocationState
+from .bitacora_checkpoint import checkpoint_key
+from .bitacora_checkpoint import compare_replay
+from .bitacora_checkpoint import replay_from_checkpoint
+from .bitacora_checkpoint import write_checkpoint
+from .bitacora_journal import BitacoraJournal
+from .bitacora_journal import bitacora_xlsxfilename
+from .bitacora_index import BitacoraIndex
+from .bitacora_sqlite import BitacoraSqlite
+from .check_unique_uuids import check_unique_uuids
+from .ctext import ctext
+from .export_to_html_files import export_to_html_files
+from .lazy_tablas_asignaturas import uuids_asignaturas
+from .read_bitacora import read_bitacora
+from .read_workbook import read_workbook
+from .replay_bitacora import replay_bitacora
+from .rsync_html_files import rsync_html_files
+from .uuid_registry import UuidRegistry
+from .workbook_cache import file_hash
+
+
+# stages displayed while loading the tables
+LOADING_STAGES = [
+    'Leyendo hoja de cálculo',
+    'Comprobando UUIDs',
+    'Leyendo bitácora',
+    'Aplicando bitácora',
+    'Exportando ficheros HTML'
+]
+
+
+def load_tables(xlsxfile, course, bitacora=None, debug=False, cache_dir=None,
+                jobs=1, lazy=False, web=False, fsync_every=1, sqlite=False,
+                checkpoint_every=100, verify_replay=False, progress=None,
+                compact=True):
+    """Load the tables and apply the previous bitacora.
+
+    This function performs all the work required before the user can
+    start the subject assignment: read the Excel input file, check the
+    UUIDs, read and apply the bitacora, and export the initial HTML
+    files. It does not interact with the GUI, and can be executed in a
+    worker thread.
+
+    Parameters
+    ----------
+    xlsxfile : file object
+        Excel file with input data.
+    course : str
+        Academic course (e.g. 2019-2020).
+    bitacora : file object or None
+        Excel file with a previous bitacora.
+    debug : bool
+        If True, display additional information.
+    cache_dir : str or None
+        Directory employed to cache the parsed tables.
+    jobs : int
+        Number of worker processes employed to parse the subject
+        tables.
+    lazy : bool
+        If True, the subject tables are parsed on demand.
+    web : bool
+        If True, upload the HTML files to the web server.
+    fsync_every : int
+        Number of changes between calls to os.fsync() in the journal
+        of the bitacora.
+    sqlite : bool
+        If True, keep an indexed copy of the bitacora in an SQLite
+        database, employed to select the entries of each teacher and
+        subject. The database is rebuilt every time (see
+        BitacoraSqlite).
+    checkpoint_every : int
+        Minimum number of new bitacora entries (since the checkpoint
+        employed at startup) required to save a new checkpoint of the
+        state obtained after applying the bitacora. If zero, the
+        checkpoints are neither read nor saved. Checkpoints are only
+        employed when cache_dir is not None.
+    verify_replay : bool
+        If True, the bitacora is also applied from the beginning and
+        the result is compared with the one obtained from the
+        checkpoint.
+    progress : callable or None
+        Function called at the beginning of each stage, with the stage
+        number (starting at 0) and its description (see LOADING_STAGES).
+    compact : bool
+        If True, the changes stored in the journal are saved in the
+        Excel file of the bitacora, emptying the journal. Otherwise the
+        journal is only read, and both files are left untouched.
+
+    Returns
+    -------
+    tabla_titulaciones : pandas.DataFrame
+        Table of degrees.
+    bigdict_tablas_asignaturas : dict or LazyTablasAsignaturas
+        Dictionary with the table of subjects of each degree.
+    tabla_profesores : pandas.DataFrame
+        Table of teachers.
+    tabla_bitacora : pandas.DataFrame
+        Table with the bitacora entries.
+    journal : BitacoraJournal
+        Journal employed to store the subsequent changes of the
+        bitacora.
+    indice_bitacora : BitacoraIndex or BitacoraSqlite
+        Indexed copy of the bitacora.
+    uuid_registry : UuidRegistry
+        Registry of the UUIDs of degrees, subjects, teachers and
+        bitacora entries.
+    state : AllocationState
+        State of the subject assignment (the previous tables are
+        updated with its values).
+
+    """
+
+    def stage(istage):
+        if progress is not None:
+            progress(istage, LOADING_STAGES[istage])
+
+    # ---
+    # load Excel sheets
+    stage(0)
+    # the Excel file is hashed only once (workbook cache and checkpoints)
+    xlsxhash = None if cache_dir is None else file_hash(xlsxfile.name)
+    tabla_titulaciones, bigdict_tablas_asignaturas, tabla_profesores = \
+        read_workbook(
+            xlsxfilename=xlsxfile.name,
+            course=course,
+            debug=debug,
+            cache_dir=cache_dir,
+            jobs=jobs,
+            lazy=lazy,
+            xlsxhash=xlsxhash
+        )
+
+    # comprueba que los UUIDs de titulaciones, asignaturas y profesores
+    # son todos distintos
+    stage(1)
+    check_unique_uuids(
+        [('Resumen Encargo', tabla_titulaciones)] +
+        [(titulacion, uuids_asignaturas(bigdict_tablas_asignaturas,
+                                        titulacion))
+         for titulacion in bigdict_tablas_asignaturas] +
+        [('Asignación', tabla_profesores)],
+        errmsg='UUIDs are not unique when mixing everything!'
+    )
+
+    # registro de los UUIDs de titulaciones, asignaturas, profesores y
+    # entradas de la bitácora
+    uuid_registry = UuidRegistry(tabla_titulaciones.index)
+    for titulacion in tabla_titulaciones['titulacion']:
+        uuid_registry.update(
+            uuids_asignaturas(bigdict_tablas_asignaturas, titulacion)
+        )
+    uuid_registry.update(tabla_profesores.index)
+
+    # ---
+    # define bitacora
+    stage(2)
+    print(ctext('\n-> Updating bitacora', fg='green', bold=True))
+    journal = BitacoraJournal(bitacora_xlsxfilename(bitacora),
+                              fsync_every=fsync_every)
+    if bitacora is None and journal.exists():
+        # avoid using the changes of a different session
+        raise ValueError('File ' + journal.filename + ' already exists!')
+    tabla_bitacora = read_bitacora(bitacora, debug=debug)
+    # include the changes not yet saved in the Excel file, and save it
+    tabla_bitacora = journal.read(tabla_bitacora)
+    if compact:
+        journal.compact(tabla_bitacora)
+    if sqlite:
+        indice_bitacora = BitacoraSqlite(bitacora_xlsxfilename(bitacora),
+                                         tabla_bitacora.columns)
+        indice_bitacora.load(tabla_bitacora)
+    else:
+        indice_bitacora = BitacoraIndex(tabla_bitacora)
+    stage(3)
+    use_checkpoints = cache_dir is not None and checkpoint_every > 0
+    if use_checkpoints:
+        key = checkpoint_key(xlsxfile.name, course, xlsxhash=xlsxhash)
+    else:
+        key = None
+    if verify_replay:
+        # copies of the initial tables to apply the whole bitacora
+        state_full = AllocationState(
+            tabla_titulaciones.copy(),
+            {titulacion: bigdict_tablas_asignaturas[titulacion].copy()
+             for titulacion in bigdict_tablas_asignaturas.keys()},
+            tabla_profesores.copy()
+        )
+        uuid_registry_full = copy.deepcopy(uuid_registry)
+    state = AllocationState(tabla_titulaciones, bigdict_tablas_asignaturas,
+                            tabla_profesores, verify=debug)
+    nentries = replay_from_checkpoint(
+        tabla_bitacora, state, uuid_registry,
+        cache_dir=cache_dir if use_checkpoints else None, key=key
+    )
+    if verify_replay:
+        replay_bitacora(tabla_bitacora, state_full, uuid_registry_full)
+        compare_replay(state, state_full)
+    if use_checkpoints and len(tabla_bitacora) - nentries >= checkpoint_every:
+        write_checkpoint(cache_dir, key, xlsxfile.name, course,
+                         tabla_bitacora, state)
+    state.to_tables()
+
+    # ---
+    # export to HTML files
+    stage(4)
+    export_to_html_files(tabla_titulaciones, bigdict_tablas_asignaturas,
+                         tabla_profesores, tabla_bitacora, indice_bitacora,
+                         course, lazy=lazy)
+    if web:
+        rsync_html_files(course, xlsxfile, bitacora, journal=journal)
+
+    return tabla_titulaciones, bigdict_tablas_asignaturas, tabla_profesores, \
+        tabla_bitacora, journal, indice_bitacora, uuid_registry, state
@@ -0,0 +1,29 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+from datetime import datetime
+import platform
+import sys
+
+from .ctext import ctext
+
+
+def log_execution_command(echo=False):
+    """Append the command line to last_execution_command.txt
+
+    """
+
+    execution_command = ' '.join(sys.argv)
+    if echo:
+        print(ctext(f'Executing: {execution_command}', fg='red', bold=True))
+    with open('last_execution_command.txt', 'a') as f:
+        f.write('-' * 79)
+        f.write(f'\n{datetime.now()}\n')
+        f.write(f'{platform.uname().node}\n')
+        f.write(f'{execution_command}\n')
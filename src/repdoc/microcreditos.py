@@ -0,0 +1,38 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+"""Conversion between credits and integer micro-credits"""
+
+import numpy as np
+
+from .definitions import MICROCREDITOS
+
+
+def a_microcreditos(creditos):
+    """Convert credits (float) to micro-credits (numpy.int64)
+
+    Scalars are returned as numpy scalars, and arrays (or any other
+    sequence) as numpy arrays.
+
+    """
+
+    microcreditos = np.rint(
+        np.asarray(creditos, dtype=float) * MICROCREDITOS
+    ).astype(np.int64)
+    return microcreditos[()]
+
+
+def a_creditos(microcreditos):
+    """Convert micro-credits to credits (float)
+
+    The result is the float closest to the exact number of credits.
+
+    """
+
+    return (np.asarray(microcreditos, dtype=np.int64) / MICROCREDITOS)[()]
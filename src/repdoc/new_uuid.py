@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2022 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -10,14 +10,14 @@
 from uuid import uuid4
 
 
-def new_uuid(megalist_uuid):
+def new_uuid(registry):
     """Return new uuid after checking that there is no collision.
 
     Parameters
     ----------
-    megalist_uuid : list
-        List of previous uuid. The new value should not be present in
-        that list.
+    registry : UuidRegistry or set
+        Previous uuid values. The new value should not be present in
+        that collection, and it is inserted in it before returning.
 
     Returns
     -------
@@ -26,12 +26,10 @@ def new_uuid(megalist_uuid):
 
     """
 
-    loop = True
-
-    while loop:
+    while True:
         newvalue = str(uuid4())
-        newlist = megalist_uuid + [newvalue]
-        if len(newlist) != len(set(newlist)):
+        if newvalue in registry:
             print('UUID collision with:' + newvalue)
         else:
+            registry.add(newvalue)
             return newvalue
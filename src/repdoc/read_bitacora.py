@@ -0,0 +1,63 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import os
+import pandas as pd
+
+from .typed_bitacora import typed_bitacora
+
+from .definitions import BITACORA_DTYPES
+from .definitions import DEFAULT_BITACORA_XLSX_FILENAME
+
+
+def read_bitacora(bitacora, debug=False):
+    """Read bitacora from a previous Excel file.
+
+    Parameters
+    ----------
+    bitacora : file object or None
+        Excel file with the bitacora. If None, an empty bitacora
+        is initialised.
+    debug : bool
+        If True, display additional information.
+
+    Returns
+    -------
+    bitacora : pandas.DataFrame
+        Table with the bitacora entries, using uuid_bita as index
+        and the dtypes defined in BITACORA_DTYPES.
+
+    """
+
+    if bitacora is None:
+        # check that there is not a file with the expected name
+        # (in order to avoid overwriting it)
+        if os.path.isfile(DEFAULT_BITACORA_XLSX_FILENAME):
+            raise ValueError('File ' + DEFAULT_BITACORA_XLSX_FILENAME +
+                             ' already exists!')
+        # initialize empty dataframe with the expected columns
+        tabla_bitacora = pd.DataFrame(
+            data=[], columns=list(BITACORA_DTYPES)
+        ).astype(BITACORA_DTYPES)
+        tabla_bitacora.index.name = 'uuid_bita'
+        if debug:
+            print('Initialasing bitacora DataFrame:')
+            print(tabla_bitacora)
+            input('Press <CR> to continue...')
+    else:
+        tabla_bitacora = pd.read_excel(bitacora.name, index_col=0)
+        # dtypes of each column (also for bitacoras created by previous
+        # versions of the program)
+        tabla_bitacora = typed_bitacora(tabla_bitacora)
+        if debug:
+            print('Initialising bitacora from previous file:')
+            print(tabla_bitacora)
+            input('Press <CR> to continue...')
+
+    return tabla_bitacora
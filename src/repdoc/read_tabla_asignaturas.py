@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2023 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -9,6 +9,7 @@
 
 import pandas as pd
 
+from .check_unique_uuids import check_unique_uuids
 from .ctext import ctext
 from .definitions import VALID_COURSES
 
@@ -16,10 +17,8 @@ from .fill_cell_with_previous_value import fill_cell_with_previous_value
 from .str_nonan import str_nonan
 
 
-def read_tabla_asignaturas(xlsxfilename, course, sheet_name, debug=False):
-    """Lee hoja Excel con lista de asignaturas
-
-    """
+def schema_tabla_asignaturas(course):
+    """Return skiprows, names and converters of the subject sheets"""
 
     if course in VALID_COURSES:
         skiprows = 5
@@ -43,14 +42,102 @@ def read_tabla_asignaturas(xlsxfilename, course, sheet_name, debug=False):
     if len(names) != len(converters):
         raise ValueError('Unexpected error in names and converters')
 
+    return skiprows, names, converters
+
+
+def prescan_tabla_asignaturas(workbook, course, sheet_name):
+    """Read only the UUIDs and credits of a sheet with subjects.
+
+    This is much cheaper than read_tabla_asignaturas(), and provides
+    the information required to fill the table of degrees before the
+    full table of subjects is needed.
+
+    Parameters
+    ----------
+    workbook : pandas.ExcelFile
+        Excel file already opened. With the openpyxl engine, only the
+        required cells are read (the other engines, e.g. xlrd for .xls
+        files, read the required columns with pandas.read_excel).
+    course : str
+        Academic course (e.g. 2019-2020).
+    sheet_name : str
+        Name of the sheet (degree).
+
+    Returns
+    -------
+    uuids : list of str
+        UUIDs of the subjects.
+    creditos_iniciales : float
+        Total number of credits.
+    creditos_beccol : float
+        Total number of credits available for collaborators.
+
+    """
+
+    skiprows, names, converters = schema_tabla_asignaturas(course)
+    # column numbers (the first column is not used)
+    icol_uuid = names.index('uuid_asig') + 1
+    icol_creditos = names.index('creditos_iniciales') + 1
+    icol_beccol = names.index('bec_col') + 1
+
+    uuids = []
+    creditos = []
+    beccol = []
+    if workbook.engine == 'openpyxl':
+        rows = workbook.book[sheet_name].iter_rows(min_row=skiprows + 1,
+                                                   min_col=icol_uuid + 1,
+                                                   max_col=icol_beccol + 1,
+                                                   values_only=True)
+    else:
+        tabla = pd.read_excel(
+            workbook,
+            sheet_name=sheet_name,
+            skiprows=skiprows,
+            header=None,
+            usecols=list(range(icol_uuid, icol_beccol + 1)),
+            dtype=object
+        )
+        # empty cells as in openpyxl
+        rows = tabla.where(tabla.notna(), None).itertuples(index=False,
+                                                           name=None)
+    for row in rows:
+        uuid_asig = row[0]
+        if uuid_asig is None or uuid_asig == '':
+            continue
+        uuids.append(converters['uuid_asig'](uuid_asig))
+        creditos.append(converters['creditos_iniciales'](
+            row[icol_creditos - icol_uuid]
+        ))
+        beccol.append(converters['bec_col'](row[icol_beccol - icol_uuid]))
+
+    # sum as in the full table, to get exactly the same values
+    creditos = pd.Series(creditos, dtype=float)
+    beccol = pd.Series(beccol, dtype=int)
+    creditos_iniciales = creditos.sum()
+    creditos_beccol = (creditos * beccol).sum()
+
+    return uuids, creditos_iniciales, creditos_beccol
+
+
+def read_tabla_asignaturas(xlsxfilename, course, sheet_name, debug=False,
+                           workbook=None):
+    """Lee hoja Excel con lista de asignaturas
+
+    """
+
+    skiprows, names, converters = schema_tabla_asignaturas(course)
     usecols = range(1, len(names) + 1)
 
     if debug:
         print(ctext(f'\nReading {xlsxfilename}', fg='blue'))
         print('-> Sheet: "' + sheet_name + '"')
 
+    # reuse the already opened workbook when available
+    if workbook is None:
+        workbook = xlsxfilename
+
     tabla_inicial = pd.read_excel(
-        xlsxfilename,
+        workbook,
         sheet_name=sheet_name,
         skiprows=skiprows,
         header=None,
@@ -77,12 +164,7 @@ def read_tabla_asignaturas(xlsxfilename, course, sheet_name, debug=False):
     del tabla_asignaturas['uuid_asig']
 
     # check that uuid's are unique
-    if len(tabla_asignaturas.index) != len(set(tabla_asignaturas.index)):
-        dumlist = tabla_asignaturas.index.tolist()
-        duplicates = set([item for item in dumlist if dumlist.count(item) > 1])
-        for item in duplicates:
-            print(tabla_asignaturas.loc[item])
-        raise ValueError('UUIDs are not unique!')
+    check_unique_uuids([(sheet_name, tabla_asignaturas)])
 
     if debug:
         print(tabla_asignaturas)
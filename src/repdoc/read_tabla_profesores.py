@@ -7,12 +7,41 @@
 # License-Filename: LICENSE.txt
 #
 
+import numpy as np
 import pandas as pd
 
+from .check_unique_uuids import check_unique_uuids
 from .ctext import ctext
 from .definitions import VALID_COURSES
 
-def read_tabla_profesores(xlsxfilename, course, debug=False):
+
+def stream_rows(worksheet, skiprows, usecols, names, converters):
+    """Read selected columns of a read-only openpyxl worksheet.
+
+    Rows are read one at a time, keeping only the cells in usecols.
+    Every row up to the end of the sheet is read, skipping the rows
+    with an empty first column (uuid).
+
+    """
+
+    data = {name: [] for name in names}
+    max_col = max(usecols) + 1
+    for row in worksheet.iter_rows(min_row=skiprows + 1, max_col=max_col,
+                                   values_only=True):
+        values = [row[icol] if icol < len(row) else None
+                  for icol in usecols]
+        if values[0] is None or values[0] == '':
+            continue
+        for name, value in zip(names, values):
+            if value is None or value == '':
+                data[name].append(np.nan)
+            else:
+                data[name].append(converters[name](value))
+
+    return pd.DataFrame(data)
+
+
+def read_tabla_profesores(xlsxfilename, course, debug=False, workbook=None):
     """Lee hoja Excel con lista de profesores que participan en rondas
 
     """
@@ -45,21 +74,32 @@ def read_tabla_profesores(xlsxfilename, course, debug=False):
         print(ctext(f'\nReading {xlsxfilename}', fg='blue'))
         print('Sheet: "' + sheet_name + '"')
 
-    # print(ctext('WARNING> step1', bg='red', fg='white'))
-    tabla_inicial = pd.read_excel(
-        xlsxfilename,
-        sheet_name=sheet_name,
-        skiprows=skiprows,
-        header=None,
-        usecols=usecols,
-        names=names,
-        converters=converters,
-    )
-    # print(ctext('WARNING> step2', bg='red', fg='white'))
-
-    # remove unnecessary rows
-    lok = tabla_inicial['uuid_prof'].notnull()
-    tabla_inicial = tabla_inicial[lok]
+    if workbook is None:
+        with pd.ExcelFile(xlsxfilename) as workbook:
+            return read_tabla_profesores(xlsxfilename, course, debug=debug,
+                                         workbook=workbook)
+
+    if workbook.engine == 'openpyxl':
+        tabla_inicial = stream_rows(
+            worksheet=workbook.book[sheet_name],
+            skiprows=skiprows,
+            usecols=usecols,
+            names=names,
+            converters=converters
+        )
+    else:
+        tabla_inicial = pd.read_excel(
+            workbook,
+            sheet_name=sheet_name,
+            skiprows=skiprows,
+            header=None,
+            usecols=usecols,
+            names=names,
+            converters=converters,
+        )
+        # remove unnecessary rows
+        lok = tabla_inicial['uuid_prof'].notnull()
+        tabla_inicial = tabla_inicial[lok]
 
     # reset index values
     tabla_inicial = tabla_inicial.reset_index(drop=True)
@@ -70,12 +110,7 @@ def read_tabla_profesores(xlsxfilename, course, debug=False):
     del tabla_profesores['uuid_prof']
 
     # check that uuid's are unique
-    if len(tabla_profesores.index) != len(set(tabla_profesores.index)):
-        dumlist = tabla_profesores.index.tolist()
-        duplicates = set([item for item in dumlist if dumlist.count(item) > 1])
-        for item in duplicates:
-            print(tabla_profesores.loc[item])
-        raise ValueError('UUIDs are not unique!')
+    check_unique_uuids([(sheet_name, tabla_profesores)])
 
     if debug:
         print(tabla_profesores)
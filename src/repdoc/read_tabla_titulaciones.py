@@ -9,11 +9,12 @@
 
 import pandas as pd
 
+from .check_unique_uuids import check_unique_uuids
 from .ctext import ctext
 from .definitions import VALID_COURSES
 
 
-def read_tabla_titulaciones(xlsxfilename, course, debug=False):
+def read_tabla_titulaciones(xlsxfilename, course, debug=False, workbook=None):
     """Lee hoja Excel con lista de titulaciones.
 
     """
@@ -32,8 +33,12 @@ def read_tabla_titulaciones(xlsxfilename, course, debug=False):
         print(ctext(f'\nReading {xlsxfilename}', fg="blue"))
         print('Sheet: "' + sheet_name + '"')
 
+    # reuse the already opened workbook when available
+    if workbook is None:
+        workbook = xlsxfilename
+
     tabla_inicial = pd.read_excel(
-        xlsxfilename,
+        workbook,
         sheet_name=sheet_name,
         skiprows=skiprows,
         header=None,
@@ -55,12 +60,7 @@ def read_tabla_titulaciones(xlsxfilename, course, debug=False):
     del tabla_titulaciones['uuid_titu']
 
     # check that uuid's are unique
-    if len(tabla_titulaciones.index) != len(set(tabla_titulaciones.index)):
-        dumlist = tabla_titulaciones.index.tolist()
-        duplicates = set([item for item in dumlist if dumlist.count(item) > 1])
-        for item in duplicates:
-            print(tabla_titulaciones.loc[item])
-        raise ValueError('UUIDs are not unique!')
+    check_unique_uuids([(sheet_name, tabla_titulaciones)])
 
     if debug:
         print(tabla_titulaciones)
@@ -0,0 +1,335 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+import pandas as pd
+import sys
+import time
+
+from .check_unique_uuids import check_unique_uuids
+from .ctext import ctext
+from . import definitions
+from .lazy_tablas_asignaturas import LazyTablasAsignaturas
+from .microcreditos import a_microcreditos
+from .read_tabla_asignaturas import prescan_tabla_asignaturas
+from .read_tabla_asignaturas import read_tabla_asignaturas
+from .read_tabla_profesores import read_tabla_profesores
+from .read_tabla_titulaciones import read_tabla_titulaciones
+from . import update_ronda_profesor
+from .update_ronda_profesor import calcula_ronda
+from .update_ronda_profesor import clase_categoria
+from .workbook_cache import cache_key
+from .workbook_cache import read_workbook_cache
+from .workbook_cache import write_workbook_cache
+
+
+def print_timing(label, t_ini):
+    """Display the time employed since t_ini"""
+    print(f'   {label}: {time.perf_counter() - t_ini:.3f} s')
+
+
+# Excel file opened by each worker process when reading the subject
+# tables in parallel
+_worker_workbook = None
+
+
+def _init_worker(xlsxfilename):
+    """Open the Excel file once in each worker process"""
+    global _worker_workbook
+    _worker_workbook = pd.ExcelFile(xlsxfilename)
+
+
+def _read_tabla_asignaturas_worker(xlsxfilename, course, sheet_name):
+    """Read subject table in a worker process"""
+    t_ini = time.perf_counter()
+    tabla_asignaturas = read_tabla_asignaturas(
+        xlsxfilename=xlsxfilename,
+        course=course,
+        sheet_name=sheet_name,
+        workbook=_worker_workbook
+    )
+    return tabla_asignaturas, time.perf_counter() - t_ini
+
+
+def read_tablas_asignaturas(xlsxfilename, course, titulaciones, workbook,
+                            debug=False, jobs=1):
+    """Read the subject tables of all the degrees.
+
+    Parameters
+    ----------
+    xlsxfilename : str
+        Excel file with input data.
+    course : str
+        Academic course (e.g. 2019-2020).
+    titulaciones : list of str
+        Names of the degrees (one sheet per degree).
+    workbook : pandas.ExcelFile
+        Excel file already opened, employed in serial mode.
+    debug : bool
+        If True, display additional information. This forces the
+        serial mode.
+    jobs : int
+        Number of worker processes. When larger than 1, the sheets are
+        parsed concurrently, each worker opening the Excel file once.
+
+    Returns
+    -------
+    tablas : list of pandas.DataFrame
+        Subject tables, in the same order as titulaciones.
+
+    """
+
+    tablas = []
+    if jobs <= 1 or debug or len(titulaciones) < 2:
+        for titulacion in titulaciones:
+            t_ini = time.perf_counter()
+            tablas.append(read_tabla_asignaturas(
+                xlsxfilename=xlsxfilename,
+                course=course,
+                sheet_name=titulacion,
+                debug=debug,
+                workbook=workbook
+            ))
+            print_timing(f'sheet "{titulacion}"', t_ini)
+        return tablas
+
+    jobs = min(jobs, len(titulaciones))
+    print(f'   using {jobs} worker processes')
+    with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(xlsxfilename,)
+    ) as executor:
+        futures = [
+            executor.submit(_read_tabla_asignaturas_worker,
+                            xlsxfilename, course, titulacion)
+            for titulacion in titulaciones
+        ]
+        # results are collected in the original order of the degrees, so
+        # that the first failing sheet raises its exception here
+        for titulacion, future in zip(titulaciones, futures):
+            tabla_asignaturas, elapsed = future.result()
+            print(f'   sheet "{titulacion}": {elapsed:.3f} s (worker)')
+            tablas.append(tabla_asignaturas)
+    return tablas
+
+
+def prepare_tabla_asignaturas(tabla_asignaturas):
+    """Include the columns employed during the subject assignment"""
+
+    # incluye columna con nuevo profesor
+    tabla_asignaturas['nuevo_profesor'] = ' '
+    # incluye columna con créditos disponibles
+    tabla_asignaturas['creditos_disponibles'] = \
+        tabla_asignaturas['creditos_iniciales']
+    # incluye número de fila en la tabla
+    tabla_asignaturas['num'] = np.arange(1, tabla_asignaturas.shape[0] + 1)
+    return tabla_asignaturas.copy()
+
+
+def read_workbook(xlsxfilename, course, debug=False, cache_dir=None, jobs=1,
+                  lazy=False, xlsxhash=None):
+    """Read all the relevant sheets of the Excel input file.
+
+    The Excel file is opened only once, and the same handle is employed
+    to parse the list of degrees, the subjects of each degree and the
+    list of teachers.
+
+    When cache_dir is provided, the parsed tables are stored in that
+    directory, and subsequent calls with the same workbook content and
+    course retrieve them from there without parsing the Excel file.
+
+    Parameters
+    ----------
+    xlsxfilename : str
+        Excel file with input data.
+    course : str
+        Academic course (e.g. 2019-2020).
+    debug : bool
+        If True, display additional information.
+    cache_dir : str or None
+        Directory employed to cache the parsed tables. If None, the
+        cache is not used.
+    jobs : int
+        Number of worker processes employed to parse the subject
+        tables. The default value (1) reads the sheets serially.
+    lazy : bool
+        If True (and the tables are not found in the cache), the
+        subject sheets are only pre-scanned to obtain the UUIDs and the
+        total number of credits of each degree, and every table is
+        parsed the first time it is accessed. In this case the tables
+        are not stored in the cache.
+    xlsxhash : str or None
+        Hash of the content of the Excel file (see file_hash), if it
+        has already been computed.
+
+    Returns
+    -------
+    tabla_titulaciones : pandas.DataFrame
+        Table of degrees, including the columns with the total number
+        of credits.
+    bigdict_tablas_asignaturas : dict or LazyTablasAsignaturas
+        Dictionary with the table of subjects of each degree.
+    tabla_profesores : pandas.DataFrame
+        Table of teachers, including the columns employed to keep track
+        of the subject assignment.
+
+    """
+
+    t_start = time.perf_counter()
+    if cache_dir is not None:
+        key = cache_key(xlsxfilename, course,
+                        extra_modules=[sys.modules[__name__], definitions,
+                                       update_ronda_profesor],
+                        xlsxhash=xlsxhash)
+        tablas = read_workbook_cache(cache_dir, key)
+        if tablas is not None:
+            print(ctext(f'\nWorkbook loaded from cache {cache_dir} in '
+                        f'{time.perf_counter() - t_start:.3f} s', fg='blue'))
+            return tablas
+
+    workbook = pd.ExcelFile(xlsxfilename)
+    print_timing('open workbook', t_start)
+
+    try:
+        # ---
+        # titulaciones
+        print(ctext('\n-> Updating subjects', fg='green', bold=True))
+        t_ini = time.perf_counter()
+        tabla_titulaciones = read_tabla_titulaciones(
+            xlsxfilename=xlsxfilename,
+            course=course,
+            debug=debug,
+            workbook=workbook
+        )
+        print_timing('sheet "Resumen Encargo"', t_ini)
+        # incluye columnas con créditos iniciales y disponibles
+        tabla_titulaciones['creditos_iniciales'] = 0.0
+        tabla_titulaciones['creditos_elegidos'] = 0.0
+        tabla_titulaciones['creditos_disponibles'] = 0.0
+        tabla_titulaciones['creditos_beccol'] = 0.0
+        titulaciones = tabla_titulaciones['titulacion'].tolist()
+
+        # ---
+        # asignaturas de cada titulacion
+        if lazy:
+            uuids = dict()
+            for uuid_titu, titulacion in zip(tabla_titulaciones.index,
+                                             titulaciones):
+                t_ini = time.perf_counter()
+                uuids[titulacion], creditos_iniciales, creditos_beccol = \
+                    prescan_tabla_asignaturas(workbook, course, titulacion)
+                print_timing(f'sheet "{titulacion}" (pre-scan)', t_ini)
+                tabla_titulaciones.loc[uuid_titu, 'creditos_iniciales'] = \
+                    creditos_iniciales
+                tabla_titulaciones.loc[uuid_titu, 'creditos_disponibles'] = \
+                    creditos_iniciales
+                tabla_titulaciones.loc[uuid_titu, 'creditos_beccol'] = \
+                    creditos_beccol
+
+            def loader(titulacion):
+                t_ini = time.perf_counter()
+                tabla_asignaturas = prepare_tabla_asignaturas(
+                    read_tabla_asignaturas(
+                        xlsxfilename=xlsxfilename,
+                        course=course,
+                        sheet_name=titulacion,
+                        debug=debug,
+                        workbook=workbook
+                    )
+                )
+                print_timing(f'sheet "{titulacion}" (on demand)', t_ini)
+                return tabla_asignaturas
+
+            bigdict_tablas_asignaturas = LazyTablasAsignaturas(
+                titulaciones, uuids, loader, workbook
+            )
+            sources = list(uuids.items())
+        else:
+            tablas = read_tablas_asignaturas(
+                xlsxfilename=xlsxfilename,
+                course=course,
+                titulaciones=titulaciones,
+                workbook=workbook,
+                debug=debug,
+                jobs=jobs
+            )
+            bigdict_tablas_asignaturas = {}
+            for uuid_titu, titulacion, dumtable in zip(
+                    tabla_titulaciones.index, titulaciones, tablas):
+                dumtable = prepare_tabla_asignaturas(dumtable)
+                bigdict_tablas_asignaturas[titulacion] = dumtable
+                # actualiza número total de créditos disponibles (todas las
+                # asignaturas) en tabla de titulaciones
+                tabla_titulaciones.loc[uuid_titu, 'creditos_iniciales'] = \
+                    dumtable['creditos_iniciales'].sum()
+                tabla_titulaciones.loc[uuid_titu, 'creditos_disponibles'] = \
+                    dumtable['creditos_iniciales'].sum()
+                sumproduct = \
+                    dumtable['creditos_disponibles'] * dumtable['bec_col']
+                tabla_titulaciones.loc[uuid_titu, 'creditos_beccol'] = \
+                    sumproduct.sum()
+            sources = list(bigdict_tablas_asignaturas.items())
+        # comprueba que los UUIDs son únicos al mezclar todas las asignaturas
+        check_unique_uuids(
+            sources,
+            errmsg='UUIDs are not unique when mixing all the subjects!'
+        )
+
+        # ---
+        # profesores
+        print(ctext('\n-> Updating teachers', fg='green', bold=True))
+        t_ini = time.perf_counter()
+        tabla_profesores = read_tabla_profesores(
+            xlsxfilename=xlsxfilename,
+            course=course,
+            debug=debug,
+            workbook=workbook
+        )
+        print_timing('sheet "Asignación"', t_ini)
+    except Exception:
+        workbook.close()
+        raise
+
+    if not lazy:
+        workbook.close()
+
+    # transforma el encargo de cada profesor de horas a créditos
+    tabla_profesores['encargo'] /= 10
+    # define columna para almacenar docencia elegida
+    tabla_profesores['asignados'] = 0.0
+    # define columna para almacenar diferencia entre encargo y eleccion
+    tabla_profesores['diferencia'] = \
+        tabla_profesores['asignados'] - tabla_profesores['encargo']
+    # ronda inicial (sin créditos asignados), calculada a partir de la
+    # clase de la categoría de cada profesor
+    clase = clase_categoria(tabla_profesores['categoria'])
+    tabla_profesores['ronda'] = calcula_ronda(
+        a_microcreditos(tabla_profesores['asignados']),
+        a_microcreditos(tabla_profesores['encargo']),
+        clase.to_numpy(dtype=object)
+    )
+    # los profesores sin encargo (salvo colaboradores) no eligen
+    tabla_profesores['finalizado'] = \
+        (tabla_profesores['encargo'] == 0) & (clase != 'colaborador')
+    tabla_profesores['num'] = np.arange(1, len(tabla_profesores) + 1)
+    tabla_profesores['clase'] = clase
+
+    print(ctext(f'\nWorkbook loaded in {time.perf_counter() - t_start:.3f} s',
+                fg='blue'))
+
+    if cache_dir is not None and not lazy:
+        write_workbook_cache(cache_dir, key, xlsxfilename, course,
+                             tabla_titulaciones, bigdict_tablas_asignaturas,
+                             tabla_profesores)
+
+    return tabla_titulaciones, bigdict_tablas_asignaturas, tabla_profesores
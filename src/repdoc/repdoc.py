@@ -8,19 +8,16 @@
 #
 
 import argparse
-from datetime import datetime
-import os
-import pandas as pd
-import platform
-import PySimpleGUI as sg
 import sys
+import threading
+import time
 
+from .allocation_editor import AllocationEditor
+from .bitacora_buffer import BitacoraBuffer
+from .compact import compact
 from .ctext import ctext
-from .date_last_update import datetime_short
-from .define_gui_layout import define_gui_layout
 from .display_in_terminal import display_in_terminal
 from .export_to_html_bitacora import export_to_html_bitacora
-from .export_to_html_index import export_to_html_index
 from .export_to_html_profesores import export_to_html_profesores
 from .export_to_html_resultado import export_to_html_resultado
 from .export_to_html_tablas_asignaturas import \
@@ -29,30 +26,48 @@ from .export_to_html_titulaciones import export_to_html_titulaciones
 from .filtra_asignaturas import filtra_asignaturas
 from .filtra_seleccion_del_profesor import filtra_seleccion_del_profesor
 from .filtra_titulaciones import filtra_titulaciones
-from .new_uuid import new_uuid
-from .read_tabla_asignaturas import read_tabla_asignaturas
-from .read_tabla_profesores import read_tabla_profesores
+from .history import history
+from .load_tables import LOADING_STAGES
+from .load_tables import load_tables
+from .log_execution_command import log_execution_command
 from .read_tabla_titulaciones import read_tabla_titulaciones
+from .read_workbook import print_timing
+from .report import report
 from .rsync_html_files import rsync_html_files
-from .update_ronda_profesor import update_ronda_profesor
+from .summary_view import SummaryView
+from . import IMPORT_START
 from .version import version
 
-from .define_gui_layout import WIDTH_SPACES_FOR_UUID
-
-from .definitions import DEFAULT_BITACORA_XLSX_FILENAME
+from .definitions import DEFAULT_CACHE_DIR
 from .definitions import CREDITOS_ASIGNATURA
 from .definitions import FLAG_RONDA_NO_ELIGE
-from .definitions import NULL_UUID
-from .definitions import PRIMERA_RONDA_RYC
-from .definitions import ROUND_ERROR
-from .definitions import TEXT_ACTIVA_ELECCION
-from .definitions import TEXT_FINALIZA_ELECCION
+from .definitions import WIDTH_SPACES_FOR_UUID
 
 
 def main(args=None):
 
+    if args is None:
+        args = sys.argv[1:]
+    if len(args) > 0 and args[0] == 'report':
+        # headless mode (PySimpleGUI is not imported)
+        report(args[1:])
+        return
+    if len(args) > 0 and args[0] == 'compact':
+        compact(args[1:])
+        return
+    if len(args) > 0 and args[0] == 'history':
+        history(args[1:])
+        return
+
     # parse command-line options
-    parser = argparse.ArgumentParser(description='Subject assignment tool')
+    parser = argparse.ArgumentParser(
+        description='Subject assignment tool '
+                    '(use "repdoc report -h" to generate the HTML files '
+                    'without GUI, "repdoc history -h" to generate them '
+                    'at a previous round or date, and "repdoc compact -h" '
+                    'to save the journal of the bitacora in its Excel '
+                    'file)'
+    )
 
     parser.add_argument("xlsxfile",
                         help="Excel file with input data",
@@ -83,6 +98,43 @@ def main(args=None):
                         help="PySimpleGUI theme",
                         default="SandyBeach",
                         type=str)
+    parser.add_argument("--cache_dir",
+                        help="directory to cache the tables parsed from "
+                             "the Excel file",
+                        default=DEFAULT_CACHE_DIR,
+                        type=str)
+    parser.add_argument("--no_cache",
+                        help="always parse the Excel file (ignore cache)",
+                        action="store_true")
+    parser.add_argument("--jobs",
+                        help="number of processes to parse the subject "
+                             "sheets of the Excel file",
+                        default=1,
+                        type=int)
+    parser.add_argument("--lazy",
+                        help="parse each subject sheet only when it is "
+                             "needed (faster startup)",
+                        action="store_true")
+    parser.add_argument("--fsync_every",
+                        help="number of bitacora changes between disk "
+                             "synchronizations of its journal (0: only "
+                             "when exiting)",
+                        default=1,
+                        type=int)
+    parser.add_argument("--checkpoint_every",
+                        help="minimum number of new bitacora entries to "
+                             "save a checkpoint of the state (0: do not "
+                             "use checkpoints)",
+                        default=100,
+                        type=int)
+    parser.add_argument("--verify_replay",
+                        help="apply the whole bitacora and compare with "
+                             "the result obtained from the checkpoint",
+                        action="store_true")
+    parser.add_argument("--sqlite",
+                        help="keep the index of the bitacora in an "
+                             "SQLite database instead of in memory",
+                        action="store_true")
     parser.add_argument("--override_course",
                         help="override course check",
                         action="store_true")
@@ -93,7 +145,7 @@ def main(args=None):
                         help="Display full command line",
                         action="store_true")
 
-    args = parser.parse_args()
+    args = parser.parse_args(args)
 
     if args.course in ['2019-2020', '2020-2021', '2021-2022', '2022-2023', '2023-2024', '2024-2025', '2025-2026']:
         print(ctext(f'WARNING: The course {args.course} is blocked.', fg='red', bold=True))
@@ -105,14 +157,7 @@ def main(args=None):
             if continue_anyway.lower() not in ['y', 'yes']:
                 raise SystemExit('Execution aborted by user.')
 
-    execution_command = ' '.join(sys.argv)
-    if args.echo:
-        print(ctext(f'Executing: {execution_command}', fg='red', bold=True))
-    with open('last_execution_command.txt', 'a') as f:
-        f.write('-' * 79)
-        f.write(f'\n{datetime.now()}\n')
-        f.write(f'{platform.uname().node}\n')
-        f.write(f'{execution_command}\n')
+    log_execution_command(args.echo)
 
     print(ctext(f'Welcome to RepDoc version {version}', bold=True))
     copyright_symbol = '\u00a9'
@@ -125,277 +170,110 @@ def main(args=None):
     else:
         warning_collaborators = 0.0
 
-    # ---
-    # load Excel sheets
-    # ---
-
-    # variable para almacenar los UUIDs de titulaciones, asignaturas
-    # y profesores
-    megalist_uuid = []
-
-    # ---
-    # titulaciones
-    print(ctext('\n-> Updating subjects', fg='green', bold=True))
-    tabla_titulaciones = read_tabla_titulaciones(
-        xlsxfilename=args.xlsxfile.name,
-        course=args.course,
-        debug=args.debug
-    )
-    # incluye columnas con créditos iniciales y disponibles
-    tabla_titulaciones['creditos_iniciales'] = 0.0
-    tabla_titulaciones['creditos_elegidos'] = 0.0
-    tabla_titulaciones['creditos_disponibles'] = 0.0
-    tabla_titulaciones['creditos_beccol'] = 0.0
-    megalist_uuid += tabla_titulaciones.index.tolist()
-
-    # ---
-    # asignaturas de cada titulacion
-    bigdict_tablas_asignaturas = {}
-    for uuid_titu in tabla_titulaciones.index:
-        titulacion = tabla_titulaciones.loc[uuid_titu]['titulacion']
-        dumtable = read_tabla_asignaturas(
-                xlsxfilename=args.xlsxfile.name,
-                course=args.course,
-                sheet_name=titulacion,
-                debug=args.debug
-            )
-        # incluye columna con nuevo profesor
-        dumtable['nuevo_profesor'] = ' '
-        # incluye columna con créditos disponibles
-        dumtable['creditos_disponibles'] = dumtable['creditos_iniciales']
-        # incluye número de fila en la tabla
-        dumtable['num'] = 0
-        for irow, uuid_asig in enumerate(dumtable.index):
-            dumtable.loc[uuid_asig, 'num'] = irow + 1
-        bigdict_tablas_asignaturas[titulacion] = dumtable.copy()
-        # actualiza número total de créditos disponibles (todas las
-        # asignaturas) en tabla de titulaciones
-        tabla_titulaciones.loc[uuid_titu, 'creditos_iniciales'] = \
-            dumtable['creditos_iniciales'].sum()
-        tabla_titulaciones.loc[uuid_titu, 'creditos_disponibles'] = \
-            dumtable['creditos_iniciales'].sum()
-        sumproduct = dumtable['creditos_disponibles'] * dumtable['bec_col']
-        tabla_titulaciones.loc[uuid_titu, 'creditos_beccol'] = \
-            sumproduct.sum()
-    # comprueba que los UUIDs son únicos al mezclar todas las asignaturas
-    dumlist = []
-    for titulacion in tabla_titulaciones['titulacion']:
-        dumtable = bigdict_tablas_asignaturas[titulacion]
-        dumlist += dumtable.index.tolist()
-    if len(dumlist) != len(set(dumlist)):
-        for dumuuid in dumlist:
-            if dumlist.count(dumuuid) > 1:
-                print(dumuuid)
-        raise ValueError('UUIDs are not unique when mixing all the subjects!')
-    megalist_uuid += dumlist
-
-    # ---
-    # profesores
-    print(ctext('\n-> Updating teachers', fg='green', bold=True))
-    tabla_profesores = read_tabla_profesores(
-        xlsxfilename=args.xlsxfile.name,
-        course=args.course,
-        debug=args.debug
-    )
-    megalist_uuid += tabla_profesores.index.tolist()
-    # transforma el encargo de cada profesor de horas a créditos
-    tabla_profesores['encargo'] /= 10
-    # define columna para almacenar docencia elegida
-    tabla_profesores['asignados'] = 0.0
-    # define columna para almacenar diferencia entre encargo y eleccion
-    tabla_profesores['diferencia'] = \
-        tabla_profesores['asignados'] - tabla_profesores['encargo']
-    tabla_profesores['ronda'] = 0  # force column to be integer
-    tabla_profesores['finalizado'] = False
-    tabla_profesores['num'] = 0
-    for iprof, uuid_prof in enumerate(tabla_profesores.index):
-        tabla_profesores.loc[uuid_prof, 'num'] = iprof + 1
-        categoria = tabla_profesores.loc[uuid_prof]['categoria']
-        creditos_encargo = tabla_profesores.loc[uuid_prof]['encargo']
-        if categoria in ['Colaborador', 'Colaboradora']:
-            tabla_profesores.loc[uuid_prof, 'ronda'] = FLAG_RONDA_NO_ELIGE
-        elif creditos_encargo == 0:
-            tabla_profesores.loc[uuid_prof, 'ronda'] = FLAG_RONDA_NO_ELIGE
-            tabla_profesores.loc[uuid_prof, 'finalizado'] = True
-        else:
-            if 'RyC' in categoria or 'JdC' in categoria:
-                tabla_profesores.loc[uuid_prof, 'ronda'] = PRIMERA_RONDA_RYC
-            else:
-                tabla_profesores.loc[uuid_prof, 'ronda'] = 1
-
-    # comprueba que los UUIDs de titulaciones, asignaturas y profesores
-    # son todos distintos
-    if len(megalist_uuid) != len(set(megalist_uuid)):
-        for dumuuid in megalist_uuid:
-            if megalist_uuid.count(dumuuid) > 1:
-                print(dumuuid)
-        raise ValueError('UUIDs are not unique when mixing everything!')
-
-    # ---
-    # define bitacora
-    csv_colnames_profesor = ['apellidos', 'nombre', 'categoria']
-    csv_colnames_asignatura = ['curso', 'semestre', 'codigo', 'asignatura',
-                               'area', 'creditos_iniciales', 'comentarios',
-                               'grupo']
-    csv_colvalues_asignatura_null = ['-', 0, 0, '-',
-                                     '-', 0.0, '-',
-                                     '-']
-    print(ctext('\n-> Updating bitacora', fg='green', bold=True))
-    if args.bitacora is None:
-        # check that there is not a file with the expected name
-        # (in order to avoid overwriting it)
-        if os.path.isfile(DEFAULT_BITACORA_XLSX_FILENAME):
-            raise ValueError('File ' + DEFAULT_BITACORA_XLSX_FILENAME +
-                             ' already exists!')
-        # initialize empty dataframe with the expected columns
-        bitacora = pd.DataFrame(
-            data=[],
-            columns=['uuid_prof', 'uuid_titu', 'uuid_asig',
-                     'date_added', 'round_added',
-                     'date_removed', 'round_removed',
-                     'creditos_elegidos', 'explicacion'] +
-                    csv_colnames_profesor + csv_colnames_asignatura
-        )
-        bitacora.index.name = 'uuid_bita'
-        if args.debug:
-            print('Initialasing bitacora DataFrame:')
-            print(bitacora)
-            input('Press <CR> to continue...')
-    else:
-        bitacora = pd.read_excel(args.bitacora.name, index_col=0)
-        bitacora.index.name = 'uuid_bita'
-        # Forzar dtype object en columnas que deben contener strings pero
-        # pueden llegar como float64 desde Excel si están vacías
-        str_columns = ['date_removed', 'explicacion', 'comentarios', 'grupo']
-        for col in str_columns:
-            bitacora[col] = bitacora[col].astype('object')
-        # Reemplazar NaN por los valores alternativos correspondientes
-        fill_values = {
-            'date_removed': 'None',
-            'explicacion': ' ',
-            'comentarios': ' ',
-            'grupo': ' '
-        }
-        bitacora.fillna(value=fill_values, inplace=True)
-        if args.debug:
-            print('Initialising bitacora from previous file:')
-            print(bitacora)
-            input('Press <CR> to continue...')
-
-        for uuid_bita in bitacora.index.tolist():
-            uuid_prof = bitacora.loc[uuid_bita]['uuid_prof']
-            uuid_titu = bitacora.loc[uuid_bita]['uuid_titu']
-            # activate/deactivate teacher
-            if uuid_titu == NULL_UUID:
-                explicacion = bitacora.loc[uuid_bita]['explicacion']
-                if explicacion == TEXT_FINALIZA_ELECCION:
-                    tabla_profesores.loc[uuid_prof, 'finalizado'] = True
-                elif explicacion == TEXT_ACTIVA_ELECCION:
-                    tabla_profesores.loc[uuid_prof, 'finalizado'] = False
-                else:
-                    raise ValueError('Unexpected explicacion for null UUID')
-                status = False
-            else:
-                status = str(bitacora.loc[uuid_bita]['date_removed']) == 'None'
-            # apply selected subject
-            if status:
-                uuid_asig = bitacora.loc[uuid_bita]['uuid_asig']
-                creditos_elegidos = \
-                    bitacora.loc[uuid_bita]['creditos_elegidos']
-                asignacion_es_correcta = True
-                titulacion = tabla_titulaciones.loc[uuid_titu]['titulacion']
-                tabla_asignaturas = bigdict_tablas_asignaturas[titulacion]
-                if tabla_asignaturas.loc[
-                    uuid_asig, 'creditos_disponibles'
-                ] >= creditos_elegidos - ROUND_ERROR:
-                    tabla_asignaturas.loc[
-                        uuid_asig, 'creditos_disponibles'
-                    ] -= creditos_elegidos
-                    if abs(tabla_asignaturas.loc[
-                               uuid_asig, 'creditos_disponibles'
-                           ]) < ROUND_ERROR:
-                        tabla_asignaturas.loc[
-                            uuid_asig, 'creditos_disponibles'
-                        ] = 0
-                    nuevo_profesor = \
-                        tabla_profesores.loc[uuid_prof]['nombre'] + ' ' + \
-                        tabla_profesores.loc[uuid_prof]['apellidos']
-                    if bool(
-                        tabla_asignaturas.loc[
-                            uuid_asig, 'nuevo_profesor'
-                        ].strip()
-                    ):
-                        tabla_asignaturas.loc[uuid_asig, 'nuevo_profesor'] += \
-                            ' + ' + nuevo_profesor
-                    else:
-                        tabla_asignaturas.loc[uuid_asig, 'nuevo_profesor'] = \
-                            nuevo_profesor
-                else:
-                    print('¡Créditos disponibles insuficientes!')
-                    asignacion_es_correcta = False
-                if asignacion_es_correcta:
-                    tabla_titulaciones.loc[
-                        uuid_titu, 'creditos_disponibles'
-                    ] = tabla_asignaturas['creditos_disponibles'].sum()
-                    sumproduct = tabla_asignaturas['creditos_disponibles'] * \
-                                 tabla_asignaturas['bec_col']
-                    tabla_titulaciones.loc[uuid_titu, 'creditos_beccol'] = \
-                        sumproduct.sum()
-                    tabla_titulaciones.loc[
-                        uuid_titu, 'creditos_elegidos'
-                    ] = tabla_titulaciones.loc[uuid_titu,
-                                               'creditos_iniciales'] - \
-                          tabla_titulaciones.loc[uuid_titu,
-                                                 'creditos_disponibles']
-                    tabla_profesores.loc[
-                        uuid_prof, 'asignados'
-                    ] += creditos_elegidos
-                    tabla_profesores.loc[
-                        uuid_prof, 'diferencia'
-                    ] = tabla_profesores.loc[uuid_prof, 'asignados'] - \
-                        tabla_profesores.loc[uuid_prof, 'encargo']
-                    update_ronda_profesor(tabla_profesores, uuid_prof)
-                else:
-                    print('* uuid_bita:', uuid_bita)
-                    print('* uuid_prof:', uuid_prof)
-                    print('* uuid_titu:', uuid_titu)
-                    print('* uuid_asig:', uuid_asig)
-                    raise ValueError('Error while processing bitacora!')
-
-    # ---
-    # export to HTML files
-    export_to_html_index(args.course)
-    export_to_html_bitacora(bitacora, args.bitacora, args.course)
-    export_to_html_titulaciones(tabla_titulaciones, args.course)
-    export_to_html_tablas_asignaturas(bigdict_tablas_asignaturas,
-                                      args.course)
-    export_to_html_profesores(tabla_profesores, bitacora, 0, args.course)
-    export_to_html_resultado(tabla_profesores, bigdict_tablas_asignaturas,
-                             bitacora, args.course)
-    if args.web:
-        rsync_html_files(args.course, args.xlsxfile, args.bitacora)
-
     # ---
     # GUI
 
+    # the GUI modules are only imported when needed
+    print_timing('import modules', IMPORT_START)
+    t_ini = time.perf_counter()
+    import PySimpleGUI as sg
+    from .define_gui_layout import define_gui_layout
+    print_timing('import PySimpleGUI', t_ini)
+
     # set global GUI options
     sg.SetOptions(font=(args.fontname, args.fontsize))
 
     # set theme (it must be done before defining the layout)
     # use the following code to display available options:
-    #    import PySimpleGUI as sg
-    #    sg.theme_previewer()
+    #        #    sg.theme_previewer()
     sg.theme(args.theme)    # Another good option is 'Default'
 
+    # the list of degrees (a single small sheet) is required to define
+    # the GUI layout; the remaining tables are loaded in the background
+    titulaciones = read_tabla_titulaciones(
+        xlsxfilename=args.xlsxfile.name,
+        course=args.course
+    )['titulacion'].tolist()
+
     # define GUI layout
-    num_titulaciones = tabla_titulaciones.shape[0]
-    layout = define_gui_layout(args.fontname, args.fontsize, num_titulaciones)
+    num_titulaciones = len(titulaciones)
+    layout = define_gui_layout(args.fontname, args.fontsize, num_titulaciones,
+                               num_loading_stages=len(LOADING_STAGES))
 
     # define GUI window
     window = sg.Window(
         'Reparto Docente (FTA), Curso ' + args.course,
         use_default_focus=False
     ).Layout(layout)
+    window.Read(timeout=1)  # for the next updates to work
+    for i, titulacion in enumerate(titulaciones):
+        window.Element(f'_summary_titulacion_{i + 1:02d}_').Update(titulacion)
+
+    # ---
+    # load Excel sheets, apply bitacora and export initial HTML files in
+    # a worker thread, which informs the event loop through events
+
+    def load_tables_in_background():
+        t_ini = time.perf_counter()
+        try:
+            tablas = load_tables(
+                xlsxfile=args.xlsxfile,
+                course=args.course,
+                bitacora=args.bitacora,
+                debug=args.debug,
+                cache_dir=None if args.no_cache else args.cache_dir,
+                jobs=args.jobs,
+                lazy=args.lazy,
+                web=args.web,
+                fsync_every=args.fsync_every,
+                sqlite=args.sqlite,
+                checkpoint_every=args.checkpoint_every,
+                verify_replay=args.verify_replay,
+                progress=lambda istage, label: window.write_event_value(
+                    '_carga_progreso_', (istage, label)
+                )
+            )
+        except Exception as e:
+            window.write_event_value('_carga_error_', e)
+        else:
+            window.write_event_value(
+                '_carga_completada_', (tablas, time.perf_counter() - t_ini)
+            )
+
+    threading.Thread(target=load_tables_in_background, daemon=True).start()
+
+    while True:
+        event, values = window.Read()
+        if event == '_carga_progreso_':
+            istage, label = values[event]
+            window.Element('_estado_carga_').Update(
+                f'Cargando ({istage + 1}/{len(LOADING_STAGES)}): {label}...'
+            )
+            window.Element('_progreso_carga_').UpdateBar(istage)
+        elif event == '_carga_completada_':
+            tablas, elapsed = values[event]
+            window.Element('_estado_carga_').Update(
+                f'Tablas cargadas en {elapsed:.1f} s'
+            )
+            window.Element('_progreso_carga_').UpdateBar(len(LOADING_STAGES))
+            break
+        elif event == '_carga_error_':
+            window.Close()
+            raise values[event]
+        elif event is None or event == "_salir_":
+            window.Close()
+            raise SystemExit('Execution aborted by user.')
+
+    tabla_titulaciones, bigdict_tablas_asignaturas, tabla_profesores, \
+        tabla_bitacora, journal, indice_bitacora, uuid_registry, state = \
+        tablas
+    bitacora = BitacoraBuffer(tabla_bitacora)
+    editor = AllocationEditor(state, bitacora, journal, indice_bitacora,
+                              uuid_registry)
+    summary = SummaryView(window, state)
+    for key in ['_excluir_asignaturas_beccol_', '_ronda_',
+                '_establecer_ronda_']:
+        window.Element(key).Update(disabled=False)
 
     # ---
     # define auxiliary functions
@@ -435,50 +313,12 @@ def main(args=None):
         window.Element('_cancelar_').Update(disabled=True)
 
     def update_info_creditos():
-        """Update general credit info
+        """Update general credit info (only the modified values)
 
         """
 
-        total_iniciales = 0.0
-        total_disponibles = 0.0
-        total_elegidos = 0.0
-        total_disponibles_beccol = 0.0
-        cout = '{0:7.3f}'
-        num_titulaciones = tabla_titulaciones.shape[0]
-        for i in range(num_titulaciones):
-            clabel = f'_{i + 1:02d}_'
-            uuid_titu = tabla_titulaciones.index[i]
-            titulacion = tabla_titulaciones.loc[uuid_titu]['titulacion']
-            window.Element('_summary_titulacion' + clabel).Update(titulacion)
-            #
-            tabla_asignaturas = bigdict_tablas_asignaturas[titulacion]
-            creditos_iniciales = tabla_asignaturas['creditos_iniciales'].sum()
-            window.Element('_summary_total' + clabel).Update(
-                cout.format(creditos_iniciales))
-            total_iniciales += creditos_iniciales
-            creditos_disponibles = tabla_asignaturas[
-                'creditos_disponibles'].sum()
-            window.Element('_summary_disponibles' + clabel).Update(
-                cout.format(creditos_disponibles))
-            total_disponibles += creditos_disponibles
-            creditos_elegidos = creditos_iniciales - creditos_disponibles
-            window.Element('_summary_elegidos' + clabel).Update(
-                cout.format(creditos_elegidos))
-            total_elegidos += creditos_elegidos
-            sumproduct = tabla_asignaturas['creditos_disponibles'] * \
-                         tabla_asignaturas['bec_col']
-            creditos_disponibles_beccol = sumproduct.sum()
-            window.Element('_summary_beccol' + clabel).Update(
-                cout.format(creditos_disponibles_beccol))
-            total_disponibles_beccol += creditos_disponibles_beccol
-        window.Element('_summary_total_').Update(
-            value=cout.format(total_iniciales))
-        window.Element('_summary_elegidos_').Update(
-            value=cout.format(total_elegidos))
-        window.Element('_summary_disponibles_').Update(
-            value=cout.format(total_disponibles))
-        window.Element('_summary_beccol_').Update(
-            value=cout.format(total_disponibles_beccol))
+        summary.refresh()
+        total_disponibles_beccol = state.total('creditos_beccol')
 
         global warning_collaborators
         if warning_collaborators > 0.0:
@@ -489,6 +329,19 @@ def main(args=None):
                 ### sg.PopupOK(msg, auto_close=True, auto_close_duration=5)
                 warning_collaborators = 0.0
 
+    def upload_html_files():
+        # the Excel file with the bitacora is also uploaded, together with
+        # its journal (the bitacora is only compacted when exiting)
+        rsync_html_files(args.course, args.xlsxfile, args.bitacora,
+                         journal=journal)
+
+    def after_change():
+        # copy the rows modified by the change to the tables employed
+        # by the exporters
+        state.update_tables()
+        window.Element('_deshacer_').Update(disabled=not editor.can_undo)
+        window.Element('_rehacer_').Update(disabled=not editor.can_redo)
+
     def comprueba_ronda_profesor(ronda_profesor):
         ronda_actual = int(values['_ronda_'])
         if ronda_actual != 0:
@@ -499,7 +352,6 @@ def main(args=None):
                 ### sg.PopupOK(msg, auto_close=True, auto_close_duration=2)
 
     # update initial info
-    window.Read(timeout=1)  # for next function to work
     update_info_creditos()
 
     creditos_max_asignatura = 0.0
@@ -535,12 +387,9 @@ def main(args=None):
                     umbral = (float(ronda - 1) + 0.5) * CREDITOS_ASIGNATURA
                 print('--> ronda............:', ronda)
                 print('--> umbral (créditos):', umbral)
-                for uuid_prof in tabla_profesores.index:
-                    iprof = tabla_profesores.loc[uuid_prof]['num']
-                    nombre_completo = \
-                        f'{iprof:2d}. ' + \
-                        tabla_profesores.loc[uuid_prof]['nombre'] + ' ' + \
-                        tabla_profesores.loc[uuid_prof]['apellidos']
+                for iprof, (uuid_prof, num) in enumerate(
+                        tabla_profesores['num'].items()):
+                    nombre_completo = f'{num:2d}. ' + state.nombres[iprof]
                     ldum = len(nombre_completo)
                     if ldum < WIDTH_SPACES_FOR_UUID:
                         nombre_completo += (WIDTH_SPACES_FOR_UUID - ldum) * ' '
@@ -548,14 +397,15 @@ def main(args=None):
                     if ronda == 0:
                         num_profesores += 1
                         lista_profesores.append(nombre_completo)
-                    elif tabla_profesores.loc[uuid_prof]['ronda'] <= ronda:
-                        if not tabla_profesores.loc[uuid_prof]['finalizado']:
+                    elif state.profesores['ronda'][iprof] <= ronda:
+                        if not state.profesores['finalizado'][iprof]:
                             num_profesores += 1
                             lista_profesores.append(nombre_completo)
-                export_to_html_profesores(tabla_profesores, bitacora, ronda,
-                                          args.course)
+                export_to_html_profesores(tabla_profesores,
+                                          bitacora.dataframe(), ronda,
+                                          args.course, indice_bitacora)
                 if args.web:
-                    rsync_html_files(args.course, args.xlsxfile, args.bitacora)
+                    upload_html_files()
             clear_screen_profesor()
             window.Element('_num_prof_seleccionados_').Update(
                 str(num_profesores)
@@ -571,10 +421,11 @@ def main(args=None):
                 clear_screen_profesor(profesor_disabled=False)
             else:
                 uuid_prof = values['_profesor_'][-36:]
-                encargo = tabla_profesores.loc[uuid_prof]['encargo']
-                asignados = tabla_profesores.loc[uuid_prof]['asignados']
-                diferencia = tabla_profesores.loc[uuid_prof]['diferencia']
-                ronda_profesor = tabla_profesores.loc[uuid_prof]['ronda']
+                profesor = state.profesor(uuid_prof)
+                encargo = profesor['encargo']
+                asignados = profesor['asignados']
+                diferencia = profesor['diferencia']
+                ronda_profesor = profesor['ronda']
                 window.Element('_ronda_profesor_').Update(ronda_profesor)
                 comprueba_ronda_profesor(ronda_profesor)
                 window.Element('_encargo_prof_').Update(round(encargo, 4))
@@ -583,7 +434,7 @@ def main(args=None):
                     round(diferencia, 4)
                 )
                 seleccion_del_profesor = filtra_seleccion_del_profesor(
-                    uuid_prof, bitacora
+                    uuid_prof, bitacora.dataframe(), indice_bitacora
                 )
                 if len(seleccion_del_profesor) > 1:
                     window.Element('_docencia_asignada_').Update(
@@ -595,7 +446,7 @@ def main(args=None):
                         values=['---'],
                         disabled=True
                     )
-                if tabla_profesores.loc[uuid_prof]['finalizado']:
+                if profesor['finalizado']:
                     window.Element('_continuar_').Update(disabled=True)
                     window.Element('_profesor_finalizado_').Update(
                         text='Activar elección en rondas'
@@ -634,68 +485,25 @@ def main(args=None):
         # ---
         elif event == '_eliminar_':
             uuid_bita = values['_docencia_asignada_'][-36:]
-            tmp_series = bitacora.loc[uuid_bita].copy()
-            if tmp_series.ndim != 1:
-                print(tmp_series)
-                raise ValueError('Something is wrong with tmpdf')
-            uuid_prof = tmp_series['uuid_prof']
-            uuid_titu = tmp_series['uuid_titu']
-            uuid_asig = tmp_series['uuid_asig']
-            creditos_a_recuperar = tmp_series['creditos_elegidos']
+            uuid_prof = bitacora.entry(uuid_bita)['uuid_prof']
             msg = '¿Seguro que quiere eliminar esta selección (y/n)? '
             dummy = sg.PopupYesNo(msg)
             ### dummy = input(ctext(msg, bg='green'))
             if dummy.lower() in ['y', 'yes']:
-                devolucion_correcta = True
-                if tabla_profesores.loc[
-                    uuid_prof, 'asignados'
-                ] >= creditos_a_recuperar:
-                    tabla_profesores.loc[
-                        uuid_prof, 'asignados'
-                    ] -= creditos_a_recuperar
-                    tabla_profesores.loc[
-                        uuid_prof, 'diferencia'
-                    ] = tabla_profesores.loc[uuid_prof, 'asignados'] - \
-                        tabla_profesores.loc[uuid_prof, 'encargo']
-                    update_ronda_profesor(tabla_profesores, uuid_prof)
-                else:
-                    print('¡El profesor no tiene créditos suficientes!')
-                    input('Press <CR> to continue...')
-                    devolucion_correcta = False
-                if devolucion_correcta:
-                    titulacion = tabla_titulaciones.loc[uuid_titu][
-                        'titulacion']
-                    tabla_asignaturas = bigdict_tablas_asignaturas[titulacion]
-                    tabla_asignaturas.loc[
-                        uuid_asig, 'creditos_disponibles'
-                    ] += creditos_a_recuperar
-                    nuevo_profesor = \
-                        tabla_profesores.loc[uuid_prof]['nombre'] + ' ' + \
-                        tabla_profesores.loc[uuid_prof]['apellidos']
-                    tabla_asignaturas.loc[uuid_asig, 'nuevo_profesor'] += \
-                        ' - ' + nuevo_profesor
-                    tabla_titulaciones.loc[
-                        uuid_titu, 'creditos_disponibles'
-                    ] = tabla_asignaturas['creditos_disponibles'].sum()
-                    sumproduct = tabla_asignaturas['creditos_disponibles'] * \
-                                 tabla_asignaturas['bec_col']
-                    tabla_titulaciones.loc[
-                        uuid_titu, 'creditos_elegidos'
-                    ] = tabla_titulaciones.loc[uuid_titu,
-                                               'creditos_iniciales'] - \
-                          tabla_titulaciones.loc[uuid_titu,
-                                                 'creditos_disponibles']
-                    tabla_titulaciones.loc[uuid_titu, 'creditos_beccol'] = \
-                        sumproduct.sum()
-                    # set date_removed
-                    ronda_actual = int(values['_ronda_'])
-                    bitacora.loc[uuid_bita, 'date_removed'] = datetime_short()
-                    bitacora.loc[uuid_bita, 'round_removed'] = ronda_actual
+                ronda_actual = int(values['_ronda_'])
+                try:
+                    editor.remove_choice(uuid_bita, ronda_actual)
+                except (ValueError, OSError) as e:
+                    # the state is not modified (see AllocationEditor)
+                    print(ctext(str(e), fg='red'))
+                    sg.Popup('ERROR', str(e))
+                after_change()
                 # update info for teacher
-                encargo = tabla_profesores.loc[uuid_prof]['encargo']
-                asignados = tabla_profesores.loc[uuid_prof]['asignados']
-                diferencia = tabla_profesores.loc[uuid_prof]['diferencia']
-                ronda_profesor = tabla_profesores.loc[uuid_prof]['ronda']
+                profesor = state.profesor(uuid_prof)
+                encargo = profesor['encargo']
+                asignados = profesor['asignados']
+                diferencia = profesor['diferencia']
+                ronda_profesor = profesor['ronda']
                 window.Element('_ronda_profesor_').Update(ronda_profesor)
                 comprueba_ronda_profesor(ronda_profesor)
                 window.Element('_encargo_prof_').Update(round(encargo, 4))
@@ -704,7 +512,7 @@ def main(args=None):
                     round(diferencia, 4)
                 )
                 seleccion_del_profesor = filtra_seleccion_del_profesor(
-                    uuid_prof, bitacora
+                    uuid_prof, bitacora.dataframe(), indice_bitacora
                 )
                 if len(seleccion_del_profesor) > 1:
                     window.Element('_docencia_asignada_').Update(
@@ -718,66 +526,49 @@ def main(args=None):
                     )
                 window.Element('_eliminar_').Update(disabled=True)
                 update_info_creditos()
-                export_to_html_bitacora(bitacora, args.bitacora, args.course)
+                export_to_html_bitacora(bitacora.dataframe(), args.course)
                 export_to_html_titulaciones(tabla_titulaciones, args.course)
                 export_to_html_tablas_asignaturas(bigdict_tablas_asignaturas,
                                                   args.course)
                 ronda_actual = int(values['_ronda_'])
-                export_to_html_profesores(tabla_profesores, bitacora,
-                                          ronda_actual, args.course)
+                export_to_html_profesores(tabla_profesores,
+                                          bitacora.dataframe(),
+                                          ronda_actual, args.course,
+                                          indice_bitacora)
                 export_to_html_resultado(tabla_profesores,
                                          bigdict_tablas_asignaturas,
-                                         bitacora, args.course)
+                                         bitacora.dataframe(), args.course,
+                                         indice_bitacora)
                 if args.web:
-                    rsync_html_files(args.course, args.xlsxfile, args.bitacora)
+                    upload_html_files()
         # ---
         elif event == '_profesor_finalizado_':
             uuid_prof = values['_profesor_'][-36:]
             if uuid_prof is None:
                 raise ValueError('Unexpected uuid_prof == None')
             #
-            if tabla_profesores.loc[uuid_prof]['finalizado']:
+            ronda_actual = int(values['_ronda_'])
+            if editor.toggle_finalizado(uuid_prof, ronda_actual):
                 window.Element('_profesor_finalizado_').Update(
-                    text='Finalizar elección en rondas'
+                    text='Activar elección en rondas'
                 )
-                tabla_profesores.loc[uuid_prof, 'finalizado'] = False
-                window.Element('_continuar_').Update(disabled=False)
-                explicacion = TEXT_ACTIVA_ELECCION
+                window.Element('_continuar_').Update(disabled=True)
             else:
                 window.Element('_profesor_finalizado_').Update(
-                    text='Activar elección en rondas'
+                    text='Finalizar elección en rondas'
                 )
-                tabla_profesores.loc[uuid_prof, 'finalizado'] = True
-                window.Element('_continuar_').Update(disabled=True)
-                explicacion = TEXT_FINALIZA_ELECCION
-            #
-            # prepare new entry for bitacora
-            uuid_bita = str(new_uuid(megalist_uuid))
-            uuid_titu = NULL_UUID
-            uuid_asig = NULL_UUID
-            creditos_elegidos = 0.0
-            ronda_actual = int(values['_ronda_'])
-            data_row = [uuid_prof, uuid_titu, uuid_asig,
-                        datetime_short(), ronda_actual,
-                        'None', 'None',
-                        creditos_elegidos, explicacion]
-            for item in csv_colnames_profesor:
-                data_row.append(tabla_profesores.loc[uuid_prof][item])
-            for idum in range(len(csv_colnames_asignatura)):
-                data_row.append(csv_colvalues_asignatura_null[idum])
-            new_entry = pd.DataFrame(data=[data_row],
-                                     index=[uuid_bita],
-                                     columns=bitacora.columns.tolist())
-            bitacora = pd.concat([bitacora, new_entry])
-            bitacora.index.name = 'uuid_bita'
+                window.Element('_continuar_').Update(disabled=False)
+            after_change()
             if args.debug:
-                print(bitacora)
-            export_to_html_bitacora(bitacora, args.bitacora, args.course)
+                print(bitacora.dataframe())
+            export_to_html_bitacora(bitacora.dataframe(), args.course)
             ronda_actual = int(values['_ronda_'])
-            export_to_html_profesores(tabla_profesores, bitacora,
-                                      ronda_actual, args.course)
+            export_to_html_profesores(tabla_profesores,
+                                      bitacora.dataframe(),
+                                      ronda_actual, args.course,
+                                      indice_bitacora)
             if args.web:
-                rsync_html_files(args.course, args.xlsxfile, args.bitacora)
+                upload_html_files()
         # ---
         elif event == '_titulacion_':
             titulacion = values['_titulacion_']
@@ -844,8 +635,8 @@ def main(args=None):
                 uuid_asig = values['_asignatura_elegida_'][-36:]
                 titulacion = tabla_titulaciones.loc[uuid_titu][
                     'titulacion']
-                creditos_max_asignatura = bigdict_tablas_asignaturas[
-                    titulacion].loc[uuid_asig]['creditos_disponibles']
+                creditos_max_asignatura = state.asignatura(
+                    uuid_titu, uuid_asig)['creditos_disponibles']
                 antiguedad_asignatura_str = bigdict_tablas_asignaturas[
                     titulacion].loc[uuid_asig]['antiguedad']
                 profesor_anterior = bigdict_tablas_asignaturas[
@@ -868,10 +659,7 @@ def main(args=None):
                     value=False, disabled=False
                 )
                 window.Element('_creditos_elegidos_').Update(
-                    str(round(
-                        bigdict_tablas_asignaturas[titulacion].loc[
-                            uuid_asig]['creditos_disponibles'], 4)
-                    )
+                    str(round(creditos_max_asignatura, 4))
                 )
                 window.Element('_confirmar_').Update(disabled=True)
         # ---
@@ -942,80 +730,30 @@ def main(args=None):
             uuid_titu = values['_titulacion_'][-36:]
             uuid_asig = values['_asignatura_elegida_'][-36:]
             creditos_elegidos = float(values['_creditos_elegidos_'])
-            titulacion = tabla_titulaciones.loc[uuid_titu]['titulacion']
-            tabla_asignaturas = bigdict_tablas_asignaturas[titulacion]
-            # evitamos restar dos números reales iguales para evitar errores
-            # de redondeo
-            # ojo: ver sintaxis para evitar problemas de modificación de
-            # una columna ('creditos_disponibles') que se ha generado como
-            # una copia de otra ('creditos_iniciales')
             asignacion_es_correcta = True
-            if values['_fraccion_todo_']:
-                tabla_asignaturas.loc[uuid_asig,
-                                      'creditos_disponibles'] = 0
-            elif values['_fraccion_parte_']:
-                if tabla_asignaturas.loc[
-                    uuid_asig, 'creditos_disponibles'
-                ] > creditos_elegidos - ROUND_ERROR:
-                    tabla_asignaturas.loc[
-                        uuid_asig, 'creditos_disponibles'
-                    ] -= creditos_elegidos
-                    if abs(tabla_asignaturas.loc[
-                               uuid_asig, 'creditos_disponibles'
-                           ]) < ROUND_ERROR:
-                        tabla_asignaturas.loc[
-                            uuid_asig, 'creditos_disponibles'
-                        ] = 0
-                else:
-                    print('¡Créditos disponibles insuficientes!')
-                    input('Press <CR> to continue...')
+            if values['_fraccion_todo_'] or values['_fraccion_parte_']:
+                ronda_actual = int(values['_ronda_'])
+                try:
+                    editor.add_choice(uuid_prof, uuid_titu, uuid_asig,
+                                      creditos_elegidos,
+                                      values['_explicacion_'], ronda_actual,
+                                      todo=values['_fraccion_todo_'])
+                except (ValueError, OSError) as e:
+                    # the state is not modified (see AllocationEditor)
+                    print(ctext(str(e), fg='red'))
+                    sg.Popup('ERROR', str(e))
                     asignacion_es_correcta = False
             else:
                 print('¡Fracción de asignatura no establecida!')
                 input('Press <CR> to continue...')
                 asignacion_es_correcta = False
             if asignacion_es_correcta:
-                nuevo_profesor = \
-                    tabla_profesores.loc[uuid_prof]['nombre'] + ' ' + \
-                    tabla_profesores.loc[uuid_prof]['apellidos']
-                if bool(
-                        tabla_asignaturas.loc[
-                            uuid_asig, 'nuevo_profesor'
-                        ].strip()
-                ):
-                    tabla_asignaturas.loc[uuid_asig, 'nuevo_profesor'] += \
-                        ' + ' + nuevo_profesor
-                else:
-                    tabla_asignaturas.loc[uuid_asig, 'nuevo_profesor'] = \
-                        nuevo_profesor
-                tabla_titulaciones.loc[
-                    uuid_titu, 'creditos_disponibles'
-                ] = tabla_asignaturas['creditos_disponibles'].sum()
-                sumproduct = tabla_asignaturas['creditos_disponibles'] * \
-                             tabla_asignaturas['bec_col']
-                tabla_titulaciones.loc[
-                    uuid_titu, 'creditos_elegidos'
-                ] = tabla_titulaciones.loc[
-                                        uuid_titu, 'creditos_iniciales'
-                                    ] - \
-                      tabla_titulaciones.loc[
-                          uuid_titu, 'creditos_disponibles'
-                      ]
-                tabla_titulaciones.loc[uuid_titu, 'creditos_beccol'] = \
-                    sumproduct.sum()
-                tabla_profesores.loc[
-                    uuid_prof, 'asignados'
-                ] += creditos_elegidos
-                tabla_profesores.loc[
-                    uuid_prof, 'diferencia'
-                ] = tabla_profesores.loc[uuid_prof, 'asignados'] - \
-                    tabla_profesores.loc[uuid_prof, 'encargo']
                 update_info_creditos()
-                encargo = tabla_profesores.loc[uuid_prof]['encargo']
-                asignados = tabla_profesores.loc[uuid_prof]['asignados']
-                diferencia = tabla_profesores.loc[uuid_prof]['diferencia']
-                update_ronda_profesor(tabla_profesores, uuid_prof)
-                ronda_profesor = tabla_profesores.loc[uuid_prof]['ronda']
+                profesor = state.profesor(uuid_prof)
+                encargo = profesor['encargo']
+                asignados = profesor['asignados']
+                diferencia = profesor['diferencia']
+                ronda_profesor = profesor['ronda']
                 window.Element('_ronda_profesor_').Update(ronda_profesor)
                 comprueba_ronda_profesor(ronda_profesor)
                 window.Element('_encargo_prof_').Update(round(encargo, 4))
@@ -1023,35 +761,13 @@ def main(args=None):
                 window.Element('_diferencia_prof_').Update(
                     round(diferencia, 4)
                 )
-            # Nota: uuid_bita tendrá un valor único para cada elección de los
-            # profesores. Esto permite discriminar dentro de una misma
-            # asignatura (i.e., mismo uuid_prof, uuid_titu,
-            # uuid_asig) cuando se eligen fracciones de asignatura (es
-            # decir, cuando se subdividen asignaturas por un mismo profesor)
-            uuid_bita = str(new_uuid(megalist_uuid))
-            megalist_uuid += [uuid_bita]
-            # prepare new entry for bitacora
-            ronda_actual = int(values['_ronda_'])
-            data_row = [
-                uuid_prof, uuid_titu, uuid_asig,
-                datetime_short(), ronda_actual,
-                'None', 'None', creditos_elegidos, values['_explicacion_']
-            ]
-            for item in csv_colnames_profesor:
-                data_row.append(tabla_profesores.loc[uuid_prof][item])
-            for item in csv_colnames_asignatura:
-                data_row.append(tabla_asignaturas.loc[uuid_asig][item])
-            new_entry = pd.DataFrame(data=[data_row],
-                                     index=[uuid_bita],
-                                     columns=bitacora.columns.tolist())
-            bitacora = pd.concat([bitacora, new_entry])
-            bitacora.index.name = 'uuid_bita'
+            after_change()
             if args.debug:
-                print(bitacora)
+                print(bitacora.dataframe())
             clear_screen_asignatura()
             window.Element('_profesor_').Update(disabled=False)
             seleccion_del_profesor = filtra_seleccion_del_profesor(
-                uuid_prof, bitacora
+                uuid_prof, bitacora.dataframe(), indice_bitacora
             )
             if len(seleccion_del_profesor) > 1:
                 window.Element('_docencia_asignada_').Update(
@@ -1065,25 +781,64 @@ def main(args=None):
                 )
             window.Element('_continuar_').Update(disabled=False)
             window.Element('_profesor_finalizado_').Update(disabled=False)
-            export_to_html_bitacora(bitacora, args.bitacora, args.course)
+            export_to_html_bitacora(bitacora.dataframe(), args.course)
             export_to_html_titulaciones(tabla_titulaciones, args.course)
             export_to_html_tablas_asignaturas(bigdict_tablas_asignaturas,
                                               args.course)
             ronda_actual = int(values['_ronda_'])
-            export_to_html_profesores(tabla_profesores, bitacora,
-                                      ronda_actual, args.course)
+            export_to_html_profesores(tabla_profesores,
+                                      bitacora.dataframe(),
+                                      ronda_actual, args.course,
+                                      indice_bitacora)
+            export_to_html_resultado(tabla_profesores,
+                                     bigdict_tablas_asignaturas,
+                                     bitacora.dataframe(), args.course,
+                                     indice_bitacora)
+            if args.web:
+                upload_html_files()
+        # ---
+        elif event in ['_deshacer_', '_rehacer_']:
+            try:
+                ronda_actual = int(values['_ronda_'])
+                if event == '_deshacer_':
+                    change = editor.undo(ronda_actual)
+                    print(ctext(f'Undo: {change["kind"]}', fg='blue'))
+                else:
+                    change = editor.redo(ronda_actual)
+                    print(ctext(f'Redo: {change["kind"]}', fg='blue'))
+            except (IndexError, ValueError, OSError) as e:
+                # nothing has changed: the HTML files are not exported
+                print(ctext(str(e), fg='red'))
+                sg.Popup('ERROR', str(e))
+                continue
+            after_change()
+            if args.debug:
+                print(bitacora.dataframe())
+            # the selected teacher may have changed: select again
+            clear_screen_asignatura()
+            clear_screen_profesor()
+            update_info_creditos()
+            export_to_html_bitacora(bitacora.dataframe(), args.course)
+            export_to_html_titulaciones(tabla_titulaciones, args.course)
+            export_to_html_tablas_asignaturas(bigdict_tablas_asignaturas,
+                                              args.course)
+            export_to_html_profesores(tabla_profesores,
+                                      bitacora.dataframe(),
+                                      ronda_actual, args.course,
+                                      indice_bitacora)
             export_to_html_resultado(tabla_profesores,
                                      bigdict_tablas_asignaturas,
-                                     bitacora, args.course)
+                                     bitacora.dataframe(), args.course,
+                                     indice_bitacora)
             if args.web:
-                rsync_html_files(args.course, args.xlsxfile, args.bitacora)
+                upload_html_files()
         # ---
         elif event == '_cancelar_':
             clear_screen_asignatura()
             window.Element('_profesor_').Update(disabled=False)
             uuid_prof = values['_profesor_'][-36:]
             seleccion_del_profesor = filtra_seleccion_del_profesor(
-                uuid_prof, bitacora
+                uuid_prof, bitacora.dataframe(), indice_bitacora
             )
             if len(seleccion_del_profesor) > 1:
                 window.Element('_docencia_asignada_').Update(
@@ -1109,6 +864,9 @@ def main(args=None):
                 break
 
     window.Close()
+    # save bitacora in the Excel file
+    journal.compact(bitacora.dataframe())
+    indice_bitacora.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,181 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import numpy as np
+import pandas as pd
+
+from .allocation_state import TOLERANCIA
+from .microcreditos import a_microcreditos
+
+from .definitions import NULL_UUID
+from .definitions import TEXT_ACTIVA_ELECCION
+from .definitions import TEXT_FINALIZA_ELECCION
+
+
+def suma_por_grupo(values, codes, ngroups):
+    """Return the sum of the (integer) values of each group"""
+
+    result = np.zeros(ngroups, dtype=np.int64)
+    np.add.at(result, codes, values)
+    return result
+
+
+def calcula_restantes(disponibles, creditos, iasig):
+    """Return the credits available in the subject after each entry.
+
+    The credits of the entries of each subject are subtracted with a
+    cumulative sum. As in AllocationState.assign, the available credits
+    are set to zero after each entry when they are smaller than
+    TOLERANCIA (in absolute value): the cumulative sums of the
+    following entries of the subject are corrected, starting at the
+    first entry of each subject where this happens, until no further
+    correction is needed.
+
+    Parameters
+    ----------
+    disponibles : numpy.ndarray
+        Credits available in the subject of each entry before applying
+        the entries (micro-credits).
+    creditos : numpy.ndarray
+        Credits of each entry (micro-credits).
+    iasig : numpy.ndarray
+        Identifier of the subject of each entry.
+
+    Returns
+    -------
+    restantes : numpy.ndarray
+        Credits available in the subject after each entry.
+
+    """
+
+    restantes = disponibles - \
+        pd.Series(creditos).groupby(iasig).cumsum().to_numpy()
+    while True:
+        redondeo = (restantes != 0) & (np.abs(restantes) < TOLERANCIA)
+        if not redondeo.any():
+            return restantes
+        # first entry of each subject that must be set to zero
+        ientries = np.flatnonzero(redondeo)
+        ientries = ientries[np.unique(iasig[ientries], return_index=True)[1]]
+        correccion = np.zeros(len(restantes), dtype=np.int64)
+        correccion[ientries] = -restantes[ientries]
+        restantes += pd.Series(correccion).groupby(iasig).cumsum().to_numpy()
+
+
+def replay_bitacora(bitacora, state, uuid_registry):
+    """Apply the entries of a previous bitacora to the assignment state.
+
+    The state of degrees, subjects and teachers is updated in place,
+    and the UUIDs of the bitacora entries are included in the registry.
+    The active entries are aggregated by subject, degree and teacher,
+    and the arrays of the state are updated in bulk. The credits are
+    added as integer micro-credits, and the tolerance employed when
+    assigning the credits of a subject is applied after each entry
+    (see calcula_restantes), so the resulting values are exactly the
+    same as those obtained applying the entries one by one.
+
+    Parameters
+    ----------
+    bitacora : pandas.DataFrame
+        Table with the bitacora entries.
+    state : AllocationState
+        State of the subject assignment.
+    uuid_registry : UuidRegistry
+        Registry of the UUIDs already in use.
+
+    Raises
+    ------
+    ValueError
+        If an entry cannot be applied (unexpected explicacion in
+        an activate/deactivate entry, or insufficient credits in the
+        subject). As when the entries are applied one by one, the
+        first entry with problems is reported.
+
+    """
+
+    nrows = bitacora.shape[0]
+    uuid_prof = bitacora['uuid_prof'].to_numpy(dtype=object)
+    uuid_titu = bitacora['uuid_titu'].to_numpy(dtype=object)
+    uuid_asig = bitacora['uuid_asig'].to_numpy(dtype=object)
+    creditos_elegidos = bitacora['creditos_elegidos'].to_numpy(dtype=float)
+    explicacion = bitacora['explicacion'].to_numpy(dtype=object)
+    # activate/deactivate teacher
+    isnull = uuid_titu == NULL_UUID
+    # selected subjects that have not been removed
+    isactive = ~isnull & bitacora['active'].to_numpy(dtype=bool)
+    iactive = np.flatnonzero(isactive)
+
+    # ---
+    # look for the first entry that cannot be applied
+    ierror = nrows
+    invalid = isnull & ~np.isin(explicacion, [TEXT_FINALIZA_ELECCION,
+                                              TEXT_ACTIVA_ELECCION])
+    if invalid.any():
+        ierror = np.argmax(invalid)
+
+    # identifiers of the subjects in the state (loading the subjects of
+    # the degrees in the bitacora)
+    iasig = state.ids_asignaturas(uuid_titu[iactive], uuid_asig[iactive])
+    creditos = a_microcreditos(creditos_elegidos[iactive])
+    # credits available in the subject after each entry
+    creditos_restantes = calcula_restantes(
+        state.asignaturas['creditos_disponibles'][iasig], creditos, iasig
+    )
+    insuficientes = creditos_restantes < -TOLERANCIA
+    if insuficientes.any():
+        ierror = min(ierror, iactive[np.argmax(insuficientes)])
+
+    if ierror < nrows:
+        uuid_registry.update(bitacora.index[:ierror + 1])
+        if isnull[ierror]:
+            raise ValueError('Unexpected explicacion for null UUID')
+        print('¡Créditos disponibles insuficientes!')
+        print('* uuid_bita:', bitacora.index[ierror])
+        print('* uuid_prof:', uuid_prof[ierror])
+        print('* uuid_titu:', uuid_titu[ierror])
+        print('* uuid_asig:', uuid_asig[ierror])
+        raise ValueError('Error while processing bitacora!')
+    uuid_registry.update(bitacora.index)
+
+    # ---
+    # activate/deactivate teachers (the last entry prevails)
+    if isnull.any():
+        finalizado = pd.Series(
+            explicacion[isnull] == TEXT_FINALIZA_ELECCION,
+            index=uuid_prof[isnull]
+        ).groupby(level=0, sort=False).last()
+        state.profesores['finalizado'][
+            state.ids_profesores(finalizado.index)
+        ] = finalizado.to_numpy()
+
+    if len(iactive) == 0:
+        return
+
+    # ---
+    # subjects and degrees
+    a = state.asignaturas
+    codes, asignaturas = pd.factorize(iasig)
+    # credits available after the last entry of each subject
+    ultima = np.zeros(len(asignaturas), dtype=np.int64)
+    np.maximum.at(ultima, codes, np.arange(len(codes)))
+    a['creditos_disponibles'][asignaturas] = creditos_restantes[ultima]
+    # active assignments (new teachers) of each subject, in the order of
+    # the bitacora
+    iprof = state.ids_profesores(uuid_prof[iactive])
+    state.add_asignaciones(bitacora.index[iactive], iasig.tolist(),
+                           iprof.tolist())
+    # update degree totals
+    state.update_titulaciones(pd.unique(a['titulacion'][asignaturas]))
+
+    # ---
+    # teachers
+    codes, profesores = pd.factorize(iprof)
+    state.profesores['asignados'][profesores] += \
+        suma_por_grupo(creditos, codes, len(profesores))
+    state.update_profesores(profesores)
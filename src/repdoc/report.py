@@ -0,0 +1,112 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import argparse
+import time
+
+from . import IMPORT_START
+from .ctext import ctext
+from .definitions import DEFAULT_CACHE_DIR
+from .load_tables import load_tables
+from .log_execution_command import log_execution_command
+from .read_workbook import print_timing
+from .version import version
+
+
+def report(args=None):
+    """Regenerate the HTML files without starting the GUI.
+
+    The tables are loaded, the bitacora is applied and all the HTML
+    files are exported. This command does not import PySimpleGUI, so
+    it can be executed in a server without display.
+
+    Parameters
+    ----------
+    args : list of str or None
+        Command-line arguments (excluding 'report'). If None,
+        sys.argv is employed.
+
+    """
+
+    # parse command-line options
+    parser = argparse.ArgumentParser(
+        prog='repdoc report',
+        description='Generate HTML files from the Excel input file and '
+                    'the bitacora (no GUI)'
+    )
+
+    parser.add_argument("xlsxfile",
+                        help="Excel file with input data",
+                        type=argparse.FileType())
+    parser.add_argument("--course", required=True,
+                        help="Academic course (e.g. 2019-2020)",
+                        type=str)
+    parser.add_argument("--bitacora",
+                        help="CSV input/output filename",
+                        type=argparse.FileType())
+    parser.add_argument('--web',
+                        help="rsync HTML files in web server",
+                        action="store_true")
+    parser.add_argument("--cache_dir",
+                        help="directory to cache the tables parsed from "
+                             "the Excel file",
+                        default=DEFAULT_CACHE_DIR,
+                        type=str)
+    parser.add_argument("--no_cache",
+                        help="always parse the Excel file (ignore cache)",
+                        action="store_true")
+    parser.add_argument("--jobs",
+                        help="number of processes to parse the subject "
+                             "sheets of the Excel file",
+                        default=1,
+                        type=int)
+    parser.add_argument("--checkpoint_every",
+                        help="minimum number of new bitacora entries to "
+                             "save a checkpoint of the state (0: do not "
+                             "use checkpoints)",
+                        default=100,
+                        type=int)
+    parser.add_argument("--verify_replay",
+                        help="apply the whole bitacora and compare with "
+                             "the result obtained from the checkpoint",
+                        action="store_true")
+    parser.add_argument("--sqlite",
+                        help="keep the index of the bitacora in an "
+                             "SQLite database instead of in memory",
+                        action="store_true")
+    parser.add_argument("--debug",
+                        help="run code in debugging mode",
+                        action="store_true")
+    parser.add_argument("--echo",
+                        help="Display full command line",
+                        action="store_true")
+
+    args = parser.parse_args(args)
+
+    log_execution_command(args.echo)
+
+    print(ctext(f'Welcome to RepDoc version {version} (report)', bold=True))
+    print_timing('import modules', IMPORT_START)
+
+    t_ini = time.perf_counter()
+    load_tables(
+        xlsxfile=args.xlsxfile,
+        course=args.course,
+        bitacora=args.bitacora,
+        debug=args.debug,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        jobs=args.jobs,
+        web=args.web,
+        sqlite=args.sqlite,
+        checkpoint_every=args.checkpoint_every,
+        verify_replay=args.verify_replay,
+        compact=False
+    )
+    print(ctext(f'\nReport generated in {time.perf_counter() - t_ini:.3f} s',
+                fg='blue'))
@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2022 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -11,9 +11,13 @@ import subprocess
 import yaml
 
 
-def rsync_html_files(course=None, xlsxfile=None, bitacora=None):
+def rsync_html_files(course=None, xlsxfile=None, bitacora=None,
+                     journal=None):
     """Execute rsync of HTML files to server
 
+    The journal of the bitacora (changes not yet saved in its Excel
+    file) is also uploaded when it is not empty.
+
     """
 
     if course is None:
@@ -31,6 +35,8 @@ def rsync_html_files(course=None, xlsxfile=None, bitacora=None):
         command += xlsxfile.name + ' '
     if bitacora is not None:
         command += bitacora.name + ' '
+    if journal is not None and journal.exists():
+        command += journal.filename + ' '
     command += address
     command += course
     command += '/'
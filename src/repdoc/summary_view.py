@@ -0,0 +1,75 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+from .microcreditos import a_creditos
+
+# columns of the summary (and keys of the corresponding GUI elements)
+SUMMARY_COLUMNS = [('creditos_iniciales', '_summary_total'),
+                   ('creditos_elegidos', '_summary_elegidos'),
+                   ('creditos_disponibles', '_summary_disponibles'),
+                   ('creditos_beccol', '_summary_beccol')]
+
+
+class SummaryView:
+    """Summary of credits displayed in the GUI.
+
+    The text displayed in each element of the summary is kept, and
+    only the degrees modified since the previous refresh (see
+    AllocationState.pop_dirty) are formatted again. The elements whose
+    text has changed are updated together, followed by a single
+    refresh of the window.
+
+    Parameters
+    ----------
+    window : PySimpleGUI.Window
+        GUI window.
+    state : AllocationState
+        State of the subject assignment.
+    cout : str
+        Format of the credits.
+
+    """
+
+    def __init__(self, window, state, cout='{0:7.3f}'):
+        self.window = window
+        self.state = state
+        self.cout = cout
+        self._shown = {}
+
+    def pending(self):
+        """Return dictionary with the texts that must be updated"""
+
+        texts = {}
+        for i in self.state.pop_dirty():
+            clabel = f'_{i + 1:02d}_'
+            for col, key in SUMMARY_COLUMNS:
+                texts[key + clabel] = self.cout.format(
+                    a_creditos(self.state.titulaciones[col][i]))
+        for col, key in SUMMARY_COLUMNS:
+            texts[key + '_'] = self.cout.format(self.state.total(col))
+        return {key: text for key, text in texts.items()
+                if self._shown.get(key) != text}
+
+    def refresh(self):
+        """Update the modified elements of the summary.
+
+        Returns
+        -------
+        nupdates : int
+            Number of updated elements.
+
+        """
+
+        texts = self.pending()
+        for key, text in texts.items():
+            self.window.Element(key).Update(value=text)
+        if texts:
+            self.window.Refresh()
+        self._shown.update(texts)
+        return len(texts)
@@ -0,0 +1,61 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import pandas as pd
+
+from .definitions import BITACORA_DATE_FORMAT
+from .definitions import BITACORA_DTYPES
+
+
+def _missing(series):
+    """Return mask with missing values (including the legacy 'None')"""
+    return series.isna() | (series.astype(str) == 'None')
+
+
+def typed_bitacora(bitacora):
+    """Return bitacora with the expected columns and dtypes.
+
+    Previous versions of the bitacora (where the entries not removed
+    were flagged with the string 'None' in date_removed and
+    round_removed, the dates were stored as strings and there was no
+    active column) are also accepted.
+
+    Parameters
+    ----------
+    bitacora : pandas.DataFrame
+        Table with the bitacora entries, using uuid_bita as index.
+
+    Returns
+    -------
+    bitacora : pandas.DataFrame
+        Copy of the table using the dtypes in BITACORA_DTYPES.
+
+    """
+
+    bitacora = bitacora.copy()
+    for col in ['date_added', 'date_removed']:
+        bitacora[col] = pd.to_datetime(
+            bitacora[col].mask(_missing(bitacora[col])),
+            format=BITACORA_DATE_FORMAT
+        )
+    for col in ['round_added', 'round_removed']:
+        bitacora[col] = pd.to_numeric(
+            bitacora[col].mask(_missing(bitacora[col]))
+        )
+    for col in ['explicacion', 'comentarios', 'grupo']:
+        bitacora[col] = bitacora[col].fillna(' ')
+    removed = bitacora['date_removed'].notna()
+    if 'active' in bitacora.columns:
+        if (bitacora['active'].astype(bool) == removed).any():
+            raise ValueError('Column active does not match date_removed')
+    else:
+        bitacora['active'] = ~removed
+    bitacora = bitacora[list(BITACORA_DTYPES)].astype(BITACORA_DTYPES)
+    bitacora.index.name = 'uuid_bita'
+    return bitacora
@@ -1,5 +1,5 @@
 #
-# Copyright 2019-2025 Universidad Complutense de Madrid
+# Copyright 2019-2026 Universidad Complutense de Madrid
 #
 # This file is part of RepDoc
 #
@@ -7,29 +7,107 @@
 # License-Filename: LICENSE.txt
 #
 
+import numpy as np
+import pandas as pd
+
+from .microcreditos import a_microcreditos
+
 from .definitions import CREDITOS_ASIGNATURA
 from .definitions import FLAG_RONDA_NO_ELIGE
 from .definitions import PRIMERA_RONDA_RYC
 
+# clases de categoría empleadas para calcular la ronda de los profesores
+CLASES_CATEGORIA = ['general', 'ryc', 'colaborador']
+
+
+def clase_categoria(categoria):
+    """Clase de la categoría de cada profesor
+
+    Parameters
+    ----------
+    categoria : pandas.Series
+        Categoría de los profesores.
+
+    Returns
+    -------
+    clase : pandas.Series
+        Serie categórica con 'colaborador' (no eligen en las rondas),
+        'ryc' (RyC y JdC, comienzan en PRIMERA_RONDA_RYC) o 'general'.
+
+    """
+
+    categoria = categoria.astype(str)
+    clase = np.where(
+        categoria.isin(['Colaborador', 'Colaboradora']), 'colaborador',
+        np.where(categoria.str.contains('RyC', regex=False) |
+                 categoria.str.contains('JdC', regex=False), 'ryc', 'general')
+    )
+    return pd.Series(pd.Categorical(clase, categories=CLASES_CATEGORIA),
+                     index=categoria.index)
+
+
+def calcula_ronda(asignados, encargo, clase,
+                  creditos_asignatura=CREDITOS_ASIGNATURA,
+                  primera_ronda_ryc=PRIMERA_RONDA_RYC):
+    """Calcula la ronda siguiente de un conjunto de profesores
+
+    Parameters
+    ----------
+    asignados : numpy.ndarray
+        Créditos asignados a cada profesor (micro-créditos enteros).
+    encargo : numpy.ndarray
+        Encargo docente de cada profesor (micro-créditos enteros).
+        Solo se emplea para comprobar si es nulo.
+    clase : numpy.ndarray
+        Clase de la categoría de cada profesor (ver clase_categoria).
+    creditos_asignatura : float
+        Créditos de una asignatura (cada ronda), como número real.
+    primera_ronda_ryc : int
+        Primera ronda de los profesores RyC y JdC.
+
+    Returns
+    -------
+    ronda : numpy.ndarray
+        Ronda siguiente de cada profesor (FLAG_RONDA_NO_ELIGE si el
+        profesor no elige en las rondas).
+
+    """
+
+    # parte entera de asignados / creditos_asignatura + 0.5, calculada
+    # con aritmética entera
+    asignados = np.asarray(asignados, dtype=np.int64)
+    creditos_asignatura = a_microcreditos(creditos_asignatura)
+    ronda = (2 * asignados + creditos_asignatura) // \
+        (2 * creditos_asignatura) + 1
+    clase = np.asarray(clase, dtype=object)
+    ronda = np.where(
+        clase == 'ryc',
+        np.maximum(ronda + (primera_ronda_ryc - 1), primera_ronda_ryc),
+        ronda
+    )
+    no_elige = (np.asarray(encargo) == 0) | (clase == 'colaborador')
+    return np.where(no_elige, FLAG_RONDA_NO_ELIGE, ronda)
+
+
+def update_ronda_profesor(state, iprof=None):
+    """Actualiza ronda siguiente del profesor
+
+    Parameters
+    ----------
+    state : AllocationState
+        Estado de la asignación de asignaturas (créditos en
+        micro-créditos).
+    iprof : int, numpy.ndarray or None
+        Identificador(es) del profesor(es) en state. Si es None, se
+        actualiza la ronda de todos los profesores.
+
+    """
 
-def update_ronda_profesor(tabla_profesores, uuid_prof):
-    """Actualiza ronda siguiente del profesor"""
-
-    encargo = tabla_profesores.loc[uuid_prof]['encargo']
-    categoria = tabla_profesores.loc[uuid_prof]['categoria']
-    if (encargo == 0) or (categoria in ['Colaborador', 'Colaboradora']):
-        ronda_profesor = FLAG_RONDA_NO_ELIGE
-    else:
-        ronda_profesor = int(
-            tabla_profesores.loc[uuid_prof]['asignados'] /
-            CREDITOS_ASIGNATURA + 0.5
-        ) + 1
-        if ('RyC' in tabla_profesores.loc[uuid_prof]['categoria']) or \
-                ('JdC' in tabla_profesores.loc[uuid_prof]['categoria']):
-            ronda_profesor += (PRIMERA_RONDA_RYC - 1)
-            if ronda_profesor < PRIMERA_RONDA_RYC:
-                ronda_profesor = PRIMERA_RONDA_RYC
-
-    tabla_profesores.loc[
-        uuid_prof, 'ronda'
-    ] = ronda_profesor
+    p = state.profesores
+    if iprof is None:
+        iprof = slice(None)
+    p['ronda'][iprof] = calcula_ronda(
+        p['asignados'][iprof], p['encargo'][iprof], p['clase'][iprof],
+        creditos_asignatura=state.creditos_asignatura,
+        primera_ronda_ryc=state.primera_ronda_ryc
+    )
@@ -0,0 +1,52 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+from .new_uuid import new_uuid
+
+
+class UuidRegistry:
+    """Set of UUIDs already in use.
+
+    Membership tests and insertions are O(1). The registry is seeded
+    with the UUIDs of degrees, subjects, teachers and bitacora entries,
+    and every new bitacora entry obtains its UUID from new_uuid(), which
+    registers it.
+
+    Parameters
+    ----------
+    uuids : iterable or None
+        Initial UUIDs.
+
+    """
+
+    def __init__(self, uuids=None):
+        self._uuids = set()
+        if uuids is not None:
+            self.update(uuids)
+
+    def __contains__(self, uuid):
+        return uuid in self._uuids
+
+    def __len__(self):
+        return len(self._uuids)
+
+    def add(self, uuid):
+        """Register a new UUID, checking that it was not in use"""
+        if uuid in self._uuids:
+            raise ValueError(f'UUID {uuid} is already in use!')
+        self._uuids.add(uuid)
+
+    def update(self, uuids):
+        """Register several UUIDs"""
+        for uuid in uuids:
+            self.add(uuid)
+
+    def new_uuid(self):
+        """Return (and register) a new UUID"""
+        return new_uuid(self)
@@ -0,0 +1,218 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+"""On-disk cache of the tables parsed from the Excel input file"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from .ctext import ctext
+from . import read_tabla_asignaturas
+from . import read_tabla_profesores
+from . import read_tabla_titulaciones
+from .version import version
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'feather'
+except ModuleNotFoundError:
+    CACHE_FORMAT = 'pickle'
+
+# increase this number when the layout of the cache changes
+CACHE_VERSION = 1
+
+
+def schema_hash(extra_modules=None):
+    """Return hash of the code that defines the parsed tables.
+
+    Any change in the functions reading the Excel sheets (for example,
+    the column numbers or converters employed for a particular course)
+    modifies this hash and invalidates the previous cache entries.
+
+    """
+
+    modules = [read_tabla_titulaciones, read_tabla_asignaturas,
+               read_tabla_profesores]
+    if extra_modules is not None:
+        modules += extra_modules
+    h = hashlib.sha256()
+    h.update(f'{version} {CACHE_VERSION} {CACHE_FORMAT}'.encode('utf-8'))
+    for module in modules:
+        h.update(inspect.getsource(module).encode('utf-8'))
+    return h.hexdigest()
+
+
+def file_hash(filename):
+    """Return SHA-256 hash of the file content"""
+
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(xlsxfilename, course, extra_modules=None, xlsxhash=None):
+    """Return key identifying the cache entry of an Excel file.
+
+    The hash of the file content (see file_hash) can be provided in
+    xlsxhash, to avoid reading the whole file again.
+
+    """
+
+    if xlsxhash is None:
+        xlsxhash = file_hash(xlsxfilename)
+    h = hashlib.sha256()
+    h.update(xlsxhash.encode('utf-8'))
+    h.update(course.encode('utf-8'))
+    h.update(schema_hash(extra_modules).encode('utf-8'))
+    return h.hexdigest()[:32]
+
+
+def write_table(df, fname):
+    """Write DataFrame preserving index and dtypes.
+
+    Returns a dictionary with the dtype of each column, which must be
+    provided to read_table() to restore columns (e.g. 'object' columns
+    holding numbers) that the columnar format would otherwise convert.
+
+    """
+
+    if CACHE_FORMAT == 'feather':
+        df.reset_index().to_feather(fname + '.feather')
+    else:
+        df.to_pickle(fname + '.pkl')
+    return {col: str(dtype) for col, dtype in df.dtypes.items()}
+
+
+def read_table(fname, index_name, dtypes):
+    """Read DataFrame previously saved with write_table()"""
+
+    if CACHE_FORMAT == 'feather':
+        df = pd.read_feather(fname + '.feather')
+        df = df.set_index(index_name)
+        df = df.astype(dtypes)
+    else:
+        df = pd.read_pickle(fname + '.pkl')
+    return df
+
+
+def read_workbook_cache(cache_dir, key):
+    """Return the cached tables, or None if the entry does not exist.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory where the cache entries are stored.
+    key : str
+        Key returned by cache_key().
+
+    Returns
+    -------
+    tablas : tuple or None
+        Tuple with tabla_titulaciones, bigdict_tablas_asignaturas and
+        tabla_profesores, as returned by read_workbook().
+
+    """
+
+    entry = os.path.join(cache_dir, key)
+    fmetadata = os.path.join(entry, 'metadata.json')
+    # the metadata file is written last, so that an incomplete entry
+    # is never employed
+    if not os.path.isfile(fmetadata):
+        return None
+
+    try:
+        with open(fmetadata, 'rt') as f:
+            metadata = json.load(f)
+        dtypes = metadata['dtypes']
+        tabla_titulaciones = read_table(
+            os.path.join(entry, 'titulaciones'), 'uuid_titu',
+            dtypes['titulaciones']
+        )
+        bigdict_tablas_asignaturas = {}
+        for i, titulacion in enumerate(metadata['titulaciones']):
+            label = f'asignaturas_{i + 1:02d}'
+            bigdict_tablas_asignaturas[titulacion] = read_table(
+                os.path.join(entry, label), 'uuid_asig', dtypes[label]
+            )
+        tabla_profesores = read_table(
+            os.path.join(entry, 'profesores'), 'uuid_prof',
+            dtypes['profesores']
+        )
+    except (OSError, ValueError, KeyError) as e:
+        print(ctext(f'WARNING: ignoring invalid cache entry {entry} ({e})',
+                    fg='red'))
+        return None
+
+    return tabla_titulaciones, bigdict_tablas_asignaturas, tabla_profesores
+
+
+def write_workbook_cache(cache_dir, key, xlsxfilename, course,
+                         tabla_titulaciones, bigdict_tablas_asignaturas,
+                         tabla_profesores):
+    """Store the parsed tables in the cache.
+
+    Previous entries corresponding to the same Excel file and course
+    are removed.
+
+    """
+
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = os.path.join(cache_dir, key)
+    tmp_entry = entry + '.tmp'
+    shutil.rmtree(tmp_entry, ignore_errors=True)
+    os.makedirs(tmp_entry)
+
+    dtypes = dict()
+    dtypes['titulaciones'] = write_table(
+        tabla_titulaciones, os.path.join(tmp_entry, 'titulaciones')
+    )
+    titulaciones = list(bigdict_tablas_asignaturas.keys())
+    for i, titulacion in enumerate(titulaciones):
+        label = f'asignaturas_{i + 1:02d}'
+        dtypes[label] = write_table(
+            bigdict_tablas_asignaturas[titulacion],
+            os.path.join(tmp_entry, label)
+        )
+    dtypes['profesores'] = write_table(
+        tabla_profesores, os.path.join(tmp_entry, 'profesores')
+    )
+    metadata = {
+        'xlsxfile': os.path.basename(xlsxfilename),
+        'course': course,
+        'format': CACHE_FORMAT,
+        'titulaciones': titulaciones,
+        'dtypes': dtypes
+    }
+    with open(os.path.join(tmp_entry, 'metadata.json'), 'wt') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=1)
+
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(tmp_entry, entry)
+
+    # remove stale entries of the same file and course
+    for dirname in os.listdir(cache_dir):
+        if dirname == key:
+            continue
+        fmetadata = os.path.join(cache_dir, dirname, 'metadata.json')
+        try:
+            with open(fmetadata, 'rt') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if metadata.get('xlsxfile') == os.path.basename(xlsxfilename) and \
+                metadata.get('course') == course:
+            shutil.rmtree(os.path.join(cache_dir, dirname),
+                          ignore_errors=True)
@@ -0,0 +1,60 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import openpyxl
+import pytest
+
+# degrees of the input file (course 2025-2026)
+TITULACIONES = ['Grado en Física', 'Máster en Astrofísica',
+                'Grado en Matemáticas']
+
+
+def write_rows(sheet, first_row, first_col, rows):
+    for irow, row in enumerate(rows, start=first_row):
+        for icol, value in enumerate(row, start=first_col):
+            sheet.cell(row=irow, column=icol, value=value)
+
+
+def write_workbook(filename, titulaciones):
+    """Save an input file with the given degrees (3 subjects each)"""
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.title = 'Resumen Encargo'
+    write_rows(sheet, 5, 2, [(f't{i}', titulacion)
+                             for i, titulacion in enumerate(titulaciones)])
+    for i, titulacion in enumerate(titulaciones):
+        sheet = book.create_sheet(titulacion)
+        # columns B to N (see schema_tabla_asignaturas); the empty cells
+        # of curso, semestre, codigo and asignatura are filled with the
+        # previous value
+        write_rows(sheet, 6, 2, [
+            ('1º', 1, 800000 + 10 * i, 'Física', 'Astrofísica',
+             f'a{i}_1', 6.0, None, 'A', 'L-M', 0, 'Profesor 1', '2020'),
+            (None, None, None, None, 'Astrofísica',
+             f'a{i}_2', 1.5, 'Prácticas', 'B', 'X', 1, None, '2021'),
+            ('2º', 2, 800001 + 10 * i, 'Óptica', 'Física de la Tierra',
+             f'a{i}_3', 4.5 + i, None, None, 'J-V', 1, 'Profesor 2',
+             '2019'),
+        ])
+    sheet = book.create_sheet('Asignación')
+    for irow, (uuid_prof, categoria, encargo) in enumerate([
+            ('p1', 'Titular', 240.0), ('p2', 'RyC', 120.0),
+            ('p3', 'Colaborador', 0.0)], start=8):
+        write_rows(sheet, irow, 1, [(uuid_prof, None, f'Apellido {irow}',
+                                     f'Nombre {irow}', categoria)])
+        sheet.cell(row=irow, column=20, value=encargo)
+    book.save(filename)
+
+
+@pytest.fixture
+def input_xlsx(tmp_path):
+    """Excel input file (course 2025-2026) with three degrees"""
+    filename = str(tmp_path / 'input.xlsx')
+    write_workbook(filename, TITULACIONES)
+    return filename
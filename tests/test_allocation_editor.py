@@ -0,0 +1,211 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import json
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import pytest
+
+from repdoc.allocation_editor import AllocationEditor
+from repdoc.allocation_state import AllocationState
+from repdoc.bitacora_buffer import BitacoraBuffer
+from repdoc.bitacora_index import BitacoraIndex
+from repdoc.bitacora_journal import BitacoraJournal
+from repdoc.definitions import BITACORA_DTYPES
+from repdoc.read_workbook import read_workbook
+from repdoc.uuid_registry import UuidRegistry
+
+
+class FailingJournal(BitacoraJournal):
+    """Journal whose file cannot be written after nchanges changes"""
+
+    def __init__(self, xlsxfilename, nchanges):
+        super().__init__(xlsxfilename)
+        self.nchanges = nchanges
+
+    def _append(self, change):
+        if self.nchanges == 0:
+            raise OSError('No space left on device')
+        self.nchanges -= 1
+        super()._append(change)
+
+
+class FailingIndex(BitacoraIndex):
+    """Index that cannot store removals (e.g. locked database)"""
+
+    def remove(self, uuid_bita, date_removed, round_removed):
+        raise OSError('database is locked')
+
+
+def empty_bitacora():
+    bitacora = pd.DataFrame(
+        data=[], columns=list(BITACORA_DTYPES)
+    ).astype(BITACORA_DTYPES)
+    bitacora.index.name = 'uuid_bita'
+    return bitacora
+
+
+def new_editor(state, journal, index_class=BitacoraIndex):
+    bitacora = empty_bitacora()
+    return AllocationEditor(state, BitacoraBuffer(bitacora), journal,
+                            index_class(bitacora), UuidRegistry())
+
+
+@pytest.fixture
+def state(input_xlsx):
+    tablas = read_workbook(input_xlsx, '2025-2026')
+    return AllocationState(*tablas, verify=True)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return BitacoraJournal(str(tmp_path / 'bitacora.xlsx'))
+
+
+@pytest.fixture
+def editor(state, journal):
+    return new_editor(state, journal)
+
+
+def values(editor):
+    """Return the values of the state"""
+    state = editor.state
+    return ({col: state.profesores[col].tolist()
+             for col in state.profesores},
+            {col: state.asignaturas[col].tolist()
+             for col in state.asignaturas},
+            {col: state.titulaciones[col].tolist()
+             for col in state.titulaciones},
+            dict(state.totales))
+
+
+def journal_ops(journal):
+    """Return the operations stored in the journal"""
+    journal.close()
+    with open(journal.filename, 'rt') as f:
+        return [json.loads(line)['op'] for line in f]
+
+
+def test_add_choice_not_stored(state, tmp_path):
+    editor = new_editor(
+        state, FailingJournal(str(tmp_path / 'bitacora.xlsx'), nchanges=0)
+    )
+    initial = values(editor)
+    with pytest.raises(OSError):
+        editor.add_choice('p1', 't0', 'a0_1', 6.0, ' ', ronda=1)
+    assert values(editor) == initial
+    assert len(editor.bitacora) == 0
+    assert not editor.can_undo
+
+
+def test_remove_choice_not_stored(state, journal):
+    editor = new_editor(state, journal, index_class=FailingIndex)
+    uuid_bita = editor.add_choice('p1', 't0', 'a0_1', 6.0, ' ', ronda=1)
+    final = values(editor)
+    with pytest.raises(OSError):
+        editor.remove_choice(uuid_bita, ronda=1)
+    assert values(editor) == final
+    assert editor.bitacora.entry(uuid_bita)['active']
+    # the removal is cancelled in the journal
+    assert journal_ops(journal) == ['add', 'remove', 'restore']
+    bitacora = journal.read(empty_bitacora())
+    assert bitacora['active'].tolist() == [True]
+    # undoing the addition fails in the same way
+    assert editor.can_undo and not editor.can_redo
+    with pytest.raises(OSError):
+        editor.undo(ronda=1)
+    assert values(editor) == final
+    assert editor.can_undo and not editor.can_redo
+
+
+def test_undo_not_stored(state, tmp_path):
+    editor = new_editor(
+        state, FailingJournal(str(tmp_path / 'bitacora.xlsx'), nchanges=2)
+    )
+    editor.add_choice('p1', 't0', 'a0_1', 6.0, ' ', ronda=1)
+    editor.toggle_finalizado('p2', ronda=1)
+    final = values(editor)
+    with pytest.raises(OSError):
+        editor.undo(ronda=1)
+    assert values(editor) == final
+    assert len(editor.bitacora) == 2
+    assert editor.can_undo and not editor.can_redo
+
+
+def test_undo_redo_add(editor, journal):
+    initial = values(editor)
+    uuid_bita = editor.add_choice('p1', 't0', 'a0_1', 6.0, ' ', ronda=1)
+    final = values(editor)
+    assert final != initial
+
+    assert editor.undo(ronda=1)['kind'] == 'add'
+    assert values(editor) == initial
+    assert not editor.can_undo and editor.can_redo
+    assert not editor.bitacora.entry(uuid_bita)['active']
+
+    editor.redo(ronda=1)
+    assert values(editor) == final
+    assert editor.can_undo and not editor.can_redo
+
+    # the undone entry is kept, and a copy of it is stored again
+    assert journal_ops(journal) == ['add', 'remove', 'add']
+    bitacora = journal.read(empty_bitacora())
+    assert bitacora.index[0] == uuid_bita
+    assert bitacora['active'].tolist() == [False, True]
+    assert bitacora['uuid_asig'].tolist() == ['a0_1', 'a0_1']
+    assert bitacora['creditos_elegidos'].tolist() == [6.0, 6.0]
+    assert_frame_equal(bitacora, editor.bitacora.dataframe(),
+                       check_categorical=False)
+
+    # the copy is removed when undoing the change again
+    editor.undo(ronda=2)
+    assert values(editor) == initial
+    assert journal_ops(journal) == ['add', 'remove', 'add', 'remove']
+
+
+def test_undo_redo_remove(editor, journal):
+    initial = values(editor)
+    uuid_bita = editor.add_choice('p1', 't0', 'a0_1', 6.0, ' ', ronda=1)
+    editor.remove_choice(uuid_bita, ronda=1)
+    assert values(editor) == initial
+
+    editor.undo(ronda=1)
+    assert values(editor)[3] != initial[3]
+    editor.redo(ronda=1)
+    assert values(editor) == initial
+    assert journal_ops(journal) == ['add', 'remove', 'add', 'remove']
+    bitacora = journal.read(empty_bitacora())
+    assert bitacora['active'].tolist() == [False, False]
+
+
+def test_update_tables(editor):
+    state = editor.state
+    state.to_tables()
+    uuid_bita = editor.add_choice('p1', 't0', 'a0_1', 6.0, ' ', ronda=1)
+    editor.add_choice('p2', 't1', 'a1_3', 2.0, ' ', ronda=1)
+    editor.toggle_finalizado('p3', ronda=1)
+    editor.remove_choice(uuid_bita, ronda=1)
+    editor.undo(ronda=1)
+    state.update_tables()
+    tablas = (state.tabla_titulaciones.copy(),
+              {titulacion: tabla.copy() for titulacion, tabla in
+               state.bigdict_tablas_asignaturas.items()},
+              state.tabla_profesores.copy())
+
+    # same values as copying the full columns
+    state.to_tables()
+    assert_frame_equal(tablas[0], state.tabla_titulaciones)
+    for titulacion, tabla in tablas[1].items():
+        assert_frame_equal(tabla, state.bigdict_tablas_asignaturas[titulacion])
+    assert_frame_equal(tablas[2], state.tabla_profesores)
+    assert state.tabla_profesores['finalizado'].tolist() == \
+        [False, False, True]
+    tabla = state.bigdict_tablas_asignaturas['Grado en Física']
+    assert tabla['nuevo_profesor'].iloc[0] != ' '
@@ -0,0 +1,58 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import pandas as pd
+
+from repdoc.bitacora_as_of import bitacora_as_of
+from repdoc.bitacora_as_of import parse_date_added
+
+
+def bitacora():
+    return pd.DataFrame(
+        {
+            'date_added': pd.to_datetime(['2019-05-31 10:00:00',
+                                          '2019-06-01 09:00:00',
+                                          '2019-06-01 18:30:00',
+                                          '2019-06-02 08:00:00']),
+            'round_added': [1, 1, 2, 3],
+            'date_removed': pd.to_datetime(['2019-06-01 12:00:00',
+                                            '2019-06-02 10:00:00',
+                                            None, None]),
+            'round_removed': pd.array([2, 3, None, None], dtype='Int64'),
+            'active': [False, False, True, True]
+        },
+        index=pd.Index(['a', 'b', 'c', 'd'], name='uuid_bita')
+    )
+
+
+def test_date_without_time_includes_whole_day():
+    result = bitacora_as_of(bitacora(),
+                            date_added=parse_date_added('2019-06-01'))
+    assert result.index.tolist() == ['a', 'b', 'c']
+    # removed on the cutoff day: still removed
+    assert not result.loc['a', 'active']
+    # removed after the cutoff day: active again
+    assert result.loc['b', 'active']
+    assert pd.isna(result.loc['b', 'date_removed'])
+    assert result.loc['c', 'active']
+
+
+def test_date_with_time():
+    result = bitacora_as_of(bitacora(),
+                            date_added=parse_date_added('2019-06-01 12:00:00'))
+    assert result.index.tolist() == ['a', 'b']
+    assert not result.loc['a', 'active']
+    assert result.loc['b', 'active']
+
+
+def test_round():
+    result = bitacora_as_of(bitacora(), round_added=2)
+    assert result.index.tolist() == ['a', 'b', 'c']
+    assert not result.loc['a', 'active']
+    assert result.loc['b', 'active']
@@ -0,0 +1,123 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import math
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import pytest
+
+from repdoc.bitacora_buffer import BitacoraBuffer
+from repdoc.definitions import BITACORA_DTYPES
+from repdoc.definitions import NULL_UUID
+from repdoc.typed_bitacora import typed_bitacora
+
+
+def data_row(uuid_prof, uuid_asig, date_added, round_added, creditos):
+    """Values of a new active entry, in the order of BITACORA_DTYPES"""
+    if uuid_asig == NULL_UUID:
+        uuid_titu = NULL_UUID
+        asignatura = 'None'
+    else:
+        uuid_titu = 't1'
+        asignatura = 'Asignatura ' + uuid_asig
+    return [uuid_prof, uuid_titu, uuid_asig, pd.Timestamp(date_added),
+            round_added, pd.NaT, pd.NA, creditos, ' ',
+            'Apellido ' + uuid_prof, 'Nombre ' + uuid_prof, 'Titular',
+            '1º', 1, 800100, asignatura, 'Astrofísica', 6.0, ' ', 'A',
+            True]
+
+
+def initial_bitacora():
+    rows = [data_row('p1', 'a1', '2026-05-04 10:00:00', 1, 6.0),
+            data_row('p2', 'a2', '2026-05-04 10:05:00', 1, 3.0),
+            data_row('p1', NULL_UUID, '2026-05-05 09:00:00', 2, 0.0)]
+    bitacora = pd.DataFrame(rows, index=['b1', 'b2', 'b3'],
+                            columns=list(BITACORA_DTYPES))
+    return typed_bitacora(bitacora)
+
+
+def test_append_and_remove_as_concat():
+    bitacora = initial_bitacora()
+    buffer = BitacoraBuffer(bitacora, capacity=2)
+    new_entries = {
+        'b4': data_row('p3', 'a3', '2026-05-06 11:00:00', 3, 1.5),
+        'b5': data_row('p2', 'a1', '2026-05-06 11:30:00', 3, 2.25),
+        'b6': data_row('p3', NULL_UUID, '2026-05-07 12:00:00', 4, 0.0),
+    }
+    removed = {'b2': ('2026-05-06 12:00:00', 3),
+               'b5': ('2026-05-07 08:00:00', 4)}
+
+    # previous implementation: concatenation of the new entries
+    expected = bitacora
+    for uuid_bita, row in new_entries.items():
+        new_entry = pd.DataFrame(data=[row], index=[uuid_bita],
+                                 columns=bitacora.columns.tolist())
+        expected = pd.concat([expected, new_entry])
+        assert buffer.append(uuid_bita, row) == \
+            dict(zip(bitacora.columns, row))
+    for uuid_bita, (date_removed, ronda) in removed.items():
+        expected.loc[uuid_bita, 'date_removed'] = pd.Timestamp(date_removed)
+        expected.loc[uuid_bita, 'round_removed'] = ronda
+        expected.loc[uuid_bita, 'active'] = False
+        buffer.remove(uuid_bita, pd.Timestamp(date_removed), ronda)
+    expected.index.name = 'uuid_bita'
+
+    assert len(buffer) == 6
+    assert_frame_equal(buffer.dataframe(), typed_bitacora(expected))
+
+    entry = buffer.entry('b5')
+    assert entry['date_removed'] == pd.Timestamp('2026-05-07 08:00:00')
+    assert entry['round_removed'] == 4
+    assert not entry['active']
+    entry = buffer.entry('b4')
+    assert entry['date_removed'] is pd.NaT
+    assert entry['round_removed'] is pd.NA
+
+
+def test_dataframe_is_reused():
+    buffer = BitacoraBuffer(initial_bitacora())
+    df = buffer.dataframe()
+    assert buffer.dataframe() is df
+    buffer.remove('b1', pd.Timestamp('2026-05-06 12:00:00'), 3)
+    assert buffer.dataframe() is not df
+    assert buffer.dataframe()['active'].tolist() == [False, True, True]
+
+
+def test_duplicated_uuid():
+    buffer = BitacoraBuffer(initial_bitacora())
+    with pytest.raises(ValueError):
+        buffer.append('b1', data_row('p1', 'a1', '2026-05-08 10:00:00', 5,
+                                     1.0))
+
+
+def test_amortised_growth(monkeypatch):
+    # rows copied by each call to _grow()
+    copied = []
+    grow = BitacoraBuffer._grow
+
+    def counted_grow(self):
+        copied.append(self._size)
+        grow(self)
+
+    monkeypatch.setattr(BitacoraBuffer, '_grow', counted_grow)
+    buffer = BitacoraBuffer(initial_bitacora(), capacity=1)
+    nappend = 10000
+    for n in range(nappend):
+        buffer.append(f'n{n}', data_row('p1', 'a1', '2026-05-08 10:00:00',
+                                        5, 1.0))
+
+    # the capacity is doubled: log2(n) copies, with less than 2 n rows
+    # copied in total
+    nrows = len(buffer)
+    assert nrows == nappend + 3
+    assert len(copied) == math.ceil(math.log2(nrows / 6))
+    assert sum(copied) < 2 * nrows
+    assert buffer.entry('n9999')['round_added'] == 5
+    assert buffer.dataframe().index[-1] == 'n9999'
@@ -0,0 +1,57 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import pandas as pd
+import pytest
+
+from repdoc.bitacora_journal import BitacoraJournal
+from repdoc.definitions import BITACORA_DTYPES
+from repdoc.typed_bitacora import typed_bitacora
+
+
+def new_entry(uuid_prof, date_added):
+    """Values of a new active entry of the bitacora"""
+    values = [uuid_prof, 't1', 'a1', pd.Timestamp(date_added), 1, pd.NaT,
+              pd.NA, 6.0, ' ', 'Apellido ' + uuid_prof,
+              'Nombre ' + uuid_prof, 'Titular', '1º', 1, 800100,
+              'Asignatura a1', 'Astrofísica', 6.0, ' ', 'A', True]
+    return dict(zip(BITACORA_DTYPES, values))
+
+
+def empty_bitacora():
+    bitacora = pd.DataFrame(data=[], columns=list(BITACORA_DTYPES))
+    bitacora.index.name = 'uuid_bita'
+    return typed_bitacora(bitacora)
+
+
+def test_read(tmp_path):
+    journal = BitacoraJournal(str(tmp_path / 'bitacora.xlsx'))
+    journal.add('b1', new_entry('p1', '2026-05-04 10:00:00'))
+    journal.add('b2', new_entry('p2', '2026-05-04 10:05:00'))
+    # repeated entry (journal applied again)
+    journal.add('b1', new_entry('p1', '2026-05-04 10:00:00'))
+    journal.remove('b1', pd.Timestamp('2026-05-05 09:00:00'), 2)
+    journal.close()
+
+    bitacora = journal.read(empty_bitacora())
+    assert bitacora.index.tolist() == ['b1', 'b2']
+    assert bitacora['active'].tolist() == [False, True]
+    assert bitacora.loc['b1', 'date_removed'] == \
+        pd.Timestamp('2026-05-05 09:00:00')
+    assert bitacora.loc['b1', 'round_removed'] == 2
+
+
+def test_remove_unknown_uuid(tmp_path):
+    journal = BitacoraJournal(str(tmp_path / 'bitacora.xlsx'))
+    journal.add('b1', new_entry('p1', '2026-05-04 10:00:00'))
+    journal.remove('b9', pd.Timestamp('2026-05-05 09:00:00'), 2)
+    journal.close()
+
+    with pytest.raises(ValueError, match='line 2'):
+        journal.read(empty_bitacora())
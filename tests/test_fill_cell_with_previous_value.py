@@ -0,0 +1,57 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import pytest
+
+from repdoc.fill_cell_with_previous_value import \
+    fill_cell_with_previous_value
+
+
+def fill_cell_loop(s):
+    """Previous implementation (loop over the values)"""
+    result = []
+    last = None
+    for value in s:
+        if type(value) is str:
+            last = value
+        elif np.isnan(value):
+            if last is None:
+                raise ValueError('Unexpected error')
+            value = last
+        else:
+            last = value
+        result.append(value)
+    return result
+
+
+@pytest.mark.parametrize('values', [
+    ['1º', np.nan, 2, np.nan, np.nan, '3º', np.nan, 4.5],
+    ['Mecánica', np.nan, np.nan, 'Óptica', np.nan],
+    [1, np.nan, np.nan, 2, np.nan, 3],
+    [1.5, 2.5, 3.5],
+])
+def test_same_as_loop(values):
+    # as in read_tabla_asignaturas (after selecting some rows)
+    index = pd.RangeIndex(10, 10 + len(values))
+    column = pd.Series(values, index=index, dtype=object)
+    expected = pd.DataFrame({'curso': column})
+    expected['curso'] = fill_cell_loop(column.tolist())
+    result = pd.DataFrame({'curso': column})
+    result['curso'] = fill_cell_with_previous_value(column)
+    assert_frame_equal(result, expected)
+
+
+def test_first_value_missing():
+    with pytest.raises(ValueError):
+        fill_cell_with_previous_value([np.nan, 'a'])
+    with pytest.raises(ValueError):
+        fill_cell_loop([np.nan, 'a'])
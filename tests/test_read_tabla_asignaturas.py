@@ -0,0 +1,32 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import pandas as pd
+
+from repdoc.read_tabla_asignaturas import prescan_tabla_asignaturas
+from repdoc.read_tabla_asignaturas import read_tabla_asignaturas
+
+
+def test_prescan(input_xlsx, monkeypatch):
+    with pd.ExcelFile(input_xlsx) as workbook:
+        prescan = prescan_tabla_asignaturas(workbook, '2025-2026',
+                                            'Máster en Astrofísica')
+    tabla = read_tabla_asignaturas(input_xlsx, '2025-2026',
+                                   'Máster en Astrofísica')
+    uuids, creditos_iniciales, creditos_beccol = prescan
+    assert uuids == tabla.index.tolist()
+    assert creditos_iniciales == tabla['creditos_iniciales'].sum()
+    assert creditos_beccol == \
+        (tabla['creditos_iniciales'] * tabla['bec_col']).sum()
+
+    # other engines (e.g. xlrd with .xls files) employ pandas.read_excel
+    with pd.ExcelFile(input_xlsx) as workbook:
+        monkeypatch.setattr(workbook, 'engine', 'xlrd')
+        assert prescan_tabla_asignaturas(workbook, '2025-2026',
+                                         'Máster en Astrofísica') == prescan
@@ -0,0 +1,51 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import openpyxl
+import pandas as pd
+
+from repdoc.read_tabla_profesores import read_tabla_profesores
+
+
+def write_asignacion(filename, rows):
+    """Save sheet 'Asignación' (course 2025-2026) with the given rows"""
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.title = 'Asignación'
+    sheet.cell(row=1, column=1, value='header')
+    for irow, row in enumerate(rows, start=8):
+        if row is None:
+            continue
+        uuid_prof, apellidos, nombre, categoria, encargo = row
+        sheet.cell(row=irow, column=1, value=uuid_prof)
+        sheet.cell(row=irow, column=3, value=apellidos)
+        sheet.cell(row=irow, column=4, value=nombre)
+        sheet.cell(row=irow, column=5, value=categoria)
+        sheet.cell(row=irow, column=20, value=encargo)
+    book.save(filename)
+
+
+def test_blank_rows_between_teachers(tmp_path):
+    filename = tmp_path / 'profesores.xlsx'
+    rows = [('p1', 'Apellido1', 'Nombre1', 'Titular', 12.0),
+            ('p2', 'Apellido2', 'Nombre2', 'Colaborador', 0.0)]
+    rows += [None] * 25
+    rows += [('p3', 'Apellido3', 'Nombre3', 'Catedrático', 6.5)]
+    write_asignacion(filename, rows)
+
+    tabla = read_tabla_profesores(filename, '2025-2026')
+    assert tabla.index.tolist() == ['p1', 'p2', 'p3']
+    assert tabla['encargo'].tolist() == [12.0, 0.0, 6.5]
+
+    # same result as the generic reader
+    tabla_excel = pd.read_excel(filename, sheet_name='Asignación',
+                                skiprows=7, header=None,
+                                usecols=[0, 2, 3, 4, 19])
+    tabla_excel = tabla_excel[tabla_excel[0].notnull()]
+    assert tabla_excel[0].tolist() == tabla.index.tolist()
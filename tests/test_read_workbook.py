@@ -0,0 +1,47 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+from pandas.testing import assert_frame_equal
+
+from repdoc.bitacora_checkpoint import checkpoint_key
+from repdoc.read_workbook import read_workbook
+from repdoc.workbook_cache import cache_key
+from repdoc.workbook_cache import file_hash
+
+
+def test_serial_and_parallel(input_xlsx):
+    serial = read_workbook(input_xlsx, '2025-2026')
+    parallel = read_workbook(input_xlsx, '2025-2026', jobs=2)
+
+    tabla_titulaciones, bigdict_tablas_asignaturas, tabla_profesores = \
+        serial
+    titulaciones = ['Grado en Física', 'Máster en Astrofísica',
+                    'Grado en Matemáticas']
+    assert tabla_titulaciones['titulacion'].tolist() == titulaciones
+    assert tabla_titulaciones['creditos_iniciales'].tolist() == \
+        [12.0, 13.0, 14.0]
+    tabla = bigdict_tablas_asignaturas['Grado en Física']
+    assert tabla['asignatura'].tolist() == ['Física', 'Física', 'Óptica']
+    assert tabla_profesores.index.tolist() == ['p1', 'p2', 'p3']
+
+    assert_frame_equal(parallel[0], serial[0])
+    assert list(parallel[1]) == list(serial[1])
+    for titulacion in titulaciones:
+        assert_frame_equal(parallel[1][titulacion], serial[1][titulacion])
+    assert_frame_equal(parallel[2], serial[2])
+
+
+def test_keys_with_file_hash(input_xlsx):
+    xlsxhash = file_hash(input_xlsx)
+    assert cache_key(input_xlsx, '2025-2026', xlsxhash=xlsxhash) == \
+        cache_key(input_xlsx, '2025-2026')
+    assert checkpoint_key(input_xlsx, '2025-2026', xlsxhash=xlsxhash) == \
+        checkpoint_key(input_xlsx, '2025-2026')
+    assert checkpoint_key(input_xlsx, '2025-2026') != \
+        cache_key(input_xlsx, '2025-2026')
@@ -0,0 +1,53 @@
+#
+# Copyright 2019-2026 Universidad Complutense de Madrid
+#
+# This file is part of RepDoc
+#
+# SPDX-License-Identifier: GPL-3.0+
+# License-Filename: LICENSE.txt
+#
+
+import numpy as np
+
+from repdoc.allocation_state import TOLERANCIA
+from repdoc.replay_bitacora import calcula_restantes
+
+
+def restantes_uno_a_uno(disponibles, creditos, iasig):
+    """Apply the entries one by one, as AllocationState.assign"""
+    actual = {}
+    restantes = []
+    for d, c, i in zip(disponibles, creditos, iasig):
+        r = actual.get(i, d) - c
+        if abs(r) < TOLERANCIA:
+            r = 0
+        actual[i] = r
+        restantes.append(r)
+    return np.array(restantes)
+
+
+def test_tolerance_after_each_entry():
+    disponibles = np.array([6000000, 6000000, 3000000, 6000000, 6000000])
+    creditos = np.array([1999997, 1999998, 3000000, 2000000, 15])
+    iasig = np.array([7, 7, 2, 7, 7])
+    restantes = calcula_restantes(disponibles, creditos, iasig)
+    # the third entry of subject 7 leaves 5 micro-credits (set to zero),
+    # so the last entry exceeds the tolerance
+    assert restantes.tolist() == [4000003, 2000005, 0, 0, -15]
+    assert restantes[-1] < -TOLERANCIA
+    assert np.array_equal(
+        restantes, restantes_uno_a_uno(disponibles, creditos, iasig)
+    )
+
+
+def test_random_entries():
+    rng = np.random.default_rng(1234)
+    for _ in range(20):
+        nentries = 200
+        iasig = rng.integers(0, 5, size=nentries)
+        creditos = rng.integers(0, 3 * TOLERANCIA, size=nentries)
+        disponibles = np.full(nentries, 20 * TOLERANCIA)
+        assert np.array_equal(
+            calcula_restantes(disponibles, creditos, iasig),
+            restantes_uno_a_uno(disponibles, creditos, iasig)
+        )